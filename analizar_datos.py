@@ -1,18 +1,35 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-def leer_datos_stm(archivo_csv):
-    """Lee el archivo CSV de datos STM"""
+from cache_horarios import compactar, guardar_cache, leer_cache
+
+def leer_datos_stm(archivo_csv, usar_cache=True):
+    """
+    Lee el archivo CSV de datos STM
+    La primera lectura guarda una caché columnar (cache_horarios.py) y las
+    siguientes la usan mientras el CSV no cambie
+    """
     print("Cargando datos...")
+    if usar_cache:
+        df = leer_cache(archivo_csv)
+        if df is not None:
+            print(f"Datos cargados desde caché: {len(df)} registros")
+            return df
+
     df = pd.read_csv(archivo_csv, sep=';', dtype={
         'tipo_dia': int,
-        'cod_variante': str,
+        'cod_variante': 'category',
         'frecuencia': int,
-        'cod_ubic_parada': str,
+        'cod_ubic_parada': 'category',
         'ordinal': int,
         'hora': int,
-        'dia_anterior': str
+        'dia_anterior': 'category'
     })
+    if usar_cache:
+        df = guardar_cache(df, archivo_csv)
+    else:
+        df = compactar(df)
     print(f"Datos cargados: {len(df)} registros")
     return df
 
@@ -48,12 +65,150 @@ def obtener_tipo_dia(fecha=None):
     else:  # Lunes a Viernes
         return 1
 
+def minutos_desde_hora(horas):
+    """Versión vectorizada de convertir_hora_a_minutos para una columna de horas hmm"""
+    horas = np.asarray(horas, dtype=np.int64)
+    return (horas // 100) * 60 + horas % 100
+
+def formato_hora(mins):
+    """Minutos (posiblemente de más de 24 horas) a "HH:MM" del día"""
+    mins_dia = mins % (24 * 60)
+    h = mins_dia // 60
+    m = mins_dia % 60
+    return f"{h:02d}:{m:02d}"
+
+# Separación entre grupos en la clave combinada (mayor que cualquier horario en minutos)
+ESCALA_CLAVE = 1 << 16
+
+class IndiceHorarios:
+    """
+    Índice de los horarios STM por (cod_ubic_parada, tipo_dia)
+
+    Guarda todas las filas ordenadas por parada, tipo de día y minutos (con el
+    ajuste de dia_anterior ya aplicado) y, para cada par, el rango que ocupa.
+    Buscar los próximos ómnibus es entonces un searchsorted sobre ese rango y
+    un slice, sin recorrer el DataFrame.
+    """
+
+    def __init__(self, df):
+        minutos = minutos_desde_hora(df['hora'].to_numpy())
+        dia_anterior = df['dia_anterior'].to_numpy()
+        minutos = minutos + np.where(dia_anterior == 'S', 24 * 60, 0)
+
+        codigos_parada, paradas = pd.factorize(df['cod_ubic_parada'], sort=False)
+        codigos_variante, variantes = pd.factorize(df['cod_variante'], sort=False)
+        tipos_dia = df['tipo_dia'].to_numpy()
+
+        # Orden estable: a igual horario se respeta el orden del archivo
+        orden = np.lexsort((minutos, tipos_dia, codigos_parada))
+        paradas_ord = codigos_parada[orden]
+        tipos_ord = tipos_dia[orden]
+
+        # Número de grupo (parada, tipo_dia) de cada fila ordenada
+        nuevo = np.ones(len(orden), dtype=bool)
+        nuevo[1:] = (np.diff(paradas_ord) != 0) | (np.diff(tipos_ord) != 0)
+        grupos = [(paradas[p], int(t)) for p, t in zip(paradas_ord[nuevo].tolist(), tipos_ord[nuevo].tolist())]
+
+        self._cargar(
+            minutos[orden],
+            codigos_variante[orden].astype(np.int32),
+            np.asarray(variantes, dtype=object),
+            dia_anterior[orden],
+            df.index.to_numpy()[orden],
+            np.cumsum(nuevo) - 1,
+            grupos,
+        )
+
+    def _cargar(self, minutos, codigos_variante, variantes, dia_anterior, etiquetas, grupo, grupos):
+        self.minutos = minutos
+        self.codigos_variante = codigos_variante
+        self.variantes = variantes
+        self.dia_anterior = dia_anterior
+        self.etiquetas = etiquetas
+        self.grupo = grupo
+        self.grupos = grupos
+        self._codigo_variante = {v: i for i, v in enumerate(variantes)}
+        self._numero_grupo = {clave: g for g, clave in enumerate(grupos)}
+
+        # Rango [inicio, fin) de cada (parada, tipo_dia) dentro de los arrays ordenados
+        limites = np.searchsorted(grupo, np.arange(len(grupos) + 1))
+        self.inicios = limites[:-1]
+        self.fines = limites[1:]
+        self.rangos = {
+            clave: (i, f) for clave, i, f in zip(grupos, self.inicios.tolist(), self.fines.tolist()) if f > i
+        }
+        # Clave combinada (grupo, minutos), ordenada: un solo searchsorted responde muchas consultas
+        self.claves = grupo.astype(np.int64) * ESCALA_CLAVE + minutos
+
+    def filtrar_variantes(self, variantes):
+        """Índice con solo las filas de las variantes dadas (conserva los números de grupo)"""
+        codigos = [self._codigo_variante[v] for v in variantes if v in self._codigo_variante]
+        filas = np.isin(self.codigos_variante, np.asarray(codigos, dtype=np.int32))
+        filtrado = object.__new__(IndiceHorarios)
+        filtrado._cargar(
+            self.minutos[filas], self.codigos_variante[filas], self.variantes, self.dia_anterior[filas],
+            self.etiquetas[filas], self.grupo[filas], self.grupos,
+        )
+        return filtrado
+
+    def __len__(self):
+        return len(self.minutos)
+
+    def buscar(self, cod_parada, tipo_dia, minutos_actuales, variantes=None, cantidad=10):
+        """
+        Posiciones (en los arrays ordenados) de los próximos `cantidad` ómnibus
+        Devuelve (posiciones, desfase): desfase es 24 * 60 si no quedan más en el día
+        y las posiciones son los primeros del día siguiente; None si no hay horarios
+        """
+        rango = self.rangos.get((cod_parada, tipo_dia))
+        if rango is None:
+            return None
+        inicio, fin = rango
+
+        filtro = None
+        if variantes:
+            codigos = [self._codigo_variante[v] for v in variantes if v in self._codigo_variante]
+            filtro = np.asarray(codigos, dtype=np.int32)
+            if not len(filtro) or not np.isin(self.codigos_variante[inicio:fin], filtro).any():
+                return None
+
+        def primeras(desde):
+            if filtro is None:
+                return np.arange(desde, min(desde + cantidad, fin))
+            coinciden = np.flatnonzero(np.isin(self.codigos_variante[desde:fin], filtro))
+            return desde + coinciden[:cantidad]
+
+        desde = inicio + int(np.searchsorted(self.minutos[inicio:fin], minutos_actuales, side='left'))
+        posiciones = primeras(desde)
+        if len(posiciones):
+            return posiciones, 0
+        return primeras(inicio), 24 * 60
+
+    def proximos(self, cod_parada, tipo_dia, minutos_actuales, variantes=None, cantidad=10):
+        """DataFrame con los próximos ómnibus (mismas columnas que buscar_proximo_omnibus), sin mensajes"""
+        encontrados = self.buscar(cod_parada, tipo_dia, minutos_actuales, variantes, cantidad)
+        if encontrados is None:
+            return pd.DataFrame()
+        return self._resultado(*encontrados, minutos_actuales)
+
+    def _resultado(self, posiciones, desfase, minutos_actuales):
+        minutos = self.minutos[posiciones] + desfase
+        return pd.DataFrame(
+            {
+                'cod_variante': self.variantes[self.codigos_variante[posiciones]],
+                'hora_formato': [formato_hora(m) for m in minutos.tolist()],
+                'minutos_espera': minutos - minutos_actuales,
+                'dia_anterior': self.dia_anterior[posiciones],
+            },
+            index=self.etiquetas[posiciones],
+        )
+
 def buscar_proximo_omnibus(df, cod_parada, variantes=None, tipo_dia=None, hora_actual=None):
     """
     Busca el próximo ómnibus que pasa por una parada
     
     Args:
-        df: DataFrame con los datos STM
+        df: DataFrame con los datos STM, o un IndiceHorarios ya construido (para muchas consultas)
         cod_parada: Código de la parada (str)
         variantes: Lista de códigos de variantes a considerar (None = todas)
         tipo_dia: Tipo de día (1=Hábil, 2=Sábado, 3=Domingo, None=detectar automáticamente)
@@ -83,53 +238,91 @@ def buscar_proximo_omnibus(df, cod_parada, variantes=None, tipo_dia=None, hora_a
     if variantes:
         print(f"Variantes: {', '.join(variantes)}")
     
-    # Filtrar por parada y tipo de día
-    filtro = (df['cod_ubic_parada'] == cod_parada) & (df['tipo_dia'] == tipo_dia)
-    
-    # Filtrar por variantes si se especifican
-    if variantes:
-        filtro = filtro & (df['cod_variante'].isin(variantes))
-    
-    df_filtrado = df[filtro].copy()
+    # Con un DataFrame se indexa solo la parada consultada
+    if isinstance(df, IndiceHorarios):
+        indice = df
+    else:
+        indice = IndiceHorarios(df[df['cod_ubic_parada'] == cod_parada])
     
-    if len(df_filtrado) == 0:
+    encontrados = indice.buscar(cod_parada, tipo_dia, minutos_actuales, variantes)
+    if encontrados is None:
         print("No se encontraron horarios para los criterios especificados")
         return pd.DataFrame()
     
-    # Convertir hora a minutos
-    df_filtrado['minutos'] = df_filtrado['hora'].apply(convertir_hora_a_minutos)
-    
-    # Ajustar horarios del día anterior (agregar 24 horas)
-    df_filtrado.loc[df_filtrado['dia_anterior'] == 'S', 'minutos'] += 24 * 60
-    
-    # Encontrar próximos ómnibus (mismas 24 horas)
-    df_proximos = df_filtrado[df_filtrado['minutos'] >= minutos_actuales].copy()
-    
-    # Si no hay más ómnibus hoy, buscar en el día siguiente
-    if len(df_proximos) == 0:
+    posiciones, desfase = encontrados
+    if desfase:
         print("No hay más ómnibus hoy. Mostrando primeros del día siguiente...")
-        df_proximos = df_filtrado.copy()
-        df_proximos['minutos'] += 24 * 60
-    
-    # Calcular minutos hasta el próximo ómnibus
-    df_proximos['minutos_espera'] = df_proximos['minutos'] - minutos_actuales
     
-    # Formatear hora legible
-    def formato_hora(mins):
-        mins_dia = mins % (24 * 60)
-        h = mins_dia // 60
-        m = mins_dia % 60
-        return f"{h:02d}:{m:02d}"
-    
-    df_proximos['hora_formato'] = df_proximos['minutos'].apply(formato_hora)
-    
-    # Ordenar por tiempo de espera
-    df_proximos = df_proximos.sort_values('minutos_espera')
+    return indice._resultado(posiciones, desfase, minutos_actuales)
+
+def proximos_omnibus_batch(df, paradas, tipo_dia=None, horas=None, variantes=None, cantidad=10):
+    """
+    Próximos ómnibus de muchas paradas (y horarios) en una sola pasada vectorizada, sin mensajes
     
-    # Seleccionar columnas relevantes
-    resultado = df_proximos[['cod_variante', 'hora_formato', 'minutos_espera', 'dia_anterior']].head(10)
+    Args:
+        df: DataFrame con los datos STM o un IndiceHorarios ya construido
+        paradas: Códigos de las paradas (str)
+        tipo_dia: Tipo de día (1=Hábil, 2=Sábado, 3=Domingo, None=detectar automáticamente)
+        horas: Hora "HH:MM" o lista de horas a consultar para cada parada (None = hora del sistema)
+        variantes: Lista de códigos de variantes a considerar (None = todas)
+        cantidad: Próximas salidas por parada y hora
     
-    return resultado
+    Returns:
+        DataFrame con una fila por salida: cod_parada, hora_consulta, orden (1..cantidad),
+        cod_variante, hora_formato, minutos_espera, dia_anterior y dia_siguiente
+        (True si ya no quedaban salidas ese día y son las primeras del siguiente)
+    """
+    if tipo_dia is None:
+        tipo_dia = obtener_tipo_dia()
+    if horas is None:
+        horas = [datetime.now().strftime("%H:%M")]
+    elif isinstance(horas, str):
+        horas = [horas]
+    paradas = [str(p) for p in paradas]
+
+    if isinstance(df, IndiceHorarios):
+        indice = df
+    else:
+        indice = IndiceHorarios(df[df['cod_ubic_parada'].isin(paradas)])
+    if variantes:
+        indice = indice.filtrar_variantes(variantes)
+
+    # Una consulta por cada (parada, hora)
+    minutos_hora = np.array([int(h[:-3]) * 60 + int(h[-2:]) for h in horas], dtype=np.int64)
+    numeros = np.array([indice._numero_grupo.get((p, tipo_dia), -1) for p in paradas], dtype=np.int64)
+    consulta_parada = np.repeat(np.arange(len(paradas)), len(horas))
+    consulta_hora = np.tile(np.arange(len(horas)), len(paradas))
+    grupo = numeros[consulta_parada]
+    minutos_actuales = minutos_hora[consulta_hora]
+
+    # Las consultas sin horarios quedan con un rango vacío
+    validas = grupo >= 0
+    grupo_valido = np.where(validas, grupo, 0)
+    limites = np.append(indice.inicios, 0), np.append(indice.fines, 0)
+    inicio = limites[0][np.where(validas, grupo, -1)]
+    fin = limites[1][np.where(validas, grupo, -1)]
+
+    desde = np.searchsorted(indice.claves, grupo_valido * ESCALA_CLAVE + minutos_actuales, side='left')
+    # Sin más salidas en el día: las primeras del día siguiente
+    dia_siguiente = validas & (desde >= fin) & (fin > inicio)
+    desde = np.where(dia_siguiente, inicio, desde)
+
+    posiciones = desde[:, None] + np.arange(cantidad)[None, :]
+    hay = validas[:, None] & (posiciones < fin[:, None])
+    consulta, orden = np.nonzero(hay)
+    posiciones = posiciones[consulta, orden]
+
+    minutos = indice.minutos[posiciones] + np.where(dia_siguiente[consulta], 24 * 60, 0)
+    return pd.DataFrame({
+        'cod_parada': np.asarray(paradas, dtype=object)[consulta_parada[consulta]],
+        'hora_consulta': np.asarray(horas, dtype=object)[consulta_hora[consulta]],
+        'orden': orden + 1,
+        'cod_variante': indice.variantes[indice.codigos_variante[posiciones]],
+        'hora_formato': [formato_hora(m) for m in minutos.tolist()],
+        'minutos_espera': minutos - minutos_actuales[consulta],
+        'dia_anterior': indice.dia_anterior[posiciones],
+        'dia_siguiente': dia_siguiente[consulta],
+    })
 
 # Ejemplo de uso
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+"""
+Benchmark del cálculo de distancias bondi-parada de un ciclo de polling
+
+Compara la llamada a geopy por bondi (implementación original del tracker)
+contra los kernels vectorizados de distancias.py, con 1k y 10k bondis.
+
+Uso:
+    uv run python -m benchmarks.distancias
+"""
+import random
+import time
+
+import numpy as np
+from geopy import distance
+
+from distancias import MODOS_DISTANCIA, distancias_bondis_paradas
+
+PARADA = (-34.87240513, -56.14675823)
+TAMANOS = (1_000, 10_000)
+REPETICIONES = 5
+
+
+def generar_respuesta_buses(n, semilla=0):
+    """Genera una respuesta sintética de /buses con n bondis repartidos por Montevideo"""
+    rng = random.Random(semilla)
+    return [
+        {
+            "busId": i,
+            "line": str(rng.randint(100, 599)),
+            "location": {
+                "type": "Point",
+                "coordinates": [-56.16 + rng.uniform(-0.15, 0.15), -34.88 + rng.uniform(-0.06, 0.06)],
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    """Devuelve el mejor tiempo en segundos de varias repeticiones"""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def geopy_por_bondi(buses_data):
+    return [
+        distance.distance(PARADA, (b["location"]["coordinates"][1], b["location"]["coordinates"][0])).meters
+        for b in buses_data
+    ]
+
+
+def main():
+    print(f"{'bondis':>8} | {'modo':17s} | {'tiempo':>10} | {'speedup':>8} | {'error máx.':>10}")
+    print("-" * 67)
+    for n in TAMANOS:
+        buses_data = generar_respuesta_buses(n)
+        referencia = np.array(geopy_por_bondi(buses_data))
+        t_geopy = medir(lambda: geopy_por_bondi(buses_data), repeticiones=1)
+        print(f"{n:>8} | {'geopy (por bondi)':17s} | {t_geopy * 1000:>8.2f}ms | {1:>7.1f}x | {0:>9.3f}m")
+
+        for modo in MODOS_DISTANCIA:
+            _, matriz = distancias_bondis_paradas(buses_data, [PARADA[0]], [PARADA[1]], modo)
+            error = np.abs(matriz[:, 0] - referencia).max()
+            t = medir(lambda: distancias_bondis_paradas(buses_data, [PARADA[0]], [PARADA[1]], modo))
+            print(f"{n:>8} | {modo:17s} | {t * 1000:>8.2f}ms | {t_geopy / t:>7.1f}x | {error:>9.3f}m")
+
+
+if __name__ == "__main__":
+    main()
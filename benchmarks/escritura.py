@@ -0,0 +1,138 @@
+"""
+Benchmark de escritura de pasadas: SQLite embebido contra PostgreSQL
+
+Reproduce cómo escribe el tracker: pasadas de a una con create_from_bus_data
+(un commit por pasada, ASYNC_WRITER = False) y lotes como los de
+EscritorPasadas (bulk_create + resumen por hora + commit), del tamaño de un
+ciclo de polling y del tamaño máximo de lote.
+
+PostgreSQL se mide solo si se pasa --postgres; las tablas se crean en un
+schema aparte que se borra al terminar, así que se puede apuntar a la base
+de desarrollo sin tocar sus datos.
+
+Uso:
+    uv run python -m benchmarks.escritura
+    uv run python -m benchmarks.escritura --postgres postgresql://localhost/bus_tracker_development
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.distancias import generar_respuesta_buses
+from models import Base, BusPassage, BusPassageRollup, BusStop, get_db_engine, get_session
+
+SCHEMA_POSTGRES = "benchmark_escritura"
+PARADAS = 50
+PASADAS_UNITARIAS = 500
+PASADAS_EN_LOTES = 10_000
+TAMANOS_LOTE = (20, 500)  # Un ciclo de polling con muchas paradas, y WRITER_BATCH_SIZE
+
+
+def motores(directorio, postgres_url=None):
+    """[(nombre, engine)] de las bases a comparar"""
+    sin_ajustes = create_engine(f"sqlite:///{os.path.join(directorio, 'sin_ajustes.sqlite3')}")
+    Base.metadata.create_all(sin_ajustes)
+    lista = [
+        ("sqlite (por defecto)", sin_ajustes),
+        ("sqlite (WAL + pragmas)", get_db_engine(f"sqlite:///{os.path.join(directorio, 'embebido.sqlite3')}")),
+    ]
+    if postgres_url:
+        with create_engine(postgres_url, isolation_level="AUTOCOMMIT").connect() as conn:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA_POSTGRES}"))
+        engine = create_engine(postgres_url, connect_args={"options": f"-c search_path={SCHEMA_POSTGRES}"})
+        Base.metadata.create_all(engine)
+        lista.append(("postgresql", engine))
+    return lista
+
+
+def generar_filas(bus_stop_ids, n, inicio):
+    """n pasadas consecutivas (un segundo entre cada una) repartidas entre las paradas"""
+    return [
+        BusPassage.values_from_bus_data(
+            bus_stop_ids[i % len(bus_stop_ids)],
+            {"line": str(100 + i % 7), "destination": "DESTINO",
+             "location": {"coordinates": [-56.16, -34.88]}},
+            inicio + timedelta(seconds=i),
+        )
+        for i in range(n)
+    ]
+
+
+def medir_unitarias(engine, bus_stops, inicio):
+    buses_data = generar_respuesta_buses(PASADAS_UNITARIAS)
+    session = get_session(engine)
+    try:
+        t0 = time.perf_counter()
+        for i, bus_data in enumerate(buses_data):
+            BusPassage.create_from_bus_data(
+                session, bus_stops[i % len(bus_stops)], bus_data, inicio + timedelta(seconds=i)
+            )
+        return time.perf_counter() - t0, PASADAS_UNITARIAS
+    finally:
+        session.close()
+
+
+def medir_lotes(engine, bus_stops, inicio, tamano):
+    filas = generar_filas([s.id for s in bus_stops], PASADAS_EN_LOTES, inicio)
+    session = get_session(engine)
+    try:
+        t0 = time.perf_counter()
+        for i in range(0, len(filas), tamano):
+            lote = filas[i:i + tamano]
+            BusPassage.bulk_create(session, lote)
+            BusPassageRollup.accumulate(session, lote)
+            session.commit()
+        return time.perf_counter() - t0, -(-len(filas) // tamano)
+    finally:
+        session.close()
+
+
+def preparar(engine):
+    """Carga las paradas (una sola vez por base) y devuelve los objetos"""
+    session = get_session(engine)
+    try:
+        BusStop.sync_from_api(session, [
+            {"busstopId": i, "location": {"coordinates": [-56.16, -34.88 + i * 1e-4]}} for i in range(1, PARADAS + 1)
+        ])
+        return session.query(BusStop).order_by(BusStop.busstop_id).all()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escritura de pasadas: SQLite embebido vs PostgreSQL")
+    parser.add_argument("--postgres", metavar="URL", help="Base PostgreSQL para comparar (se usa un schema aparte)")
+    args = parser.parse_args()
+
+    print(f"{'base':24s} | {'escenario':28s} | {'pasadas/s':>10} | {'ms/commit':>9}")
+    print("-" * 82)
+    with tempfile.TemporaryDirectory(prefix="benchmark-escritura-") as directorio:
+        lista = motores(directorio, args.postgres)
+        try:
+            for nombre, engine in lista:
+                bus_stops = preparar(engine)
+                # Cada escenario escribe en su propio día para no mezclar frecuencias en el resumen
+                inicio = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) - timedelta(days=10)
+
+                segundos, commits = medir_unitarias(engine, bus_stops, inicio)
+                print(f"{nombre:24s} | {'de a una (commit por pasada)':28s} | "
+                      f"{PASADAS_UNITARIAS / segundos:>10,.0f} | {segundos / commits * 1000:>9.2f}")
+
+                for dia, tamano in enumerate(TAMANOS_LOTE, start=1):
+                    segundos, commits = medir_lotes(engine, bus_stops, inicio + timedelta(days=dia), tamano)
+                    print(f"{nombre:24s} | {f'lotes de {tamano}':28s} | "
+                          f"{PASADAS_EN_LOTES / segundos:>10,.0f} | {segundos / commits * 1000:>9.2f}")
+        finally:
+            for nombre, engine in lista:
+                engine.dispose()
+            if args.postgres:
+                with create_engine(args.postgres, isolation_level="AUTOCOMMIT").connect() as conn:
+                    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA_POSTGRES} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Suite de micro-benchmarks de los caminos críticos del proyecto
+
+Corre las funciones reales del repo con datos sintéticos del tamaño del
+despliegue, contra una base SQLite embebida en un directorio temporal, y
+guarda los resultados en JSON (uno por commit) para comparar entre versiones.
+
+Uso:
+    uv run python -m benchmarks.suite
+    uv run python -m benchmarks.suite --solo pasadas consultas --pasadas 100000
+    uv run python -m benchmarks.suite --comparar .cache/benchmarks/abc1234.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+from geopy import distance
+
+from benchmarks.distancias import PARADA, generar_respuesta_buses
+from distancias import calcular_distancia
+from models import Base, BusPassage, BusStop, dispose_engines, get_db_engine, get_session
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "benchmarks")
+
+PARADAS = 5_000
+PASADAS_UNITARIAS = 2_000
+PASADAS_CONSULTAS = 1_000_000
+VARIANTES_HORARIOS = 600
+REPETICIONES = 3
+
+
+def generar_paradas(n, semilla=0):
+    """Genera un catálogo sintético de /buses/busstops con n paradas"""
+    rng = random.Random(semilla)
+    return [
+        {
+            "busstopId": i,
+            "street1": f"CALLE {rng.randint(1, 2000)}",
+            "street2": f"CALLE {rng.randint(1, 2000)}",
+            "street1Id": rng.randint(1, 2000),
+            "street2Id": rng.randint(1, 2000),
+            "location": {
+                "type": "Point",
+                "coordinates": [-56.16 + rng.uniform(-0.15, 0.15), -34.88 + rng.uniform(-0.06, 0.06)],
+            },
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def generar_pasadas(bus_stop_ids, n, semilla=0, dias=30):
+    """Genera n filas de pasadas repartidas en los últimos `dias` días"""
+    rng = np.random.default_rng(semilla)
+    ahora = datetime.now(timezone.utc).replace(tzinfo=None)  # detected_at se guarda en UTC sin zona
+    segundos = rng.integers(0, dias * 86400, n)
+    paradas = rng.choice(np.asarray(bus_stop_ids), n)
+    lineas = rng.integers(100, 200, n)
+    return [
+        {
+            "bus_stop_id": int(paradas[i]),
+            "line": str(lineas[i]),
+            "destination": "DESTINO",
+            "bus_code": None,
+            "bus_latitude": -34.88,
+            "bus_longitude": -56.16,
+            "detected_at": ahora - timedelta(seconds=int(segundos[i])),
+            "eta_minutes": None,
+        }
+        for i in range(n)
+    ]
+
+
+def generar_horarios(ruta, variantes, semilla=0):
+    """
+    Escribe un CSV de horarios STM sintético (mismo formato que datos_stm.csv)
+    Cada variante recorre ~40 paradas con salidas cada 15-40 minutos en los tres tipos de día
+    """
+    rng = np.random.default_rng(semilla)
+    bloques = []
+    for variante in range(variantes):
+        paradas = rng.choice(np.arange(1, PARADAS + 1), rng.integers(30, 50), replace=False)
+        frecuencia = int(rng.integers(15, 41))
+        for tipo_dia in (1, 2, 3):
+            salidas = np.arange(300 + int(rng.integers(0, 60)), 24 * 60 + 60, frecuencia)
+            ordinales = np.arange(1, len(paradas) + 1)
+            minutos = (salidas[:, None] + ordinales[None, :] * 2).ravel()
+            dia_anterior = np.where(minutos >= 24 * 60, "S", "N")
+            minutos = minutos % (24 * 60)
+            bloques.append(pd.DataFrame({
+                "tipo_dia": tipo_dia,
+                "cod_variante": str(4000 + variante),
+                "frecuencia": frecuencia,
+                "cod_ubic_parada": np.tile(paradas, len(salidas)).astype(str),
+                "ordinal": np.tile(ordinales, len(salidas)),
+                "hora": (minutos // 60) * 100 + minutos % 60,
+                "dia_anterior": dia_anterior,
+            }))
+    pd.concat(bloques, ignore_index=True).to_csv(ruta, sep=";", index=False)
+
+
+def medir(nombre, funcion, operaciones=1, repeticiones=REPETICIONES, preparar=None):
+    """Corre funcion varias veces (con preparar() antes de cada una, fuera del tiempo) y resume los tiempos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+
+    mejor = min(tiempos)
+    resultado = {
+        "nombre": nombre,
+        "operaciones": operaciones,
+        "repeticiones": repeticiones,
+        "min_s": mejor,
+        "mediana_s": statistics.median(tiempos),
+        "media_s": statistics.fmean(tiempos),
+        "ops_por_s": operaciones / mejor if mejor else None,
+    }
+    print(f"  {nombre:50s} | {mejor * 1000:>10.2f}ms | {resultado['ops_por_s']:>12,.0f} ops/s")
+    return resultado
+
+
+def bench_distancias(contexto):
+    buses_data = generar_respuesta_buses(10_000)
+    puntos = [(b["location"]["coordinates"][1], b["location"]["coordinates"][0]) for b in buses_data]
+    return [
+        medir("calcular_distancia (10k bondis)",
+              lambda: [calcular_distancia(PARADA[0], PARADA[1], lat, lon) for lat, lon in puntos], len(puntos)),
+        medir("geopy distance.distance (10k bondis)",
+              lambda: [distance.distance(PARADA, p).meters for p in puntos], len(puntos), repeticiones=1),
+    ]
+
+
+def bench_paradas(contexto):
+    engine = contexto["engine"]
+    paradas = generar_paradas(PARADAS)
+
+    def vaciar():
+        with engine.begin() as conn:
+            conn.execute(BusPassage.__table__.delete())
+            conn.execute(BusStop.__table__.delete())
+
+    def find_or_create():
+        session = get_session(engine)
+        try:
+            for data in paradas:
+                BusStop.find_or_create_from_api(session, data)
+        finally:
+            session.close()
+
+    def sync():
+        session = get_session(engine)
+        try:
+            BusStop.sync_from_api(session, paradas)
+        finally:
+            session.close()
+
+    resultados = [
+        medir(f"BusStop.find_or_create_from_api ({PARADAS} nuevas)", find_or_create, PARADAS, 1, vaciar),
+        medir(f"BusStop.find_or_create_from_api ({PARADAS} existentes)", find_or_create, PARADAS, 1),
+        medir(f"BusStop.sync_from_api ({PARADAS} nuevas)", sync, PARADAS, preparar=vaciar),
+        medir(f"BusStop.sync_from_api ({PARADAS} sin cambios)", sync, PARADAS),
+    ]
+
+    session = get_session(engine)
+    contexto["bus_stops"] = session.query(BusStop).order_by(BusStop.busstop_id).all()
+    session.close()
+    return resultados
+
+
+def bench_pasadas(contexto):
+    engine = contexto["engine"]
+    bus_stops = contexto["bus_stops"]
+    buses_data = generar_respuesta_buses(PASADAS_UNITARIAS)
+    filas = generar_pasadas([s.id for s in bus_stops], PASADAS_UNITARIAS)
+
+    def create_from_bus_data():
+        session = get_session(engine)
+        try:
+            for i, bus_data in enumerate(buses_data):
+                BusPassage.create_from_bus_data(session, bus_stops[i % len(bus_stops)], bus_data)
+        finally:
+            session.close()
+
+    def bulk_create():
+        session = get_session(engine)
+        try:
+            BusPassage.bulk_create(session, filas)
+            session.commit()
+        finally:
+            session.close()
+
+    def vaciar():
+        with engine.begin() as conn:
+            conn.execute(BusPassage.__table__.delete())
+
+    return [
+        medir(f"BusPassage.create_from_bus_data ({PASADAS_UNITARIAS})", create_from_bus_data,
+              PASADAS_UNITARIAS, preparar=vaciar),
+        medir(f"BusPassage.bulk_create ({PASADAS_UNITARIAS})", bulk_create, PASADAS_UNITARIAS, preparar=vaciar),
+    ]
+
+
+def bench_consultas(contexto):
+    import query_passages
+
+    engine = contexto["engine"]
+    bus_stops = contexto["bus_stops"]
+    with engine.begin() as conn:
+        conn.execute(BusPassage.__table__.delete())
+
+    print(f"  (cargando {PASADAS_CONSULTAS:,} pasadas...)")
+    session = get_session(engine)
+    try:
+        for inicio in range(0, PASADAS_CONSULTAS, 100_000):
+            lote = min(100_000, PASADAS_CONSULTAS - inicio)
+            BusPassage.bulk_create(session, generar_pasadas([s.id for s in bus_stops], lote, semilla=inicio))
+            session.commit()
+    finally:
+        session.close()
+
+    parada = bus_stops[0].busstop_id
+    return [
+        medir(f"listar_paradas_monitoreadas ({PASADAS_CONSULTAS:,} pasadas)",
+              query_passages.listar_paradas_monitoreadas),
+        medir(f"estadisticas_linea 7 días ({PASADAS_CONSULTAS:,} pasadas)",
+              lambda: query_passages.estadisticas_linea("150")),
+        medir(f"estadisticas_linea en parada ({PASADAS_CONSULTAS:,} pasadas)",
+              lambda: query_passages.estadisticas_linea("150", parada)),
+        medir(f"pasadas_hoy ({PASADAS_CONSULTAS:,} pasadas)", lambda: query_passages.pasadas_hoy(parada)),
+    ]
+
+
+def bench_horarios(contexto):
+    import analizar_datos
+
+    import cache_horarios
+
+    ruta = os.path.join(contexto["directorio"], "datos_stm.csv")
+    generar_horarios(ruta, VARIANTES_HORARIOS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = analizar_datos.leer_datos_stm(ruta, usar_cache=False)
+    print(f"  (horarios sintéticos: {len(df):,} filas)")
+
+    rng = random.Random(0)
+    paradas = [str(rng.randint(1, PARADAS)) for _ in range(20)]
+    horas = [f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}" for _ in paradas]
+    consultas = [(str(rng.randint(1, PARADAS)), rng.randint(1, 3), rng.randint(0, 24 * 60 - 1)) for _ in range(5_000)]
+    indice = analizar_datos.IndiceHorarios(df)
+    todas = [str(p) for p in range(1, PARADAS + 1)]
+
+    resultados = [
+        medir("leer_datos_stm", lambda: analizar_datos.leer_datos_stm(ruta, usar_cache=False), len(df), repeticiones=1),
+        medir("cache_horarios.guardar_cache", lambda: cache_horarios.guardar_cache(df, ruta), len(df), repeticiones=1),
+        medir("leer_datos_stm (desde caché)", lambda: analizar_datos.leer_datos_stm(ruta), len(df)),
+        medir(f"buscar_proximo_omnibus ({len(paradas)} consultas)",
+              lambda: [analizar_datos.buscar_proximo_omnibus(df, p, tipo_dia=1, hora_actual=h)
+                       for p, h in zip(paradas, horas)], len(paradas), repeticiones=1),
+        medir("IndiceHorarios (construcción)", lambda: analizar_datos.IndiceHorarios(df), len(df), repeticiones=1),
+        medir(f"IndiceHorarios.proximos ({len(consultas)} consultas)",
+              lambda: [indice.proximos(p, t, m) for p, t, m in consultas], len(consultas)),
+        medir(f"proximos_omnibus_batch ({PARADAS} paradas x 2 horas)",
+              lambda: analizar_datos.proximos_omnibus_batch(indice, todas, 1, ["08:00", "18:00"]), 2 * PARADAS),
+    ]
+    shutil.rmtree(cache_horarios.directorio_cache(ruta), ignore_errors=True)
+    return resultados
+
+
+BENCHMARKS = {
+    "distancias": bench_distancias,
+    "paradas": bench_paradas,
+    "pasadas": bench_pasadas,
+    "consultas": bench_consultas,
+    "horarios": bench_horarios,
+}
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def comparar(resultados, ruta_base):
+    """Muestra la relación de tiempos contra un JSON de resultados anterior"""
+    with open(ruta_base) as f:
+        base = {r["nombre"]: r for r in json.load(f)["resultados"]}
+
+    print(f"\nComparación contra {ruta_base} (< 1 = más rápido ahora):")
+    for r in resultados:
+        anterior = base.get(r["nombre"])
+        if anterior and anterior["min_s"]:
+            print(f"  {r['nombre']:50s} | {r['min_s'] / anterior['min_s']:>6.2f}x")
+
+
+def main():
+    global PASADAS_CONSULTAS
+
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de los caminos críticos")
+    parser.add_argument("--solo", nargs="*", choices=list(BENCHMARKS), help="Correr solo estos grupos")
+    parser.add_argument("--pasadas", type=int, default=PASADAS_CONSULTAS, help="Pasadas para las consultas")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto .cache/benchmarks/<commit>.json)")
+    parser.add_argument("--comparar", metavar="JSON", help="Resultados anteriores contra los que comparar")
+    args = parser.parse_args()
+    PASADAS_CONSULTAS = args.pasadas
+
+    elegidos = set(args.solo or BENCHMARKS)
+    if elegidos & {"pasadas", "consultas"}:
+        elegidos.add("paradas")  # Las pasadas necesitan las paradas cargadas
+    grupos = [g for g in BENCHMARKS if g in elegidos]
+
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as directorio:
+        database_url = f"sqlite:///{os.path.join(directorio, 'bench.sqlite3')}"
+        # query_passages abre sus propias sesiones con la configuración del entorno
+        os.environ["DATABASE_URL"] = database_url
+        engine = get_db_engine(database_url)
+        Base.metadata.create_all(engine)
+        contexto = {"engine": engine, "directorio": directorio}
+
+        resultados = []
+        for grupo in grupos:
+            print(f"\n[{grupo}]")
+            resultados.extend(BENCHMARKS[grupo](contexto))
+        dispose_engines(database_url)
+
+    commit = commit_actual()
+    salida = args.salida or os.path.join(RESULTADOS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w") as f:
+        json.dump({
+            "commit": commit,
+            "fecha": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "base_de_datos": "sqlite",
+            "resultados": resultados,
+        }, f, indent=2)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 class BusPassage < ApplicationRecord
+  # La tabla está particionada por mes y su PK es (id, detected_at); id sigue siendo único
+  self.primary_key = :id
+
   belongs_to :bus_stop
 
   validates :line, :detected_at, presence: true
@@ -13,7 +16,8 @@ class BusPassage < ApplicationRecord
       bus_stop: bus_stop,
       line: bus_data["line"],
       destination: bus_data["destination"],
-      bus_code: bus_data["busCode"],
+      # /buses no manda busCode: el código del bondi es su busId (igual que en el tracker)
+      bus_code: (bus_data["busCode"].presence || bus_data["busId"])&.to_s,
       bus_latitude: bus_data.dig("location", "coordinates", 1),
       bus_longitude: bus_data.dig("location", "coordinates", 0),
       detected_at: detected_at,
@@ -0,0 +1,8 @@
+class BusPassageCooldown < ApplicationRecord
+  belongs_to :bus_stop
+
+  validates :bus_code, :detected_at, presence: true
+  validates :bus_code, uniqueness: { scope: :bus_stop_id }
+
+  scope :active_since, ->(time) { where("detected_at >= ?", time) }
+end
@@ -0,0 +1,13 @@
+class BusPassageRollup < ApplicationRecord
+  belongs_to :bus_stop
+
+  validates :line, :hour, presence: true
+
+  scope :by_line, ->(line) { where(line: line) }
+  scope :for_stop, ->(stop_id) { where(bus_stop_id: stop_id) }
+  scope :since, ->(time) { where("hour >= ?", time) }
+
+  def mean_headway_seconds
+    headway_count.positive? ? headway_sum_seconds / headway_count : nil
+  end
+end
@@ -1,5 +1,7 @@
 class BusStop < ApplicationRecord
   has_many :bus_passages, dependent: :destroy
+  has_many :bus_passage_rollups, dependent: :destroy
+  has_many :bus_passage_cooldowns, dependent: :delete_all
   has_many :bus_schedules, dependent: :destroy
   has_many :line_variants, through: :bus_schedules
   has_many :bus_trackings, dependent: :destroy
@@ -39,5 +39,9 @@ module BusTracker
     # Don't generate system test files.
     config.generators.system_tests = nil
     config.time_zone = "America/Montevideo"
+
+    # bus_passages está particionada por mes (PARTITION BY RANGE), algo que
+    # schema.rb no puede expresar: el esquema se vuelca como SQL en db/*structure.sql
+    config.active_record.schema_format = :sql
   end
 end
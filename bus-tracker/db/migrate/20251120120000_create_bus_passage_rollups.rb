@@ -0,0 +1,20 @@
+class CreateBusPassageRollups < ActiveRecord::Migration[8.0]
+  def change
+    create_table :bus_passage_rollups do |t|
+      t.references :bus_stop, null: false, foreign_key: true, index: false
+      t.string :line, null: false
+      t.datetime :hour, null: false, comment: "Inicio de la hora (UTC)"
+      t.integer :passages, default: 0, null: false
+      t.datetime :first_detected_at, null: false
+      t.datetime :last_detected_at, null: false
+      t.float :headway_sum_seconds, default: 0.0, null: false
+      t.integer :headway_count, default: 0, null: false
+      t.float :max_headway_seconds
+
+      t.timestamps
+    end
+
+    add_index :bus_passage_rollups, [:bus_stop_id, :line, :hour], unique: true, name: "index_bus_passage_rollups_on_stop_line_hour"
+    add_index :bus_passage_rollups, :hour
+  end
+end
@@ -0,0 +1,51 @@
+class PartitionBusPassages < ActiveRecord::Migration[8.0]
+  MONTHS_AHEAD = 3
+
+  def up
+    execute "ALTER TABLE bus_passages RENAME TO bus_passages_unpartitioned"
+
+    execute <<~SQL
+      CREATE TABLE bus_passages (LIKE bus_passages_unpartitioned INCLUDING DEFAULTS)
+      PARTITION BY RANGE (detected_at)
+    SQL
+    # La clave de partición tiene que ser parte de la clave primaria
+    execute "ALTER TABLE bus_passages ADD PRIMARY KEY (id, detected_at)"
+    execute "CREATE TABLE bus_passages_default PARTITION OF bus_passages DEFAULT"
+
+    first = select_value("SELECT min(detected_at) FROM bus_passages_unpartitioned")
+    month = (first ? first.to_date : Date.current).beginning_of_month
+    last = Date.current.beginning_of_month >> MONTHS_AHEAD
+    while month <= last
+      execute <<~SQL
+        CREATE TABLE bus_passages_#{month.strftime('%Y_%m')} PARTITION OF bus_passages
+        FOR VALUES FROM ('#{month}') TO ('#{month >> 1}')
+      SQL
+      month >>= 1
+    end
+
+    execute "INSERT INTO bus_passages SELECT * FROM bus_passages_unpartitioned"
+    execute "ALTER SEQUENCE bus_passages_id_seq OWNED BY bus_passages.id"
+    drop_table :bus_passages_unpartitioned
+
+    add_foreign_key :bus_passages, :bus_stops
+    add_index :bus_passages, :bus_stop_id
+    add_index :bus_passages, [:bus_stop_id, :detected_at]
+    add_index :bus_passages, :line
+    add_index :bus_passages, :detected_at
+  end
+
+  def down
+    execute "ALTER TABLE bus_passages RENAME TO bus_passages_partitioned"
+    execute "CREATE TABLE bus_passages (LIKE bus_passages_partitioned INCLUDING DEFAULTS)"
+    execute "ALTER TABLE bus_passages ADD PRIMARY KEY (id)"
+    execute "INSERT INTO bus_passages SELECT * FROM bus_passages_partitioned"
+    execute "ALTER SEQUENCE bus_passages_id_seq OWNED BY bus_passages.id"
+    execute "DROP TABLE bus_passages_partitioned CASCADE"
+
+    add_foreign_key :bus_passages, :bus_stops
+    add_index :bus_passages, :bus_stop_id
+    add_index :bus_passages, [:bus_stop_id, :detected_at]
+    add_index :bus_passages, :line
+    add_index :bus_passages, :detected_at
+  end
+end
@@ -0,0 +1,17 @@
+class CreateBusPassageCooldowns < ActiveRecord::Migration[8.0]
+  def change
+    # Una fila por bondi y parada con su última pasada registrada (la ventana de cooldown).
+    # La unicidad no puede ir en bus_passages: en una tabla particionada todo índice único
+    # tiene que incluir detected_at.
+    create_table :bus_passage_cooldowns do |t|
+      t.references :bus_stop, null: false, foreign_key: true, index: false
+      t.string :bus_code, null: false
+      t.datetime :detected_at, null: false, comment: "Última pasada registrada (UTC)"
+
+      t.timestamps
+    end
+
+    add_index :bus_passage_cooldowns, [:bus_stop_id, :bus_code], unique: true, name: "index_bus_passage_cooldowns_on_stop_and_bus"
+    add_index :bus_passage_cooldowns, :detected_at
+  end
+end
@@ -0,0 +1,1400 @@
+SET statement_timeout = 0;
+SET lock_timeout = 0;
+SET idle_in_transaction_session_timeout = 0;
+SET client_encoding = 'UTF8';
+SET standard_conforming_strings = on;
+SELECT pg_catalog.set_config('search_path', '', false);
+SET check_function_bodies = false;
+SET xmloption = content;
+SET client_min_messages = warning;
+SET row_security = off;
+
+SET default_tablespace = '';
+
+SET default_table_access_method = heap;
+
+--
+-- Name: ar_internal_metadata; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.ar_internal_metadata (
+    key character varying NOT NULL,
+    value character varying,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_passage_cooldowns; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passage_cooldowns (
+    id bigint NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    bus_code character varying NOT NULL,
+    detected_at timestamp(6) without time zone NOT NULL,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: COLUMN bus_passage_cooldowns.detected_at; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.bus_passage_cooldowns.detected_at IS 'Última pasada registrada (UTC)';
+
+
+--
+-- Name: bus_passage_cooldowns_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.bus_passage_cooldowns_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: bus_passage_cooldowns_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.bus_passage_cooldowns_id_seq OWNED BY public.bus_passage_cooldowns.id;
+
+
+--
+-- Name: bus_passage_rollups; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passage_rollups (
+    id bigint NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    line character varying NOT NULL,
+    hour timestamp(6) without time zone NOT NULL,
+    passages integer DEFAULT 0 NOT NULL,
+    first_detected_at timestamp(6) without time zone NOT NULL,
+    last_detected_at timestamp(6) without time zone NOT NULL,
+    headway_sum_seconds double precision DEFAULT 0.0 NOT NULL,
+    headway_count integer DEFAULT 0 NOT NULL,
+    max_headway_seconds double precision,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: COLUMN bus_passage_rollups.hour; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.bus_passage_rollups.hour IS 'Inicio de la hora (UTC)';
+
+
+--
+-- Name: bus_passage_rollups_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.bus_passage_rollups_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: bus_passage_rollups_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.bus_passage_rollups_id_seq OWNED BY public.bus_passage_rollups.id;
+
+
+--
+-- Name: bus_passages; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passages (
+    id bigint NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    line character varying NOT NULL,
+    destination character varying,
+    bus_code character varying,
+    bus_latitude numeric(10,8),
+    bus_longitude numeric(11,8),
+    detected_at timestamp(6) without time zone NOT NULL,
+    eta_minutes integer,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+)
+PARTITION BY RANGE (detected_at);
+
+
+--
+-- Name: bus_passages_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.bus_passages_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: bus_passages_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.bus_passages_id_seq OWNED BY public.bus_passages.id;
+
+
+--
+-- Name: bus_passages_2025_11; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passages_2025_11 (
+    id bigint DEFAULT nextval('public.bus_passages_id_seq'::regclass) NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    line character varying NOT NULL,
+    destination character varying,
+    bus_code character varying,
+    bus_latitude numeric(10,8),
+    bus_longitude numeric(11,8),
+    detected_at timestamp(6) without time zone NOT NULL,
+    eta_minutes integer,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_passages_2025_12; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passages_2025_12 (
+    id bigint DEFAULT nextval('public.bus_passages_id_seq'::regclass) NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    line character varying NOT NULL,
+    destination character varying,
+    bus_code character varying,
+    bus_latitude numeric(10,8),
+    bus_longitude numeric(11,8),
+    detected_at timestamp(6) without time zone NOT NULL,
+    eta_minutes integer,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_passages_2026_01; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passages_2026_01 (
+    id bigint DEFAULT nextval('public.bus_passages_id_seq'::regclass) NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    line character varying NOT NULL,
+    destination character varying,
+    bus_code character varying,
+    bus_latitude numeric(10,8),
+    bus_longitude numeric(11,8),
+    detected_at timestamp(6) without time zone NOT NULL,
+    eta_minutes integer,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_passages_2026_02; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passages_2026_02 (
+    id bigint DEFAULT nextval('public.bus_passages_id_seq'::regclass) NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    line character varying NOT NULL,
+    destination character varying,
+    bus_code character varying,
+    bus_latitude numeric(10,8),
+    bus_longitude numeric(11,8),
+    detected_at timestamp(6) without time zone NOT NULL,
+    eta_minutes integer,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_passages_default; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_passages_default (
+    id bigint DEFAULT nextval('public.bus_passages_id_seq'::regclass) NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    line character varying NOT NULL,
+    destination character varying,
+    bus_code character varying,
+    bus_latitude numeric(10,8),
+    bus_longitude numeric(11,8),
+    detected_at timestamp(6) without time zone NOT NULL,
+    eta_minutes integer,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_positions; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_positions (
+    id bigint NOT NULL,
+    bus_tracking_id bigint NOT NULL,
+    latitude numeric(10,7) NOT NULL,
+    longitude numeric(10,7) NOT NULL,
+    distance_to_stop numeric(10,2) NOT NULL,
+    speed integer,
+    api_timestamp timestamp(6) without time zone NOT NULL,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_positions_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.bus_positions_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: bus_positions_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.bus_positions_id_seq OWNED BY public.bus_positions.id;
+
+
+--
+-- Name: bus_schedules; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_schedules (
+    id bigint NOT NULL,
+    line_variant_id bigint NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    day_type integer NOT NULL,
+    frequency integer NOT NULL,
+    ordinal integer NOT NULL,
+    scheduled_time integer NOT NULL,
+    previous_day character varying(1) DEFAULT 'N'::character varying NOT NULL,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: COLUMN bus_schedules.day_type; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.bus_schedules.day_type IS '1=Hábil, 2=Sábado, 3=Domingo';
+
+
+--
+-- Name: COLUMN bus_schedules.frequency; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.bus_schedules.frequency IS 'Hora de salida en formato hmm0';
+
+
+--
+-- Name: COLUMN bus_schedules.ordinal; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.bus_schedules.ordinal IS 'Número ordinal de parada en recorrido';
+
+
+--
+-- Name: COLUMN bus_schedules.scheduled_time; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.bus_schedules.scheduled_time IS 'Hora de pasada en formato hmm';
+
+
+--
+-- Name: COLUMN bus_schedules.previous_day; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.bus_schedules.previous_day IS 'N=mismo día, S=día anterior, *=especial';
+
+
+--
+-- Name: bus_schedules_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.bus_schedules_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: bus_schedules_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.bus_schedules_id_seq OWNED BY public.bus_schedules.id;
+
+
+--
+-- Name: bus_stops; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_stops (
+    id bigint NOT NULL,
+    busstop_id integer NOT NULL,
+    street1 character varying,
+    street2 character varying,
+    street1_id integer,
+    street2_id integer,
+    latitude numeric(10,8) NOT NULL,
+    longitude numeric(11,8) NOT NULL,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_stops_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.bus_stops_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: bus_stops_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.bus_stops_id_seq OWNED BY public.bus_stops.id;
+
+
+--
+-- Name: bus_trackings; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bus_trackings (
+    id bigint NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    bus_id integer NOT NULL,
+    line character varying NOT NULL,
+    line_variant_id integer,
+    latitude numeric(10,7),
+    longitude numeric(10,7),
+    distance_to_stop numeric(10,2),
+    speed integer,
+    api_timestamp timestamp(6) without time zone,
+    last_seen_at timestamp(6) without time zone,
+    tracking_active boolean DEFAULT true NOT NULL,
+    missing_count integer DEFAULT 0 NOT NULL,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: bus_trackings_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.bus_trackings_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: bus_trackings_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.bus_trackings_id_seq OWNED BY public.bus_trackings.id;
+
+
+--
+-- Name: line_variants; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.line_variants (
+    id bigint NOT NULL,
+    line_id bigint NOT NULL,
+    line_number character varying NOT NULL,
+    origin character varying NOT NULL,
+    destination character varying NOT NULL,
+    subline character varying,
+    special boolean DEFAULT false NOT NULL,
+    api_line_variant_id integer NOT NULL,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: line_variants_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.line_variants_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: line_variants_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.line_variants_id_seq OWNED BY public.line_variants.id;
+
+
+--
+-- Name: lines; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.lines (
+    id bigint NOT NULL,
+    line_number character varying NOT NULL,
+    name character varying,
+    api_line_id integer,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: lines_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.lines_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: lines_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.lines_id_seq OWNED BY public.lines.id;
+
+
+--
+-- Name: schema_migrations; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.schema_migrations (
+    version character varying NOT NULL
+);
+
+
+--
+-- Name: stop_trackings; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.stop_trackings (
+    id bigint NOT NULL,
+    bus_stop_id bigint NOT NULL,
+    lines text,
+    line_variant_ids text,
+    active boolean DEFAULT true NOT NULL,
+    started_at timestamp(6) without time zone,
+    last_job_run_at timestamp(6) without time zone,
+    created_at timestamp(6) without time zone NOT NULL,
+    updated_at timestamp(6) without time zone NOT NULL
+);
+
+
+--
+-- Name: stop_trackings_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+CREATE SEQUENCE public.stop_trackings_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+--
+-- Name: stop_trackings_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: -
+--
+
+ALTER SEQUENCE public.stop_trackings_id_seq OWNED BY public.stop_trackings.id;
+
+
+--
+-- Name: bus_passages_2025_11; Type: TABLE ATTACH; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages ATTACH PARTITION public.bus_passages_2025_11 FOR VALUES FROM ('2025-11-01 00:00:00') TO ('2025-12-01 00:00:00');
+
+
+--
+-- Name: bus_passages_2025_12; Type: TABLE ATTACH; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages ATTACH PARTITION public.bus_passages_2025_12 FOR VALUES FROM ('2025-12-01 00:00:00') TO ('2026-01-01 00:00:00');
+
+
+--
+-- Name: bus_passages_2026_01; Type: TABLE ATTACH; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages ATTACH PARTITION public.bus_passages_2026_01 FOR VALUES FROM ('2026-01-01 00:00:00') TO ('2026-02-01 00:00:00');
+
+
+--
+-- Name: bus_passages_2026_02; Type: TABLE ATTACH; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages ATTACH PARTITION public.bus_passages_2026_02 FOR VALUES FROM ('2026-02-01 00:00:00') TO ('2026-03-01 00:00:00');
+
+
+--
+-- Name: bus_passages_default; Type: TABLE ATTACH; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages ATTACH PARTITION public.bus_passages_default DEFAULT;
+
+
+--
+-- Name: bus_passage_cooldowns id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passage_cooldowns ALTER COLUMN id SET DEFAULT nextval('public.bus_passage_cooldowns_id_seq'::regclass);
+
+
+--
+-- Name: bus_passage_rollups id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passage_rollups ALTER COLUMN id SET DEFAULT nextval('public.bus_passage_rollups_id_seq'::regclass);
+
+
+--
+-- Name: bus_passages id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages ALTER COLUMN id SET DEFAULT nextval('public.bus_passages_id_seq'::regclass);
+
+
+--
+-- Name: bus_positions id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_positions ALTER COLUMN id SET DEFAULT nextval('public.bus_positions_id_seq'::regclass);
+
+
+--
+-- Name: bus_schedules id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_schedules ALTER COLUMN id SET DEFAULT nextval('public.bus_schedules_id_seq'::regclass);
+
+
+--
+-- Name: bus_stops id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_stops ALTER COLUMN id SET DEFAULT nextval('public.bus_stops_id_seq'::regclass);
+
+
+--
+-- Name: bus_trackings id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_trackings ALTER COLUMN id SET DEFAULT nextval('public.bus_trackings_id_seq'::regclass);
+
+
+--
+-- Name: line_variants id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.line_variants ALTER COLUMN id SET DEFAULT nextval('public.line_variants_id_seq'::regclass);
+
+
+--
+-- Name: lines id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.lines ALTER COLUMN id SET DEFAULT nextval('public.lines_id_seq'::regclass);
+
+
+--
+-- Name: stop_trackings id; Type: DEFAULT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.stop_trackings ALTER COLUMN id SET DEFAULT nextval('public.stop_trackings_id_seq'::regclass);
+
+
+--
+-- Name: ar_internal_metadata ar_internal_metadata_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.ar_internal_metadata
+    ADD CONSTRAINT ar_internal_metadata_pkey PRIMARY KEY (key);
+
+
+--
+-- Name: bus_passage_cooldowns bus_passage_cooldowns_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passage_cooldowns
+    ADD CONSTRAINT bus_passage_cooldowns_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: bus_passage_rollups bus_passage_rollups_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passage_rollups
+    ADD CONSTRAINT bus_passage_rollups_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: bus_passages bus_passages_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages
+    ADD CONSTRAINT bus_passages_pkey PRIMARY KEY (id, detected_at);
+
+
+--
+-- Name: bus_passages_2025_11 bus_passages_2025_11_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages_2025_11
+    ADD CONSTRAINT bus_passages_2025_11_pkey PRIMARY KEY (id, detected_at);
+
+
+--
+-- Name: bus_passages_2025_12 bus_passages_2025_12_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages_2025_12
+    ADD CONSTRAINT bus_passages_2025_12_pkey PRIMARY KEY (id, detected_at);
+
+
+--
+-- Name: bus_passages_2026_01 bus_passages_2026_01_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages_2026_01
+    ADD CONSTRAINT bus_passages_2026_01_pkey PRIMARY KEY (id, detected_at);
+
+
+--
+-- Name: bus_passages_2026_02 bus_passages_2026_02_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages_2026_02
+    ADD CONSTRAINT bus_passages_2026_02_pkey PRIMARY KEY (id, detected_at);
+
+
+--
+-- Name: bus_passages_default bus_passages_default_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passages_default
+    ADD CONSTRAINT bus_passages_default_pkey PRIMARY KEY (id, detected_at);
+
+
+--
+-- Name: bus_positions bus_positions_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_positions
+    ADD CONSTRAINT bus_positions_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: bus_schedules bus_schedules_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_schedules
+    ADD CONSTRAINT bus_schedules_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: bus_stops bus_stops_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_stops
+    ADD CONSTRAINT bus_stops_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: bus_trackings bus_trackings_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_trackings
+    ADD CONSTRAINT bus_trackings_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: line_variants line_variants_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.line_variants
+    ADD CONSTRAINT line_variants_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: lines lines_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.lines
+    ADD CONSTRAINT lines_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: schema_migrations schema_migrations_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.schema_migrations
+    ADD CONSTRAINT schema_migrations_pkey PRIMARY KEY (version);
+
+
+--
+-- Name: stop_trackings stop_trackings_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.stop_trackings
+    ADD CONSTRAINT stop_trackings_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: index_bus_passages_on_bus_stop_id_and_detected_at; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_passages_on_bus_stop_id_and_detected_at ON ONLY public.bus_passages USING btree (bus_stop_id, detected_at);
+
+
+--
+-- Name: bus_passages_2025_11_bus_stop_id_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_11_bus_stop_id_detected_at_idx ON public.bus_passages_2025_11 USING btree (bus_stop_id, detected_at);
+
+
+--
+-- Name: index_bus_passages_on_bus_stop_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_passages_on_bus_stop_id ON ONLY public.bus_passages USING btree (bus_stop_id);
+
+
+--
+-- Name: bus_passages_2025_11_bus_stop_id_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_11_bus_stop_id_idx ON public.bus_passages_2025_11 USING btree (bus_stop_id);
+
+
+--
+-- Name: index_bus_passages_on_detected_at; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_passages_on_detected_at ON ONLY public.bus_passages USING btree (detected_at);
+
+
+--
+-- Name: bus_passages_2025_11_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_11_detected_at_idx ON public.bus_passages_2025_11 USING btree (detected_at);
+
+
+--
+-- Name: index_bus_passages_on_line; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_passages_on_line ON ONLY public.bus_passages USING btree (line);
+
+
+--
+-- Name: bus_passages_2025_11_line_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_11_line_idx ON public.bus_passages_2025_11 USING btree (line);
+
+
+--
+-- Name: bus_passages_2025_12_bus_stop_id_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_12_bus_stop_id_detected_at_idx ON public.bus_passages_2025_12 USING btree (bus_stop_id, detected_at);
+
+
+--
+-- Name: bus_passages_2025_12_bus_stop_id_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_12_bus_stop_id_idx ON public.bus_passages_2025_12 USING btree (bus_stop_id);
+
+
+--
+-- Name: bus_passages_2025_12_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_12_detected_at_idx ON public.bus_passages_2025_12 USING btree (detected_at);
+
+
+--
+-- Name: bus_passages_2025_12_line_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2025_12_line_idx ON public.bus_passages_2025_12 USING btree (line);
+
+
+--
+-- Name: bus_passages_2026_01_bus_stop_id_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_01_bus_stop_id_detected_at_idx ON public.bus_passages_2026_01 USING btree (bus_stop_id, detected_at);
+
+
+--
+-- Name: bus_passages_2026_01_bus_stop_id_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_01_bus_stop_id_idx ON public.bus_passages_2026_01 USING btree (bus_stop_id);
+
+
+--
+-- Name: bus_passages_2026_01_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_01_detected_at_idx ON public.bus_passages_2026_01 USING btree (detected_at);
+
+
+--
+-- Name: bus_passages_2026_01_line_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_01_line_idx ON public.bus_passages_2026_01 USING btree (line);
+
+
+--
+-- Name: bus_passages_2026_02_bus_stop_id_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_02_bus_stop_id_detected_at_idx ON public.bus_passages_2026_02 USING btree (bus_stop_id, detected_at);
+
+
+--
+-- Name: bus_passages_2026_02_bus_stop_id_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_02_bus_stop_id_idx ON public.bus_passages_2026_02 USING btree (bus_stop_id);
+
+
+--
+-- Name: bus_passages_2026_02_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_02_detected_at_idx ON public.bus_passages_2026_02 USING btree (detected_at);
+
+
+--
+-- Name: bus_passages_2026_02_line_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_2026_02_line_idx ON public.bus_passages_2026_02 USING btree (line);
+
+
+--
+-- Name: bus_passages_default_bus_stop_id_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_default_bus_stop_id_detected_at_idx ON public.bus_passages_default USING btree (bus_stop_id, detected_at);
+
+
+--
+-- Name: bus_passages_default_bus_stop_id_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_default_bus_stop_id_idx ON public.bus_passages_default USING btree (bus_stop_id);
+
+
+--
+-- Name: bus_passages_default_detected_at_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_default_detected_at_idx ON public.bus_passages_default USING btree (detected_at);
+
+
+--
+-- Name: bus_passages_default_line_idx; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX bus_passages_default_line_idx ON public.bus_passages_default USING btree (line);
+
+
+--
+-- Name: idx_bus_positions_tracking_time; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_bus_positions_tracking_time ON public.bus_positions USING btree (bus_tracking_id, api_timestamp);
+
+
+--
+-- Name: idx_bus_trackings_stop_active; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_bus_trackings_stop_active ON public.bus_trackings USING btree (bus_stop_id, tracking_active);
+
+
+--
+-- Name: idx_bus_trackings_stop_bus; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_bus_trackings_stop_bus ON public.bus_trackings USING btree (bus_stop_id, bus_id);
+
+
+--
+-- Name: idx_schedules_stop_day_time; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_schedules_stop_day_time ON public.bus_schedules USING btree (bus_stop_id, day_type, scheduled_time);
+
+
+--
+-- Name: idx_schedules_variant_stop_day_freq; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX idx_schedules_variant_stop_day_freq ON public.bus_schedules USING btree (line_variant_id, bus_stop_id, day_type, frequency);
+
+
+--
+-- Name: index_bus_passage_cooldowns_on_detected_at; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_passage_cooldowns_on_detected_at ON public.bus_passage_cooldowns USING btree (detected_at);
+
+
+--
+-- Name: index_bus_passage_cooldowns_on_stop_and_bus; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE UNIQUE INDEX index_bus_passage_cooldowns_on_stop_and_bus ON public.bus_passage_cooldowns USING btree (bus_stop_id, bus_code);
+
+
+--
+-- Name: index_bus_passage_rollups_on_hour; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_passage_rollups_on_hour ON public.bus_passage_rollups USING btree (hour);
+
+
+--
+-- Name: index_bus_passage_rollups_on_stop_line_hour; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE UNIQUE INDEX index_bus_passage_rollups_on_stop_line_hour ON public.bus_passage_rollups USING btree (bus_stop_id, line, hour);
+
+
+--
+-- Name: index_bus_positions_on_api_timestamp; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_positions_on_api_timestamp ON public.bus_positions USING btree (api_timestamp);
+
+
+--
+-- Name: index_bus_positions_on_bus_tracking_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_positions_on_bus_tracking_id ON public.bus_positions USING btree (bus_tracking_id);
+
+
+--
+-- Name: index_bus_schedules_on_bus_stop_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_schedules_on_bus_stop_id ON public.bus_schedules USING btree (bus_stop_id);
+
+
+--
+-- Name: index_bus_schedules_on_day_type; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_schedules_on_day_type ON public.bus_schedules USING btree (day_type);
+
+
+--
+-- Name: index_bus_schedules_on_line_variant_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_schedules_on_line_variant_id ON public.bus_schedules USING btree (line_variant_id);
+
+
+--
+-- Name: index_bus_stops_on_busstop_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE UNIQUE INDEX index_bus_stops_on_busstop_id ON public.bus_stops USING btree (busstop_id);
+
+
+--
+-- Name: index_bus_stops_on_latitude_and_longitude; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_stops_on_latitude_and_longitude ON public.bus_stops USING btree (latitude, longitude);
+
+
+--
+-- Name: index_bus_trackings_on_bus_stop_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_trackings_on_bus_stop_id ON public.bus_trackings USING btree (bus_stop_id);
+
+
+--
+-- Name: index_bus_trackings_on_last_seen_at; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_bus_trackings_on_last_seen_at ON public.bus_trackings USING btree (last_seen_at);
+
+
+--
+-- Name: index_line_variants_on_api_line_variant_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE UNIQUE INDEX index_line_variants_on_api_line_variant_id ON public.line_variants USING btree (api_line_variant_id);
+
+
+--
+-- Name: index_line_variants_on_line_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_line_variants_on_line_id ON public.line_variants USING btree (line_id);
+
+
+--
+-- Name: index_line_variants_on_line_number; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_line_variants_on_line_number ON public.line_variants USING btree (line_number);
+
+
+--
+-- Name: index_lines_on_api_line_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE UNIQUE INDEX index_lines_on_api_line_id ON public.lines USING btree (api_line_id);
+
+
+--
+-- Name: index_lines_on_line_number; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE UNIQUE INDEX index_lines_on_line_number ON public.lines USING btree (line_number);
+
+
+--
+-- Name: index_stop_trackings_on_bus_stop_id; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_stop_trackings_on_bus_stop_id ON public.stop_trackings USING btree (bus_stop_id);
+
+
+--
+-- Name: index_stop_trackings_on_bus_stop_id_and_active; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX index_stop_trackings_on_bus_stop_id_and_active ON public.stop_trackings USING btree (bus_stop_id, active);
+
+
+--
+-- Name: bus_passages_2025_11_bus_stop_id_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id_and_detected_at ATTACH PARTITION public.bus_passages_2025_11_bus_stop_id_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2025_11_bus_stop_id_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id ATTACH PARTITION public.bus_passages_2025_11_bus_stop_id_idx;
+
+
+--
+-- Name: bus_passages_2025_11_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_detected_at ATTACH PARTITION public.bus_passages_2025_11_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2025_11_line_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_line ATTACH PARTITION public.bus_passages_2025_11_line_idx;
+
+
+--
+-- Name: bus_passages_2025_11_pkey; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.bus_passages_pkey ATTACH PARTITION public.bus_passages_2025_11_pkey;
+
+
+--
+-- Name: bus_passages_2025_12_bus_stop_id_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id_and_detected_at ATTACH PARTITION public.bus_passages_2025_12_bus_stop_id_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2025_12_bus_stop_id_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id ATTACH PARTITION public.bus_passages_2025_12_bus_stop_id_idx;
+
+
+--
+-- Name: bus_passages_2025_12_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_detected_at ATTACH PARTITION public.bus_passages_2025_12_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2025_12_line_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_line ATTACH PARTITION public.bus_passages_2025_12_line_idx;
+
+
+--
+-- Name: bus_passages_2025_12_pkey; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.bus_passages_pkey ATTACH PARTITION public.bus_passages_2025_12_pkey;
+
+
+--
+-- Name: bus_passages_2026_01_bus_stop_id_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id_and_detected_at ATTACH PARTITION public.bus_passages_2026_01_bus_stop_id_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2026_01_bus_stop_id_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id ATTACH PARTITION public.bus_passages_2026_01_bus_stop_id_idx;
+
+
+--
+-- Name: bus_passages_2026_01_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_detected_at ATTACH PARTITION public.bus_passages_2026_01_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2026_01_line_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_line ATTACH PARTITION public.bus_passages_2026_01_line_idx;
+
+
+--
+-- Name: bus_passages_2026_01_pkey; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.bus_passages_pkey ATTACH PARTITION public.bus_passages_2026_01_pkey;
+
+
+--
+-- Name: bus_passages_2026_02_bus_stop_id_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id_and_detected_at ATTACH PARTITION public.bus_passages_2026_02_bus_stop_id_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2026_02_bus_stop_id_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id ATTACH PARTITION public.bus_passages_2026_02_bus_stop_id_idx;
+
+
+--
+-- Name: bus_passages_2026_02_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_detected_at ATTACH PARTITION public.bus_passages_2026_02_detected_at_idx;
+
+
+--
+-- Name: bus_passages_2026_02_line_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_line ATTACH PARTITION public.bus_passages_2026_02_line_idx;
+
+
+--
+-- Name: bus_passages_2026_02_pkey; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.bus_passages_pkey ATTACH PARTITION public.bus_passages_2026_02_pkey;
+
+
+--
+-- Name: bus_passages_default_bus_stop_id_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id_and_detected_at ATTACH PARTITION public.bus_passages_default_bus_stop_id_detected_at_idx;
+
+
+--
+-- Name: bus_passages_default_bus_stop_id_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_bus_stop_id ATTACH PARTITION public.bus_passages_default_bus_stop_id_idx;
+
+
+--
+-- Name: bus_passages_default_detected_at_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_detected_at ATTACH PARTITION public.bus_passages_default_detected_at_idx;
+
+
+--
+-- Name: bus_passages_default_line_idx; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.index_bus_passages_on_line ATTACH PARTITION public.bus_passages_default_line_idx;
+
+
+--
+-- Name: bus_passages_default_pkey; Type: INDEX ATTACH; Schema: public; Owner: -
+--
+
+ALTER INDEX public.bus_passages_pkey ATTACH PARTITION public.bus_passages_default_pkey;
+
+
+--
+-- Name: bus_passage_cooldowns fk_rails_04db0ad83b; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passage_cooldowns
+    ADD CONSTRAINT fk_rails_04db0ad83b FOREIGN KEY (bus_stop_id) REFERENCES public.bus_stops(id);
+
+
+--
+-- Name: bus_positions fk_rails_09e3540bc0; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_positions
+    ADD CONSTRAINT fk_rails_09e3540bc0 FOREIGN KEY (bus_tracking_id) REFERENCES public.bus_trackings(id);
+
+
+--
+-- Name: bus_passage_rollups fk_rails_150f9146c9; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_passage_rollups
+    ADD CONSTRAINT fk_rails_150f9146c9 FOREIGN KEY (bus_stop_id) REFERENCES public.bus_stops(id);
+
+
+--
+-- Name: bus_schedules fk_rails_1fb03a42a8; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_schedules
+    ADD CONSTRAINT fk_rails_1fb03a42a8 FOREIGN KEY (bus_stop_id) REFERENCES public.bus_stops(id);
+
+
+--
+-- Name: bus_passages fk_rails_42c8f02c7c; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE public.bus_passages
+    ADD CONSTRAINT fk_rails_42c8f02c7c FOREIGN KEY (bus_stop_id) REFERENCES public.bus_stops(id);
+
+
+--
+-- Name: bus_trackings fk_rails_820793fd95; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_trackings
+    ADD CONSTRAINT fk_rails_820793fd95 FOREIGN KEY (bus_stop_id) REFERENCES public.bus_stops(id);
+
+
+--
+-- Name: line_variants fk_rails_a0eeeb7034; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.line_variants
+    ADD CONSTRAINT fk_rails_a0eeeb7034 FOREIGN KEY (line_id) REFERENCES public.lines(id);
+
+
+--
+-- Name: stop_trackings fk_rails_df946bb40d; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.stop_trackings
+    ADD CONSTRAINT fk_rails_df946bb40d FOREIGN KEY (bus_stop_id) REFERENCES public.bus_stops(id);
+
+
+--
+-- Name: bus_schedules fk_rails_f39eb4606f; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bus_schedules
+    ADD CONSTRAINT fk_rails_f39eb4606f FOREIGN KEY (line_variant_id) REFERENCES public.line_variants(id);
+
+
+--
+-- PostgreSQL database dump complete
+--
+
+
+SET search_path TO "$user", public;
+
+INSERT INTO "schema_migrations" (version) VALUES
+('20251124120000'),
+('20251122120000'),
+('20251120120000'),
+('20251116054311'),
+('20251116040631'),
+('20251116040621'),
+('20251116032416'),
+('20251116031113'),
+('20251116031112'),
+('20251115185407'),
+('20251115185357');
+
@@ -0,0 +1,122 @@
+"""
+Caché columnar de los horarios STM (datos_stm.csv)
+
+Cada columna se guarda como un .npy con el dtype entero más chico que
+alcance, y las columnas de texto como categóricas (códigos enteros + lista
+de categorías en meta.json). Al cargar, los .npy se abren memory-mapped: el
+arranque no parsea el CSV y las páginas solo se leen del disco cuando se usan.
+
+La caché se invalida si cambia el tamaño o la fecha de modificación del CSV.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from catalogos import CACHE_DIR
+
+VERSION = 1
+COLUMNAS_CATEGORICAS = ("cod_variante", "cod_ubic_parada", "dia_anterior")
+
+
+def directorio_cache(archivo_csv):
+    """Directorio de la caché de un CSV (uno por ruta absoluta)"""
+    ruta = os.path.abspath(archivo_csv)
+    sufijo = hashlib.sha1(ruta.encode("utf-8")).hexdigest()[:10]
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return os.path.join(CACHE_DIR, "horarios", f"{nombre}-{sufijo}")
+
+
+def _firma(archivo_csv):
+    estado = os.stat(archivo_csv)
+    return {"tamano": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+
+def _entero_compacto(valores):
+    """Convierte una columna entera al dtype más chico que contiene su rango"""
+    minimo, maximo = (int(valores.min()), int(valores.max())) if len(valores) else (0, 0)
+    # Siempre con signo, para que las restas no den vueltas
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= minimo and maximo <= np.iinfo(dtype).max:
+            return valores.astype(dtype)
+    return valores.astype(np.int64)
+
+
+def compactar(df):
+    """DataFrame con las columnas de texto como categóricas y los enteros en el dtype más chico"""
+    columnas = {}
+    for nombre in df.columns:
+        serie = df[nombre]
+        if nombre in COLUMNAS_CATEGORICAS:
+            columnas[nombre] = serie.astype("category")
+        elif pd.api.types.is_integer_dtype(serie):
+            columnas[nombre] = _entero_compacto(serie.to_numpy())
+        else:
+            columnas[nombre] = serie
+    return pd.DataFrame(columnas, index=df.index)
+
+
+def guardar_cache(df, archivo_csv):
+    """Escribe la caché columnar de un DataFrame de horarios leído de archivo_csv"""
+    destino = directorio_cache(archivo_csv)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    df = compactar(df)
+
+    meta = {
+        "version": VERSION,
+        "origen": os.path.abspath(archivo_csv),
+        **_firma(archivo_csv),
+        "filas": len(df),
+        "columnas": [],
+    }
+    temporal = tempfile.mkdtemp(dir=os.path.dirname(destino), prefix=".tmp-")
+    try:
+        for nombre in df.columns:
+            serie = df[nombre]
+            columna = {"nombre": nombre, "categorias": None}
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                valores = serie.cat.codes.to_numpy()
+                columna["categorias"] = [str(c) for c in serie.cat.categories]
+            else:
+                valores = serie.to_numpy()
+            np.save(os.path.join(temporal, f"{nombre}.npy"), valores)
+            meta["columnas"].append(columna)
+
+        # meta.json se escribe último: una caché sin meta.json no se usa
+        with open(os.path.join(temporal, "meta.json"), "w") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporal, destino)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    return df
+
+
+def leer_cache(archivo_csv):
+    """DataFrame de horarios desde la caché (memory-mapped), o None si no existe o está vencida"""
+    directorio = directorio_cache(archivo_csv)
+    try:
+        with open(os.path.join(directorio, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("version") != VERSION or {k: meta.get(k) for k in ("tamano", "mtime_ns")} != _firma(archivo_csv):
+        return None
+
+    try:
+        columnas = {}
+        for columna in meta["columnas"]:
+            valores = np.load(os.path.join(directorio, f"{columna['nombre']}.npy"), mmap_mode="r")
+            if columna["categorias"] is not None:
+                valores = pd.Categorical.from_codes(valores, categories=columna["categorias"])
+            columnas[columna["nombre"]] = valores
+    except (OSError, ValueError, KeyError):
+        return None
+    return pd.DataFrame(columnas, copy=False)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+# Directorio donde se guardan los snapshots de los catálogos estáticos de STM
+CACHE_DIR = os.getenv("STM_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "stm"))
+
+# Cabecera JSON + datos en JSON comprimido con zlib. Nada de pickle: cargar un pickle
+# ejecuta código, y cualquiera que pueda escribir en CACHE_DIR podría aprovecharlo.
+# STMSNAP1 era el formato con pickle; esos snapshots se descartan y se vuelven a bajar.
+MAGIC = b"STMSNAP2"
+_LARGO_CABECERA = struct.Struct("<I")
+
+
+def _hash_contenido(datos):
+    """Hash estable del contenido (independiente del formato en disco)"""
+    canonico = json.dumps(datos, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+
+
+def ruta_snapshot(nombre):
+    """Ruta del archivo de snapshot de un catálogo"""
+    return os.path.join(CACHE_DIR, f"{nombre}.snap")
+
+
+def leer_snapshot(nombre):
+    """
+    Lee un snapshot del disco
+    Devuelve (metadatos, datos) o None si no existe o está corrupto
+    """
+    ruta = ruta_snapshot(nombre)
+    try:
+        with open(ruta, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (largo,) = _LARGO_CABECERA.unpack(f.read(_LARGO_CABECERA.size))
+            metadatos = json.loads(f.read(largo))
+            datos = json.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error, zlib.error, EOFError) as e:
+        print(f"⚠️  Snapshot {nombre} ilegible, se descartará: {e}")
+        return None
+
+    return metadatos, datos
+
+
+def guardar_snapshot(nombre, datos, sha256=None):
+    """Guarda un snapshot comprimido de forma atómica y devuelve sus metadatos"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    metadatos = {
+        "nombre": nombre,
+        "descargado_en": time.time(),
+        "sha256": sha256 or _hash_contenido(datos),
+        "registros": len(datos) if hasattr(datos, "__len__") else None,
+    }
+    cabecera = json.dumps(metadatos).encode("utf-8")
+    contenido = zlib.compress(json.dumps(datos, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), level=6)
+
+    fd, ruta_tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix=f".{nombre}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_LARGO_CABECERA.pack(len(cabecera)))
+            f.write(cabecera)
+            f.write(contenido)
+        os.replace(ruta_tmp, ruta_snapshot(nombre))
+    except BaseException:
+        if os.path.exists(ruta_tmp):
+            os.remove(ruta_tmp)
+        raise
+
+    return metadatos
+
+
+def obtener_catalogo(nombre, descargar, ttl_segundos, forzar=False):
+    """
+    Devuelve un catálogo desde el snapshot local o lo descarga si está vencido
+
+    Args:
+        nombre: Nombre del catálogo (nombre del archivo de snapshot)
+        descargar: Función sin argumentos que descarga el catálogo de la API (None si falla)
+        ttl_segundos: Antigüedad máxima del snapshot antes de revalidarlo
+        forzar: Ignorar el TTL y revalidar contra la API
+
+    Si la descarga falla se usa el snapshot vencido, si lo hay.
+    Si el contenido descargado no cambió solo se renueva la fecha del snapshot.
+    """
+    snapshot = leer_snapshot(nombre)
+
+    if snapshot and not forzar:
+        metadatos, datos = snapshot
+        if time.time() - metadatos["descargado_en"] < ttl_segundos:
+            return datos
+
+    datos = descargar()
+    if datos is None:
+        if snapshot:
+            print(f"⚠️  No se pudo revalidar {nombre}, usando snapshot local vencido")
+            return snapshot[1]
+        return None
+
+    sha256 = _hash_contenido(datos)
+    if snapshot and snapshot[0]["sha256"] == sha256:
+        print(f"✓ Catálogo {nombre} revalidado sin cambios")
+        guardar_snapshot(nombre, snapshot[1], sha256)
+        return snapshot[1]
+
+    guardar_snapshot(nombre, datos, sha256)
+    print(f"✓ Catálogo {nombre} actualizado ({len(datos)} registros)")
+    return datos
@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metricas import Contador, Histograma
+
+# Cargar variables de entorno
+load_dotenv()
+
+API_BASE_URL = "https://api.montevideo.gub.uy/api/transportepublico"
+AUTH_URL = "https://mvdapi-auth.montevideo.gub.uy/token"
+USER_AGENT = "PostmanRuntime/7.50.0"
+ESPERA_MINIMA_RENOVACION = 5  # Segundos mínimos entre renovaciones en segundo plano, aunque el token dure poco
+
+RENOVACIONES_TOKEN = Contador("stm_token_renovaciones_total", "Pedidos de access token a OAuth", ("resultado",))
+LATENCIA_TOKEN = Histograma("stm_token_renovacion_segundos", "Duración de la obtención del access token")
+ERRORES_API = Contador("stm_api_errores_total", "Consultas a la API de STM que fallaron")
+
+
+class ClienteSTM:
+    """
+    Cliente compartido y thread-safe de la API de STM.
+
+    - Es dueño del access token: lo renueva en segundo plano antes de que
+      venza, así ninguna consulta paga el viaje a OAuth en su camino.
+    - Renovación single-flight: si varios hilos encuentran el token vencido
+      a la vez, solo uno pide uno nuevo y el resto espera ese resultado.
+    - Un pool de conexiones keep-alive con gzip y reintentos con backoff
+      exponencial con jitter ante errores de conexión, 429 y 5xx.
+    """
+
+    def __init__(self, client_id=None, client_secret=None, base_url=API_BASE_URL, auth_url=AUTH_URL,
+                 pool_maxsize=16, timeout=10, reintentos=3, margen_renovacion=60,
+                 renovar_en_segundo_plano=True, token_fijo=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip("/")
+        self.auth_url = auth_url
+        self.timeout = timeout
+        self.margen_renovacion = margen_renovacion
+        self.renovar_en_segundo_plano = renovar_en_segundo_plano
+
+        # token_fijo permite usar el cliente contra un servidor local de prueba sin OAuth
+        self.access_token = token_fijo
+        self.token_expiry = float("inf") if token_fijo else 0
+        self.vida_token = 0  # Segundos de validez del último token, descontado el colchón de 30s
+        self._lock_token = threading.Lock()
+        self._renovador = None
+        self._detener = threading.Event()
+
+        reintento = Retry(
+            total=reintentos,
+            backoff_factor=0.5,
+            backoff_jitter=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_maxsize, max_retries=reintento)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+    def _token_valido(self):
+        return self.access_token is not None and time.time() < self.token_expiry
+
+    def obtener_token(self):
+        """Pide un token nuevo (single-flight); devuelve True si se obtuvo"""
+        vencido = self.token_expiry
+        with self._lock_token:
+            # Si otro hilo lo renovó mientras esperábamos el lock, usar ese
+            if self.token_expiry != vencido and self._token_valido():
+                return True
+            return self._renovar_token()
+
+    def token_vigente(self):
+        """Devuelve un access token válido, renovándolo si hace falta (None si falla)"""
+        if self._token_valido():
+            return self.access_token
+
+        with self._lock_token:
+            if not self._token_valido():
+                self._renovar_token()
+            return self.access_token if self._token_valido() else None
+
+    def _invalidar_token(self, token):
+        """
+        Marca como vencido el token que recibió un 401, si sigue siendo el actual
+        Si otro hilo ya lo reemplazó, el nuevo no se toca (si no, se renovaría de más)
+        """
+        with self._lock_token:
+            if self.access_token == token:
+                self.token_expiry = 0
+
+    def verificar_token(self):
+        """Verifica si el token es válido y lo renueva si es necesario"""
+        return self.token_vigente() is not None
+
+    def _renovar_token(self):
+        """Obtiene un token de acceso OAuth2 (llamar con _lock_token tomado)"""
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Accept": "*/*",
+            "Cache-Control": "no-cache",
+        }
+        payload = {"grant_type": "client_credentials"}
+
+        try:
+            print(f"🔍 Obteniendo token de acceso...")
+            with LATENCIA_TOKEN.medir():
+                response = self.session.post(
+                    self.auth_url,
+                    data=payload,
+                    auth=(self.client_id, self.client_secret),
+                    headers=headers,
+                    timeout=self.timeout,
+                )
+            response.raise_for_status()
+
+            token_data = response.json()
+            expires_in = token_data.get("expires_in", 300)  # 300s por defecto
+            self.access_token = token_data.get("access_token")
+            # Renovar 30s antes (o a los 3/4 de la vida si el token dura menos de 2 minutos)
+            self.vida_token = expires_in - min(30, expires_in / 4)
+            self.token_expiry = time.time() + self.vida_token
+
+            print(f"✓ Token obtenido (válido por {expires_in}s)")
+            RENOVACIONES_TOKEN.inc(1, "ok")
+            self._iniciar_renovador()
+            return True
+
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error al obtener token: {e}")
+            RENOVACIONES_TOKEN.inc(1, "error")
+            if getattr(e, "response", None) is not None:
+                print(f"Status Code: {e.response.status_code}")
+                content_type = e.response.headers.get("Content-Type", "")
+                if "html" not in content_type.lower():
+                    print(f"Response: {e.response.text[:500]}")
+                else:
+                    print("Respuesta HTML (posible bloqueo WAF)")
+            return False
+
+    def _iniciar_renovador(self):
+        if not self.renovar_en_segundo_plano or (self._renovador and self._renovador.is_alive()):
+            return
+        self._renovador = threading.Thread(target=self._renovar_periodicamente, name="renovador-token", daemon=True)
+        self._renovador.start()
+
+    def _renovar_periodicamente(self):
+        """
+        Renueva el token margen_renovacion segundos antes de que venza
+
+        Con tokens cortos el margen se limita a la mitad de su vida: si no, con
+        expires_in <= 90 siempre estaría "por vencer" y se renovaría sin parar.
+        """
+        while not self._detener.is_set():
+            margen = min(self.margen_renovacion, 0.5 * self.vida_token)
+            espera = max(ESPERA_MINIMA_RENOVACION, self.token_expiry - margen - time.time())
+            if self._detener.wait(espera):
+                return
+            if self.token_expiry - time.time() <= margen:
+                if not self.obtener_token():
+                    # Reintentar pronto; mientras tanto las consultas siguen renovando bajo demanda
+                    self._detener.wait(5)
+
+    def get(self, ruta, params=None, timeout=None):
+        """GET autenticado a la API; devuelve el JSON o None si falla"""
+        for intento in range(2):
+            token = self.token_vigente()
+            if not token:
+                return None
+
+            try:
+                response = self.session.get(
+                    f"{self.base_url}{ruta}",
+                    params=params,
+                    headers={"Accept": "application/json", "Authorization": f"Bearer {token}"},
+                    timeout=timeout or self.timeout,
+                )
+                if response.status_code == 401 and intento == 0 and self.client_id:
+                    # Token revocado antes de tiempo: forzar uno nuevo y reintentar una vez
+                    self._invalidar_token(token)
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.RequestException as e:
+                print(f"Error al consultar la API: {e}")
+                ERRORES_API.inc()
+                if getattr(e, "response", None) is not None:
+                    print(f"Status: {e.response.status_code}")
+                    print(f"Respuesta: {e.response.text[:300]}")
+                return None
+
+    def cerrar(self):
+        self._detener.set()
+        self.session.close()
+
+
+_cliente = None
+_lock_cliente = threading.Lock()
+
+
+def obtener_cliente():
+    """Devuelve el cliente de STM compartido por todo el proceso (configurado desde el entorno)"""
+    global _cliente
+    if _cliente is None:
+        with _lock_cliente:
+            if _cliente is None:
+                _cliente = ClienteSTM(
+                    client_id=os.getenv("CLIENT_ID", "").strip(),
+                    client_secret=os.getenv("CLIENT_SECRET", "").strip(),
+                    base_url=os.getenv("STM_API_BASE_URL", API_BASE_URL),
+                    auth_url=os.getenv("STM_AUTH_URL", AUTH_URL),
+                    pool_maxsize=int(os.getenv("STM_POOL_SIZE", "16")),
+                )
+    return _cliente
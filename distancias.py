@@ -0,0 +1,160 @@
+import numpy as np
+from math import radians, sin, cos, sqrt, atan2
+
+RADIO_TIERRA_M = 6371000  # Radio medio de la Tierra en metros
+
+# Elipsoide WGS-84 (el mismo que usa geopy por defecto)
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+MODOS_DISTANCIA = ("haversine", "equirectangular", "geodesic")
+
+
+def calcular_distancia(lat1, lon1, lat2, lon2):
+    """Calcula la distancia entre dos coordenadas en metros usando la fórmula de Haversine"""
+    R = RADIO_TIERRA_M
+
+    lat1_rad = radians(float(lat1))
+    lat2_rad = radians(float(lat2))
+    delta_lat = radians(float(lat2) - float(lat1))
+    delta_lon = radians(float(lon2) - float(lon1))
+
+    a = sin(delta_lat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lon / 2) ** 2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+
+    return R * c
+
+
+def distancias_haversine(lat1, lon1, lat2, lon2):
+    """Distancias de Haversine en metros entre arrays de coordenadas (con broadcasting)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distancias_equirectangular(lat1, lon1, lat2, lon2):
+    """
+    Distancias en metros con la aproximación equirectangular (con broadcasting)
+    Es la más barata y su error es despreciable a escala de ciudad
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+
+    x = (lon2 - lon1) * np.cos((lat1 + lat2) / 2)
+    y = lat2 - lat1
+    return RADIO_TIERRA_M * np.hypot(x, y)
+
+
+def distancias_geodesicas(lat1, lon1, lat2, lon2, max_iteraciones=200, tolerancia=1e-12):
+    """
+    Distancias geodésicas en metros sobre el elipsoide WGS-84 (fórmula inversa de Vincenty)
+    Vectorizada: todas las parejas iteran juntas hasta converger
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *(np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    )
+
+    L = lon2 - lon1
+    U1 = np.arctan((1 - WGS84_F) * np.tan(lat1))
+    U2 = np.arctan((1 - WGS84_F) * np.tan(lat2))
+    sin_u1, cos_u1 = np.sin(U1), np.cos(U1)
+    sin_u2, cos_u2 = np.sin(U2), np.cos(U2)
+
+    lam = L.copy()
+    pendientes = np.ones(L.shape, dtype=bool)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(max_iteraciones):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # En el ecuador cos2_alpha = 0 y el término no aplica
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+            C = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            lam_nuevo = L + (1 - C) * WGS84_F * sin_alpha * (
+                sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+            )
+            pendientes = np.abs(lam_nuevo - lam) > tolerancia
+            lam = lam_nuevo
+            if not pendientes.any():
+                break
+
+    u2 = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (
+        cos_2sigma_m + B / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+        )
+    )
+    return WGS84_B * A * (sigma - delta_sigma)
+
+
+def calcular_distancias(lat1, lon1, lat2, lon2, modo="geodesic"):
+    """Calcula distancias en metros entre arrays de coordenadas con el modo de precisión elegido"""
+    if modo == "haversine":
+        return distancias_haversine(lat1, lon1, lat2, lon2)
+    if modo == "equirectangular":
+        return distancias_equirectangular(lat1, lon1, lat2, lon2)
+    if modo == "geodesic":
+        return distancias_geodesicas(lat1, lon1, lat2, lon2)
+    raise ValueError(f"Modo de distancia desconocido: {modo} (opciones: {', '.join(MODOS_DISTANCIA)})")
+
+
+def fraccion_aproximacion(lat0, lon0, lat1, lon1, lat_p, lon_p):
+    """
+    Punto de máxima aproximación de cada segmento (lat0, lon0) -> (lat1, lon1) a un punto
+    Devuelve la fracción del segmento (0 = inicio, 1 = fin) donde el segmento pasa
+    más cerca del punto, calculada en una proyección plana local alrededor del punto
+    """
+    lat0, lon0, lat1, lon1, lat_p, lon_p = (
+        np.asarray(x, dtype=np.float64) for x in (lat0, lon0, lat1, lon1, lat_p, lon_p)
+    )
+    escala_lon = np.cos(np.radians(lat_p))
+
+    # Coordenadas en grados "equivalentes" (la escala es la misma en ambos ejes)
+    x0, y0 = (lon0 - lon_p) * escala_lon, lat0 - lat_p
+    dx, dy = (lon1 - lon0) * escala_lon, lat1 - lat0
+    largo2 = dx * dx + dy * dy
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraccion = np.where(largo2 > 0, -(x0 * dx + y0 * dy) / largo2, 0.0)
+    return np.clip(fraccion, 0.0, 1.0)
+
+
+def coordenadas_bondis(buses_data):
+    """
+    Convierte la respuesta de /buses en arrays
+    Devuelve (índices en buses_data, latitudes, longitudes) de los bondis con coordenadas válidas
+    """
+    indices, lats, lons = [], [], []
+    for i, bus_data in enumerate(buses_data):
+        coordinates = (bus_data.get("location") or {}).get("coordinates") or []
+        if len(coordinates) < 2:
+            continue
+        indices.append(i)
+        lons.append(coordinates[0])
+        lats.append(coordinates[1])
+
+    return (
+        np.asarray(indices, dtype=np.intp),
+        np.asarray(lats, dtype=np.float64),
+        np.asarray(lons, dtype=np.float64),
+    )
+
+
+def distancias_bondis_paradas(buses_data, stop_lats, stop_lons, modo="geodesic"):
+    """
+    Calcula en una sola llamada la matriz de distancias (bondis x paradas) para una respuesta de /buses
+    Devuelve (índices de los bondis válidos en buses_data, matriz de distancias en metros)
+    """
+    indices, lats, lons = coordenadas_bondis(buses_data)
+    stop_lats = np.asarray(stop_lats, dtype=np.float64)
+    stop_lons = np.asarray(stop_lons, dtype=np.float64)
+
+    matriz = calcular_distancias(lats[:, None], lons[:, None], stop_lats[None, :], stop_lons[None, :], modo)
+    return indices, matriz
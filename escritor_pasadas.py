@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+
+from metricas import Contador, Gauge
+from models import (
+    LATENCIA_ESCRITURA, PASADAS_DUPLICADAS, PASADAS_ESCRITAS, BusPassage, BusPassageCooldown, BusPassageRollup,
+    get_scoped_session,
+)
+
+_FIN = object()  # Marca de cierre para el hilo escritor
+
+PASADAS_EN_COLA = Gauge("tracker_escritor_en_cola", "Pasadas esperando en la cola de escritura")
+PASADAS_DESCARTADAS = Contador("tracker_escritor_descartadas_total", "Pasadas descartadas tras agotar los reintentos")
+
+
+class EscritorPasadas:
+    """
+    Sumidero asíncrono de pasadas detectadas.
+
+    El loop de polling encola cada pasada con `registrar()` y sigue de largo;
+    un hilo en segundo plano las escribe en lotes (por tamaño o por tiempo)
+    con `BusPassage.bulk_create`, así una base lenta no atrasa la próxima
+    consulta a la API. Cada lote se suma al resumen por hora (`BusPassageRollup`)
+    en la misma transacción. Con `cooldown` (segundos) cada lote pasa antes por
+    `BusPassageCooldown.claim`, que descarta en la base las pasadas repetidas
+    (reinicios, trackers redundantes) sin leer antes bus_passages. La cola es acotada: si la base no da abasto, `registrar()`
+    se bloquea hasta que haya lugar (backpressure) en vez de acumular memoria.
+    """
+
+    def __init__(self, engine=None, tamano_lote=500, intervalo_flush=2.0, max_encolados=10000,
+                 metodo="copy", reintentos=3, cooldown=None):
+        self.engine = engine
+        self.cooldown = cooldown
+        self.tamano_lote = tamano_lote
+        self.intervalo_flush = intervalo_flush
+        self.metodo = metodo
+        self.reintentos = reintentos
+        self.cola = queue.Queue(maxsize=max_encolados)
+        self.escritas = 0
+        self.duplicadas = 0
+        self.descartadas = 0
+        self._saturada = False
+        self._hilo = threading.Thread(target=self._trabajar, name="escritor-pasadas", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def registrar(self, bus_stop, bus_data, detected_at=None, timeout=None):
+        """Encola una pasada; se bloquea si la cola está llena"""
+        fila = BusPassage.values_from_bus_data(bus_stop.id, bus_data, detected_at)
+        try:
+            self.cola.put_nowait(fila)
+            self._saturada = False
+        except queue.Full:
+            if not self._saturada:
+                print(f"  ⏳ Cola de escritura llena ({self.cola.maxsize}), esperando a la base de datos...")
+                self._saturada = True
+            self.cola.put(fila, timeout=timeout)
+
+    def cerrar(self, timeout=None):
+        """Escribe lo pendiente y detiene el hilo escritor"""
+        if not self._hilo.is_alive():
+            return
+        pendientes = self.cola.qsize()
+        if pendientes:
+            print(f"  💾 Escribiendo {pendientes} pasadas pendientes...")
+        self.cola.put(_FIN)
+        self._hilo.join(timeout)
+
+    def _trabajar(self):
+        # Sesión propia del hilo escritor (no se comparte con el hilo de polling)
+        sesiones = get_scoped_session(self.engine)
+        session = sesiones()
+        lote = []
+        limite = time.monotonic() + self.intervalo_flush
+
+        try:
+            while True:
+                try:
+                    item = self.cola.get(timeout=max(0.0, limite - time.monotonic()))
+                except queue.Empty:
+                    item = None
+
+                if item is _FIN:
+                    self._escribir(session, lote)
+                    return
+
+                if item is not None:
+                    lote.append(item)
+
+                if len(lote) >= self.tamano_lote or time.monotonic() >= limite:
+                    self._escribir(session, lote)
+                    PASADAS_EN_COLA.set(self.cola.qsize())
+                    lote = []
+                    limite = time.monotonic() + self.intervalo_flush
+        finally:
+            sesiones.remove()
+
+    def _escribir(self, session, lote):
+        if not lote:
+            return
+
+        for intento in range(1, self.reintentos + 1):
+            try:
+                with LATENCIA_ESCRITURA.medir("lote"):
+                    nuevas = BusPassageCooldown.claim(session, lote, self.cooldown) if self.cooldown else lote
+                    BusPassage.bulk_create(session, nuevas, self.metodo)
+                    BusPassageRollup.accumulate(session, nuevas)
+                    session.commit()
+                self.escritas += len(nuevas)
+                self.duplicadas += len(lote) - len(nuevas)
+                PASADAS_ESCRITAS.inc(len(nuevas), "lote")
+                if len(nuevas) < len(lote):
+                    PASADAS_DUPLICADAS.inc(len(lote) - len(nuevas), "lote")
+                return
+            except Exception as e:
+                session.rollback()
+                print(f"  ❌ Error al escribir lote de {len(lote)} pasadas (intento {intento}/{self.reintentos}): {e}")
+                if intento < self.reintentos:
+                    time.sleep(min(2 ** intento, 30))
+
+        self.descartadas += len(lote)
+        PASADAS_DESCARTADAS.inc(len(lote))
+        print(f"  ❌ Se descartaron {len(lote)} pasadas tras {self.reintentos} intentos")
@@ -0,0 +1,160 @@
+import heapq
+from array import array
+from math import atan2, cos, degrees, radians
+
+from distancias import calcular_distancia
+
+
+class HistorialPosiciones:
+    """
+    Buffer circular de tamaño fijo con las últimas posiciones de un bondi.
+    Guarda (instante en segundos epoch, lat, lon) en tres arrays de doubles,
+    así la memoria por bondi no depende de cuánto tiempo lleve activo.
+    """
+
+    __slots__ = ("instantes", "latitudes", "longitudes", "siguiente", "cantidad")
+
+    def __init__(self, capacidad=8):
+        self.instantes = array("d", bytes(8 * capacidad))
+        self.latitudes = array("d", bytes(8 * capacidad))
+        self.longitudes = array("d", bytes(8 * capacidad))
+        self.siguiente = 0
+        self.cantidad = 0
+
+    def __len__(self):
+        return self.cantidad
+
+    @property
+    def capacidad(self):
+        return len(self.instantes)
+
+    def agregar(self, instante, lat, lon):
+        """Agrega una muestra, pisando la más vieja si el buffer está lleno"""
+        i = self.siguiente
+        self.instantes[i] = instante
+        self.latitudes[i] = lat
+        self.longitudes[i] = lon
+        self.siguiente = (i + 1) % self.capacidad
+        self.cantidad = min(self.cantidad + 1, self.capacidad)
+
+    def muestra(self, atras=0):
+        """Muestra (instante, lat, lon); atras=0 es la última, 1 la anterior, etc. (None si no hay)"""
+        if atras >= self.cantidad:
+            return None
+        i = (self.siguiente - 1 - atras) % self.capacidad
+        return self.instantes[i], self.latitudes[i], self.longitudes[i]
+
+    def __iter__(self):
+        """Recorre las muestras de la más vieja a la más nueva"""
+        for atras in range(self.cantidad - 1, -1, -1):
+            yield self.muestra(atras)
+
+    def velocidad_mps(self):
+        """Velocidad entre las dos últimas muestras en m/s (None si no alcanza el historial)"""
+        if self.cantidad < 2:
+            return None
+        t1, lat1, lon1 = self.muestra(0)
+        t0, lat0, lon0 = self.muestra(1)
+        if t1 <= t0:
+            return None
+        return calcular_distancia(lat0, lon0, lat1, lon1) / (t1 - t0)
+
+    def rumbo(self):
+        """Rumbo entre las dos últimas muestras en grados (0 = norte, 90 = este), None si no se movió"""
+        if self.cantidad < 2:
+            return None
+        _, lat1, lon1 = self.muestra(0)
+        _, lat0, lon0 = self.muestra(1)
+        dx = (lon1 - lon0) * cos(radians((lat0 + lat1) / 2))
+        dy = lat1 - lat0
+        if dx == 0 and dy == 0:
+            return None
+        return degrees(atan2(dx, dy)) % 360
+
+
+class EstadoBus:
+    """Estado de un bondi: su historial de posiciones y la última vez que se lo vio"""
+
+    __slots__ = ("bus_id", "historial", "visto")
+
+    def __init__(self, bus_id, capacidad_historial=8):
+        self.bus_id = bus_id
+        self.historial = HistorialPosiciones(capacidad_historial)
+        self.visto = 0.0
+
+
+class TablaEstadoBuses:
+    """
+    Estado por bondi (indexado por busId) y cooldowns de registro por (parada, bondi).
+
+    Los vencimientos se manejan con heaps: cada bondi y cada cooldown tiene una
+    sola entrada, y al sacarla se descarta o se reagenda si se renovó mientras
+    tanto. Así `purgar()` solo toca lo que vence y la memoria queda acotada por
+    los bondis activos en la ventana `inactividad_max`, sin recorrer todo en cada ciclo.
+
+    `cooldowns` puede ser un diccionario compartido entre procesos (ver supervisor.py);
+    en ese caso las claves que ponen otros procesos las purga el supervisor.
+    """
+
+    def __init__(self, capacidad_historial=8, inactividad_max=1800, cooldowns=None):
+        self.capacidad_historial = capacidad_historial
+        self.inactividad_max = inactividad_max
+        self.buses = {}  # {bus_id: EstadoBus}
+        self.cooldowns = {} if cooldowns is None else cooldowns  # {(bus_stop_id, bus_id): instante de vencimiento}
+        self._vencimientos_buses = []  # heap de (visto, bus_id)
+        self._vencimientos_cooldowns = []  # heap de (vencimiento, clave)
+
+    def __len__(self):
+        return len(self.buses)
+
+    def registrar_posicion(self, bus_id, instante, lat, lon, ahora=None):
+        """
+        Agrega una posición al historial del bondi (creándolo si es nuevo) y lo devuelve
+        Si el GPS no reportó una posición más nueva que la última, solo se actualiza `visto`
+        """
+        visto = instante if ahora is None else ahora
+        estado = self.buses.get(bus_id)
+        if estado is None:
+            estado = self.buses[bus_id] = EstadoBus(bus_id, self.capacidad_historial)
+            heapq.heappush(self._vencimientos_buses, (visto, bus_id))
+
+        ultima = estado.historial.muestra()
+        if ultima is None or instante > ultima[0]:
+            estado.historial.agregar(instante, lat, lon)
+        estado.visto = visto
+        return estado
+
+    def ultima_posicion(self, bus_id):
+        """Última (instante, lat, lon) conocida del bondi, o None"""
+        estado = self.buses.get(bus_id)
+        return estado.historial.muestra() if estado else None
+
+    def en_cooldown(self, clave, ahora):
+        vencimiento = self.cooldowns.get(clave)
+        return vencimiento is not None and vencimiento > ahora
+
+    def iniciar_cooldown(self, clave, ahora, duracion):
+        if clave not in self.cooldowns:
+            heapq.heappush(self._vencimientos_cooldowns, (ahora + duracion, clave))
+        self.cooldowns[clave] = ahora + duracion
+
+    def purgar(self, ahora):
+        """Descarta los cooldowns vencidos y los bondis que no se ven hace más de inactividad_max"""
+        heap = self._vencimientos_cooldowns
+        while heap and heap[0][0] <= ahora:
+            _, clave = heapq.heappop(heap)
+            vencimiento = self.cooldowns.get(clave)
+            if vencimiento is not None and vencimiento > ahora:
+                heapq.heappush(heap, (vencimiento, clave))  # Se renovó: reagendar
+            else:
+                self.cooldowns.pop(clave, None)
+
+        heap = self._vencimientos_buses
+        limite = ahora - self.inactividad_max
+        while heap and heap[0][0] <= limite:
+            _, bus_id = heapq.heappop(heap)
+            estado = self.buses.get(bus_id)
+            if estado is not None and estado.visto > limite:
+                heapq.heappush(heap, (estado.visto, bus_id))
+            else:
+                self.buses.pop(bus_id, None)
@@ -0,0 +1,200 @@
+"""
+Frecuencias entre bondis de una misma línea en una parada
+
+El intervalo de cada pasada es el tiempo desde la pasada anterior de la misma
+línea en la misma parada: se calcula en la base con LAG sobre
+(bus_stop_id, line ORDER BY detected_at), leyendo de a un rango de fechas por
+vez (índice por parada y fecha). Por línea, parada y hora del día se acumula
+la distribución de intervalos, los agrupamientos (dos bondis casi juntos) y
+los huecos largos; solo los histogramas quedan en memoria.
+
+Uso:
+    uv run python frecuencias.py --desde 2025-11-01 --hasta 2025-12-01
+    uv run python frecuencias.py --linea 121 --linea G --parada 2164
+"""
+import argparse
+import os
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from models import BusPassage, BusStop, get_db_engine
+
+ZONA_HORARIA = ZoneInfo("America/Montevideo")
+INTERVALO_MAX_MINUTOS = 180  # Una pasada anterior más vieja que esto no cuenta (primer bondi del servicio)
+UMBRAL_AGRUPAMIENTO_MINUTOS = 2  # Dos bondis a menos de esto: agrupamiento
+UMBRAL_HUECO_MINUTOS = 30  # Más que esto sin bondis de la línea: hueco largo
+
+
+def leer_intervalos(conn, desde, hasta, lineas=None, paradas=None):
+    """Pasadas con detected_at (UTC) en [desde, hasta) con el intervalo en segundos desde la anterior"""
+    filtros = []
+    if lineas:
+        filtros.append(BusPassage.line.in_(lineas))
+    if paradas:
+        filtros.append(BusPassage.bus_stop_id.in_(
+            select(BusStop.id).where(BusStop.busstop_id.in_(paradas)).scalar_subquery()
+        ))
+
+    intervalos = BusPassage.headways(
+        conn.dialect.name, desde, hasta, INTERVALO_MAX_MINUTOS * 60, *filtros
+    ).subquery()
+    consulta = select(
+        BusStop.busstop_id,
+        intervalos.c.line,
+        intervalos.c.detected_at,
+        intervalos.c.headway_seconds,
+    ).join(BusStop, BusStop.id == intervalos.c.bus_stop_id)
+    return pd.read_sql_query(consulta, conn, parse_dates=['detected_at'])
+
+
+class DistribucionFrecuencias:
+    """Histogramas de intervalos (bins de 1 minuto) y conteos de eventos por línea, parada y hora"""
+
+    CLAVES = ['line', 'busstop_id', 'hora']
+
+    def __init__(self, umbral_agrupamiento=UMBRAL_AGRUPAMIENTO_MINUTOS, umbral_hueco=UMBRAL_HUECO_MINUTOS):
+        self.umbral_agrupamiento = umbral_agrupamiento
+        self.umbral_hueco = umbral_hueco
+        self.conteos = None  # Serie indexada por (line, busstop_id, hora, bin)
+        self.totales = None  # DataFrame indexado por (line, busstop_id, hora)
+
+    def agregar(self, pasadas):
+        """Suma un lote de leer_intervalos(); devuelve (agrupamientos, huecos) del lote"""
+        local = pasadas['detected_at'].dt.tz_localize('UTC').dt.tz_convert(ZONA_HORARIA)
+        minutos = pasadas['headway_seconds'].astype(float) / 60
+        filas = pasadas.assign(hora=local.dt.hour.to_numpy(), minutos=minutos, detected_at_local=local)
+
+        agrupamiento = filas['minutos'] < self.umbral_agrupamiento
+        hueco = filas['minutos'] > self.umbral_hueco
+        totales = filas.assign(
+            con_intervalo=filas['minutos'].notna(),
+            agrupamientos=agrupamiento,
+            huecos=hueco,
+        ).groupby(self.CLAVES).agg(
+            pasadas=('minutos', 'size'),
+            con_intervalo=('con_intervalo', 'sum'),
+            suma_minutos=('minutos', 'sum'),
+            max_minutos=('minutos', 'max'),
+            agrupamientos=('agrupamientos', 'sum'),
+            huecos=('huecos', 'sum'),
+        )
+
+        medidas = filas[filas['minutos'].notna()]
+        bins = np.floor(medidas['minutos'].to_numpy()).astype(np.int64)
+        conteos = medidas.assign(bin=bins).groupby(self.CLAVES + ['bin']).size()
+
+        if self.totales is None:
+            self.conteos, self.totales = conteos, totales
+        else:
+            self.conteos = self.conteos.add(conteos, fill_value=0)
+            suma = self.totales.drop(columns='max_minutos').add(totales.drop(columns='max_minutos'), fill_value=0)
+            suma['max_minutos'] = pd.concat([self.totales['max_minutos'], totales['max_minutos']], axis=1).max(axis=1)
+            self.totales = suma
+
+        eventos = filas.loc[agrupamiento | hueco, ['line', 'busstop_id', 'detected_at_local', 'minutos']]
+        eventos = eventos.rename(columns={'detected_at_local': 'detected_at', 'minutos': 'intervalo_minutos'})
+        return eventos[agrupamiento[eventos.index]], eventos[hueco[eventos.index]]
+
+    def histograma(self):
+        """DataFrame line, busstop_id, hora, intervalo_minutos (bin), pasadas"""
+        if self.conteos is None or self.conteos.empty:
+            return pd.DataFrame(columns=self.CLAVES + ['intervalo_minutos', 'pasadas'])
+        tabla = self.conteos.astype(np.int64).rename('pasadas').reset_index()
+        return tabla.rename(columns={'bin': 'intervalo_minutos'}).sort_values(self.CLAVES + ['intervalo_minutos'])
+
+    def resumen(self):
+        """Por línea, parada y hora: pasadas, intervalo medio, p50/p90/máximo, agrupamientos y huecos"""
+        if self.totales is None:
+            return pd.DataFrame()
+        resumen = self.totales.copy()
+        resumen['intervalo_medio'] = resumen['suma_minutos'] / resumen['con_intervalo'].where(resumen['con_intervalo'] > 0)
+
+        # Percentiles desde el histograma: cada bin [b, b+1) se representa por su centro
+        histograma = self.histograma()
+        resumen['p50'] = resumen['p90'] = np.nan
+        if len(histograma):
+            histograma['acumulado'] = histograma.groupby(self.CLAVES)['pasadas'].cumsum()
+            total = histograma.groupby(self.CLAVES)['pasadas'].transform('sum')
+            for nombre, q in (('p50', 0.5), ('p90', 0.9)):
+                llegan = histograma[histograma['acumulado'] >= q * total]
+                resumen[nombre] = llegan.groupby(self.CLAVES)['intervalo_minutos'].first() + 0.5
+
+        columnas = ['pasadas', 'con_intervalo', 'intervalo_medio', 'p50', 'p90', 'max_minutos', 'agrupamientos', 'huecos']
+        resumen = resumen[columnas].reset_index()
+        for columna in ('pasadas', 'con_intervalo', 'agrupamientos', 'huecos'):
+            resumen[columna] = resumen[columna].astype(np.int64)
+        return resumen.sort_values(self.CLAVES)
+
+
+def calcular_frecuencias(engine, desde, hasta, dias_por_lote=1, lineas=None, paradas=None,
+                         umbral_agrupamiento=UMBRAL_AGRUPAMIENTO_MINUTOS, umbral_hueco=UMBRAL_HUECO_MINUTOS,
+                         salida_eventos=None):
+    """
+    Procesa las pasadas de [desde, hasta) (fechas locales) en lotes de dias_por_lote días
+    Devuelve la DistribucionFrecuencias; si `salida_eventos` es un directorio, escribe ahí
+    agrupamientos.csv y huecos.csv a medida que aparecen
+    """
+    distribucion = DistribucionFrecuencias(umbral_agrupamiento, umbral_hueco)
+    archivos = {"agrupamientos": True, "huecos": True}  # True: todavía sin encabezado
+
+    inicio = datetime.combine(desde, datetime.min.time(), ZONA_HORARIA)
+    fin = datetime.combine(hasta, datetime.min.time(), ZONA_HORARIA)
+    while inicio < fin:
+        siguiente = min(inicio + timedelta(days=dias_por_lote), fin)
+        t0 = time.perf_counter()
+        with engine.connect() as conn:
+            pasadas = leer_intervalos(
+                conn,
+                inicio.astimezone(ZoneInfo("UTC")).replace(tzinfo=None),
+                siguiente.astimezone(ZoneInfo("UTC")).replace(tzinfo=None),
+                lineas,
+                paradas,
+            )
+
+        if len(pasadas):
+            agrupamientos, huecos = distribucion.agregar(pasadas)
+            print(f"  {inicio.date()}: {len(pasadas)} pasadas, {len(agrupamientos)} agrupamientos, "
+                  f"{len(huecos)} huecos ({time.perf_counter() - t0:.1f}s)")
+            if salida_eventos:
+                for nombre, eventos in (("agrupamientos", agrupamientos), ("huecos", huecos)):
+                    ruta = os.path.join(salida_eventos, f"{nombre}.csv")
+                    eventos.to_csv(ruta, mode='w' if archivos[nombre] else 'a', header=archivos[nombre], index=False)
+                    archivos[nombre] = False
+        inicio = siguiente
+
+    return distribucion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frecuencias, agrupamientos y huecos por línea y parada")
+    parser.add_argument("--desde", type=date.fromisoformat, default=date.today() - timedelta(days=7))
+    parser.add_argument("--hasta", type=date.fromisoformat, default=date.today() + timedelta(days=1))
+    parser.add_argument("--dias-por-lote", type=int, default=1)
+    parser.add_argument("--linea", action="append", help="Solo esta línea (se puede repetir)")
+    parser.add_argument("--parada", action="append", type=int, help="Solo esta parada (busstop_id, se puede repetir)")
+    parser.add_argument("--umbral-agrupamiento", type=float, default=UMBRAL_AGRUPAMIENTO_MINUTOS, help="Minutos")
+    parser.add_argument("--umbral-hueco", type=float, default=UMBRAL_HUECO_MINUTOS, help="Minutos")
+    parser.add_argument("--salida-dir", default="frecuencias", help="Directorio de los CSV de resultados")
+    args = parser.parse_args()
+
+    os.makedirs(args.salida_dir, exist_ok=True)
+    distribucion = calcular_frecuencias(
+        get_db_engine(), args.desde, args.hasta, args.dias_por_lote, args.linea, args.parada,
+        args.umbral_agrupamiento, args.umbral_hueco, args.salida_dir,
+    )
+
+    resumen = distribucion.resumen()
+    resumen.to_csv(os.path.join(args.salida_dir, "resumen.csv"), index=False)
+    distribucion.histograma().to_csv(os.path.join(args.salida_dir, "histograma.csv"), index=False)
+    print(f"\n✓ Resultados en {args.salida_dir}/ (resumen.csv, histograma.csv, agrupamientos.csv, huecos.csv)")
+    if len(resumen):
+        print(resumen.to_string(index=False, max_rows=30))
+
+
+if __name__ == "__main__":
+    main()
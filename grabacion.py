@@ -0,0 +1,148 @@
+"""
+Grabación y reproducción de las respuestas de /buses
+
+Una grabación es un JSONL comprimido con gzip: la primera línea es un
+encabezado (versión, fecha y el catálogo de paradas usado) y cada línea
+siguiente es una respuesta cruda de la API con el instante en que se obtuvo:
+
+    {"tipo": "encabezado", "version": 1, "creada": "...", "paradas": [...]}
+    {"t": 1763223247.5, "buses": [...]}
+
+Al reproducirla, un reloj virtual reemplaza a time.sleep: el tracker corre
+con su lógica de siempre pero sin esperar, o N veces más rápido que en vivo.
+"""
+import gzip
+import json
+import time
+from datetime import datetime, timezone
+
+VERSION = 1
+
+
+class FinGrabacion(Exception):
+    """Se terminaron las respuestas de la grabación"""
+
+
+class Grabador:
+    """Guarda cada respuesta cruda de la API con su instante en un JSONL comprimido"""
+
+    def __init__(self, ruta, paradas=None):
+        self.ruta = ruta
+        self.registros = 0
+        self.archivo = gzip.open(ruta, "wt", encoding="utf-8")
+        self._escribir({
+            "tipo": "encabezado",
+            "version": VERSION,
+            "creada": datetime.now(timezone.utc).isoformat(),
+            "paradas": paradas,
+        })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _escribir(self, objeto):
+        self.archivo.write(json.dumps(objeto, ensure_ascii=False, separators=(",", ":")))
+        self.archivo.write("\n")
+        # Vaciar el bloque comprimido para no perder lo grabado si se corta el proceso
+        self.archivo.flush()
+
+    def guardar(self, instante, respuesta):
+        self._escribir({"t": instante, "buses": respuesta})
+        self.registros += 1
+
+    def cerrar(self):
+        if not self.archivo.closed:
+            self.archivo.close()
+
+
+def leer_grabacion(ruta):
+    """Devuelve (encabezado, iterador de (instante, respuesta)) de una grabación"""
+    archivo = gzip.open(ruta, "rt", encoding="utf-8")
+    encabezado = json.loads(archivo.readline() or "{}")
+    if encabezado.get("tipo") != "encabezado":
+        archivo.close()
+        raise ValueError(f"{ruta} no es una grabación del tracker")
+    if encabezado.get("version") != VERSION:
+        archivo.close()
+        raise ValueError(f"Versión de grabación no soportada: {encabezado.get('version')}")
+
+    def registros():
+        with archivo:
+            for linea in archivo:
+                if linea.strip():
+                    registro = json.loads(linea)
+                    yield registro["t"], registro["buses"]
+
+    return encabezado, registros()
+
+
+class RelojVirtual:
+    """
+    Reloj con la misma interfaz que el módulo time (time, monotonic, sleep).
+    sleep() adelanta el reloj al instante; con `velocidad` además espera de verdad
+    segundos / velocidad (velocidad=None corre tan rápido como se pueda).
+    """
+
+    def __init__(self, inicio=0.0, velocidad=None):
+        self.ahora = inicio
+        self.velocidad = velocidad
+
+    def time(self):
+        return self.ahora
+
+    def monotonic(self):
+        return self.ahora
+
+    def sleep(self, segundos):
+        if segundos <= 0:
+            return
+        self.ahora += segundos
+        if self.velocidad:
+            time.sleep(segundos / self.velocidad)
+
+    def avanzar_hasta(self, instante):
+        """Adelanta el reloj hasta instante (sin esperar; nunca lo atrasa)"""
+        self.ahora = max(self.ahora, instante)
+
+
+class ReproductorGrabacion:
+    """
+    Fuente de respuestas de /buses a partir de una grabación.
+
+    Cada llamada devuelve la respuesta más reciente grabada antes del instante
+    del reloj virtual, igual que habría visto una consulta en vivo en ese
+    momento; si el tracker consulta más seguido que lo grabado, el reloj salta
+    a la próxima respuesta. Lanza FinGrabacion cuando no quedan respuestas.
+    """
+
+    def __init__(self, ruta, reloj=None):
+        self.encabezado, self._registros = leer_grabacion(ruta)
+        self._pendiente = next(self._registros, None)
+        inicio = self._pendiente[0] if self._pendiente else 0.0
+        self.reloj = reloj or RelojVirtual(inicio)
+        self.reloj.avanzar_hasta(inicio)
+        self.entregadas = 0
+        self.salteadas = 0
+
+    @property
+    def paradas(self):
+        return self.encabezado.get("paradas")
+
+    def __call__(self, *args, **kwargs):
+        if self._pendiente is None:
+            raise FinGrabacion()
+
+        instante, respuesta = self._pendiente
+        self._pendiente = next(self._registros, None)
+        self.reloj.avanzar_hasta(instante)
+
+        while self._pendiente is not None and self._pendiente[0] <= self.reloj.time():
+            instante, respuesta = self._pendiente
+            self._pendiente = next(self._registros, None)
+            self.salteadas += 1
+
+        self.entregadas += 1
+        return respuesta
@@ -0,0 +1,157 @@
+import numpy as np
+from math import cos, radians, floor
+
+from distancias import distancias_haversine
+
+METROS_POR_GRADO_LAT = 111320  # Metros aproximados por grado de latitud
+UMBRAL_FUERZA_BRUTA = 16  # Con pocas paradas no vale la pena armar la grilla
+
+
+class IndiceParadas:
+    """
+    Índice espacial en memoria sobre un conjunto de paradas.
+
+    Divide el plano lat/lon en una grilla uniforme de celdas de al menos
+    `tamano_celda_m` metros de lado. Para un punto dado alcanza con revisar
+    la celda que lo contiene y sus 8 vecinas para encontrar todas las paradas
+    a menos de `tamano_celda_m` metros, sin recorrer el resto de la ciudad.
+    """
+
+    def __init__(self, paradas, tamano_celda_m):
+        self.paradas = list(paradas)
+        self.tamano_celda_m = tamano_celda_m
+        self.latitudes = np.array([float(p.latitude) for p in self.paradas], dtype=np.float64)
+        self.longitudes = np.array([float(p.longitude) for p in self.paradas], dtype=np.float64)
+        self.fuerza_bruta = len(self.paradas) <= UMBRAL_FUERZA_BRUTA
+
+        # Usar la latitud más alejada del ecuador garantiza que ninguna celda
+        # mida menos de tamano_celda_m en el eje de longitud
+        lat_ref = float(np.abs(self.latitudes).max()) if len(self.paradas) else 0.0
+        self.delta_lat = tamano_celda_m / METROS_POR_GRADO_LAT
+        self.delta_lon = tamano_celda_m / (METROS_POR_GRADO_LAT * cos(radians(lat_ref)))
+
+        self._grilla_gruesa = None
+        self.celdas = {}
+        for i, (lat, lon) in enumerate(zip(self.latitudes.tolist(), self.longitudes.tolist())):
+            self.celdas.setdefault(self._celda(lat, lon), []).append(i)
+
+    def __len__(self):
+        return len(self.paradas)
+
+    def _celda(self, lat, lon):
+        return floor(lat / self.delta_lat), floor(lon / self.delta_lon)
+
+    def indices_candidatos(self, lat, lon):
+        """Devuelve las posiciones de las paradas que pueden estar a menos de tamano_celda_m del punto"""
+        if self.fuerza_bruta:
+            return range(len(self.paradas))
+
+        fila, columna = self._celda(float(lat), float(lon))
+        candidatos = []
+        for df in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                candidatos.extend(self.celdas.get((fila + df, columna + dc), ()))
+        return candidatos
+
+    def candidatas(self, lat, lon):
+        """Devuelve las paradas que pueden estar a menos de tamano_celda_m del punto"""
+        return [self.paradas[i] for i in self.indices_candidatos(lat, lon)]
+
+    def pares_candidatos(self, lats, lons):
+        """
+        Empareja un lote de puntos con sus paradas candidatas
+        Devuelve dos arrays alineados (posición del punto, posición de la parada)
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        n = len(lats)
+
+        if self.fuerza_bruta:
+            m = len(self.paradas)
+            return np.repeat(np.arange(n), m), np.tile(np.arange(m), n)
+
+        filas = np.floor(lats / self.delta_lat).astype(np.int64).tolist()
+        columnas = np.floor(lons / self.delta_lon).astype(np.int64).tolist()
+
+        puntos, paradas = [], []
+        for i, (fila, columna) in enumerate(zip(filas, columnas)):
+            for df in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    en_celda = self.celdas.get((fila + df, columna + dc))
+                    if en_celda:
+                        puntos.extend([i] * len(en_celda))
+                        paradas.extend(en_celda)
+
+        return np.asarray(puntos, dtype=np.intp), np.asarray(paradas, dtype=np.intp)
+
+    def pares_candidatos_segmentos(self, lats0, lons0, lats1, lons1, max_celdas=400):
+        """
+        Empareja un lote de segmentos (posición anterior -> actual) con las paradas
+        que pueden quedar a menos de tamano_celda_m de algún punto del segmento
+        Devuelve dos arrays alineados (posición del segmento, posición de la parada)
+        """
+        lats0, lons0, lats1, lons1 = (np.asarray(x, dtype=np.float64) for x in (lats0, lons0, lats1, lons1))
+        n = len(lats1)
+
+        if self.fuerza_bruta:
+            m = len(self.paradas)
+            return np.repeat(np.arange(n), m), np.tile(np.arange(m), n)
+
+        filas0 = np.floor(lats0 / self.delta_lat).astype(np.int64)
+        filas1 = np.floor(lats1 / self.delta_lat).astype(np.int64)
+        columnas0 = np.floor(lons0 / self.delta_lon).astype(np.int64)
+        columnas1 = np.floor(lons1 / self.delta_lon).astype(np.int64)
+        filas_min = (np.minimum(filas0, filas1) - 1).tolist()
+        filas_max = (np.maximum(filas0, filas1) + 1).tolist()
+        columnas_min = (np.minimum(columnas0, columnas1) - 1).tolist()
+        columnas_max = (np.maximum(columnas0, columnas1) + 1).tolist()
+
+        segmentos, paradas = [], []
+        for i in range(n):
+            f_min, f_max, c_min, c_max = filas_min[i], filas_max[i], columnas_min[i], columnas_max[i]
+            if (f_max - f_min + 1) * (c_max - c_min + 1) > max_celdas:
+                # Salto anómalo de GPS: revisar solo alrededor de la posición actual
+                f_min, f_max = int(filas1[i]) - 1, int(filas1[i]) + 1
+                c_min, c_max = int(columnas1[i]) - 1, int(columnas1[i]) + 1
+            for fila in range(f_min, f_max + 1):
+                for columna in range(c_min, c_max + 1):
+                    en_celda = self.celdas.get((fila, columna))
+                    if en_celda:
+                        segmentos.extend([i] * len(en_celda))
+                        paradas.extend(en_celda)
+
+        return np.asarray(segmentos, dtype=np.intp), np.asarray(paradas, dtype=np.intp)
+
+    def distancias_minimas(self, lats, lons, radio_max):
+        """
+        Distancia en metros de cada punto a la parada más cercana
+        Primero mide contra las paradas de la grilla fina; los puntos sin
+        ninguna parada a menos de tamano_celda_m se resuelven con una segunda
+        grilla de celdas de radio_max metros. Los puntos sin paradas a menos
+        de radio_max devuelven radio_max (cota inferior)
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        resultado = np.full(len(lats), float(radio_max))
+
+        puntos, paradas = self.pares_candidatos(lats, lons)
+        if len(puntos):
+            distancias = distancias_haversine(lats[puntos], lons[puntos], self.latitudes[paradas], self.longitudes[paradas])
+            np.minimum.at(resultado, puntos, distancias)
+
+        # Solo son exactos los mínimos dentro del radio que cubre la grilla fina
+        lejanos = np.flatnonzero(resultado > self.tamano_celda_m)
+        if len(lejanos) and radio_max > self.tamano_celda_m:
+            if self._grilla_gruesa is None or self._grilla_gruesa.tamano_celda_m != radio_max:
+                self._grilla_gruesa = IndiceParadas(self.paradas, radio_max)
+
+            puntos, paradas = self._grilla_gruesa.pares_candidatos(lats[lejanos], lons[lejanos])
+            if len(puntos):
+                distancias = distancias_haversine(
+                    lats[lejanos][puntos], lons[lejanos][puntos], self.latitudes[paradas], self.longitudes[paradas]
+                )
+                minimos = np.full(len(lejanos), float(radio_max))
+                np.minimum.at(minimos, puntos, distancias)
+                resultado[lejanos] = np.minimum(resultado[lejanos], minimos)
+
+        return resultado
@@ -1,89 +1,30 @@
-import requests
+import asyncio
 import time
 import os
 from datetime import datetime
-from dotenv import load_dotenv
-
-# Cargar variables de entorno
-load_dotenv()
+from poller_async import PollerAsync
+from cliente_stm import obtener_cliente
 
 # Configuración
-API_BASE_URL = "https://api.montevideo.gub.uy/api/transportepublico"
-AUTH_URL = "https://mvdapi-auth.montevideo.gub.uy/token"
-CLIENT_ID = os.getenv("CLIENT_ID", "").strip()
-CLIENT_SECRET = os.getenv("CLIENT_SECRET", "").strip()
 PARADA_ID = None  # Se configurará al inicio
 INTERVALO_ACTUALIZACION = 15  # segundos
 
-# Token de acceso (se renovará automáticamente)
-access_token = None
-token_expiry = 0
-
-# Sesión global para mantener cookies
-api_session = requests.Session()
+# Cliente de la API compartido (el token se renueva automáticamente en segundo plano)
+cliente = obtener_cliente()
 
 
 def obtener_token():
     """
     Obtiene un token de acceso OAuth2 usando client credentials
     """
-    global access_token, token_expiry, api_session
-
-    # Headers exactos que usa Postman
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "User-Agent": "PostmanRuntime/7.50.0",
-        "Accept": "*/*",
-        "Cache-Control": "no-cache",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-    }
-
-    payload = {"grant_type": "client_credentials"}
-
-    try:
-        print(f"🔍 Obteniendo token de acceso...")
-
-        # Usar sesión para manejar cookies automáticamente (F5 load balancer)
-        response = api_session.post(
-            AUTH_URL,
-            data=payload,
-            auth=(CLIENT_ID, CLIENT_SECRET),
-            headers=headers,
-            timeout=10,
-        )
-
-        print(f"Status: {response.status_code}")
-
-        response.raise_for_status()
-
-        token_data = response.json()
-        access_token = token_data.get("access_token")
-        expires_in = token_data.get("expires_in", 300)  # 300s por defecto
-        token_expiry = time.time() + expires_in - 30  # Renovar 30s antes
-
-        print(f"✓ Token obtenido (válido por {expires_in}s)")
-        return True
-
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error al obtener token: {e}")
-        if hasattr(e, "response") and e.response is not None:
-            print(f"Status Code: {e.response.status_code}")
-            content_type = e.response.headers.get("Content-Type", "")
-            if "html" not in content_type.lower():
-                print(f"Response: {e.response.text[:500]}")
-            else:
-                print("Respuesta HTML (posible bloqueo WAF)")
-        return False
+    return cliente.obtener_token()
 
 
 def verificar_token():
     """
     Verifica si el token es válido y lo renueva si es necesario
     """
-    if not access_token or time.time() >= token_expiry:
-        return obtener_token()
-    return True
+    return cliente.verificar_token()
 
 
 def limpiar_pantalla():
@@ -95,39 +36,16 @@ def obtener_buses_proximos(parada_id, lineas=None):
     """
     Obtiene los buses próximos a llegar a una parada
     """
-    # Verificar/renovar token
-    if not verificar_token():
-        return None
-
-    url = f"{API_BASE_URL}/buses/busstops/{parada_id}/upcomingbuses"
-
-    # Headers con token de acceso
-    headers = {
-        "Accept": "application/json",
-        "Authorization": f"Bearer {access_token}",
-        "User-Agent": "PostmanRuntime/7.50.0",
-    }
-
     params = {"amountperline": 3}  # Mostrar los próximos 3 buses por línea
 
     # Si se especifican líneas, agregarlas al filtro
     if lineas:
         params["lines"] = ",".join(lineas)
 
-    try:
-        # Usar la misma sesión que tiene las cookies
-        response = api_session.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error al consultar la API: {e}")
-        if hasattr(e, "response") and e.response is not None:
-            print(f"Status: {e.response.status_code}")
-            print(f"Respuesta: {e.response.text[:300]}")
-        return None
-
-
-def mostrar_buses(buses_data):
+    return cliente.get(f"/buses/busstops/{parada_id}/upcomingbuses", params)
+
+
+def mostrar_buses(buses_data, parada_id=None):
     """
     Muestra la información de buses de forma organizada
     """
@@ -136,7 +54,7 @@ def mostrar_buses(buses_data):
         return
 
     print(f"\n{'=' * 60}")
-    print(f"  PRÓXIMOS BUSES - Parada {PARADA_ID}")
+    print(f"  PRÓXIMOS BUSES - Parada {parada_id or PARADA_ID}")
     print(f"  Actualizado: {datetime.now().strftime('%H:%M:%S')}")
     print(f"{'=' * 60}\n")
 
@@ -176,7 +94,7 @@ def buscar_parada():
     respuesta = input().lower()
 
     if respuesta == "s":
-        parada = input("Ingresa el ID de tu parada: ")
+        parada = input("Ingresa el ID de tu parada (o varios separados por comas): ")
         return parada
     else:
         print("\nPara encontrar tu parada, puedes:")
@@ -209,7 +127,7 @@ def main():
     print("=" * 60)
 
     # Verificar credenciales
-    if not CLIENT_ID or not CLIENT_SECRET:
+    if not cliente.client_id or not cliente.client_secret:
         print("\n⚠️  ERROR: Faltan las credenciales de la API")
         print("\nCrea un archivo .env en la misma carpeta con:")
         print("  CLIENT_ID=tu_client_id")
@@ -235,7 +153,13 @@ def main():
     print("\nIniciando monitoreo...")
     time.sleep(2)
 
+    paradas = [p.strip() for p in PARADA_ID.split(",") if p.strip()]
+
     # Loop principal
+    if len(paradas) > 1:
+        monitorear_paradas(paradas, lineas_filtro)
+        return
+
     try:
         while True:
             limpiar_pantalla()
@@ -246,5 +170,24 @@ def main():
         print("\n\n¡Hasta luego! 👋")
 
 
+def monitorear_paradas(paradas, lineas_filtro=None):
+    """
+    Monitorea varias paradas a la vez: las consultas de cada ciclo salen en paralelo
+    """
+    poller = PollerAsync(cliente, intervalo=INTERVALO_ACTUALIZACION)
+
+    def al_recibir(_, proximos):
+        limpiar_pantalla()
+        for parada_id, buses in proximos.items():
+            mostrar_buses(buses, parada_id)
+
+    try:
+        asyncio.run(poller.ejecutar(al_recibir, paradas=paradas, lineas_paradas=lineas_filtro))
+    except KeyboardInterrupt:
+        print("\n\n¡Hasta luego! 👋")
+    finally:
+        poller.cerrar()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,183 @@
+"""
+Métricas del tracker en formato de texto de Prometheus
+
+Contadores, gauges e histogramas en memoria, sin dependencias, y un servidor
+HTTP local que los expone en /metrics:
+
+    curl http://127.0.0.1:9108/metrics
+
+Cada métrica tiene su propio lock y actualizarla es una suma (o una búsqueda
+binaria en los buckets), así que instrumentar el loop no le agrega costo apreciable.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Buckets de latencia en segundos (de 1ms a 30s)
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Buckets para cantidades por ciclo (bondis, pasadas)
+BUCKETS_CANTIDAD = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_registro = {}  # {nombre: métrica}, en orden de registro
+_lock_registro = threading.Lock()
+
+
+def _etiquetas(nombres, valores, extra=""):
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = None
+
+    def __new__(cls, nombre, *args, **kwargs):
+        """Si ya hay una métrica con ese nombre (un módulo importado dos veces) se devuelve esa"""
+        with _lock_registro:
+            existente = _registro.get(nombre)
+        if existente is None:
+            return super().__new__(cls)
+        if type(existente) is not cls:
+            raise ValueError(f"{nombre} ya está registrada como {existente.tipo}")
+        return existente
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        if "_series" in self.__dict__:
+            return  # Ya registrada: no se pierden las series acumuladas
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+        self._series = {}
+        with _lock_registro:
+            _registro[nombre] = self
+
+    def _clave(self, valores):
+        if not valores and not self.etiquetas:
+            return ()
+        if len(valores) != len(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera las etiquetas {self.etiquetas}")
+        return tuple(str(v) for v in valores)
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        with self._lock:
+            series = list(self._series.items())
+        for clave, valor in sorted(series):
+            lineas.extend(self._lineas(clave, valor))
+        return lineas
+
+    def _lineas(self, clave, valor):
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}"]
+
+
+class Contador(_Metrica):
+    """Valor que solo crece (eventos, errores, pasadas registradas)"""
+
+    tipo = "counter"
+
+    def inc(self, cantidad=1, *etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._series[clave] = self._series.get(clave, 0) + cantidad
+
+
+class Gauge(_Metrica):
+    """Valor que sube y baja (intervalo actual, bondis en memoria)"""
+
+    tipo = "gauge"
+
+    def set(self, valor, *etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._series[clave] = valor
+
+
+class Histograma(_Metrica):
+    """Distribución de observaciones en buckets acumulativos, con suma y cantidad"""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, buckets=BUCKETS_LATENCIA, etiquetas=()):
+        if "_series" in self.__dict__:
+            return
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor, *etiquetas):
+        clave = self._clave(etiquetas)
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                # [conteo por bucket..., conteo sobre el último bucket, suma]
+                serie = self._series[clave] = [0] * (len(self.buckets) + 1) + [0.0]
+            serie[i] += 1
+            serie[-1] += valor
+
+    @contextmanager
+    def medir(self, *etiquetas):
+        """Observa la duración en segundos del bloque"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, *etiquetas)
+
+    def _lineas(self, clave, serie):
+        lineas = []
+        acumulado = 0
+        for limite, conteo in zip(self.buckets + (float("inf"),), serie[:-1]):
+            acumulado += conteo
+            le = 'le="' + _numero(limite) + '"'
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, le)} {acumulado}")
+        lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(serie[-1])}")
+        lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {acumulado}")
+        return lineas
+
+
+def exponer():
+    """Todas las métricas registradas en formato de texto de Prometheus"""
+    with _lock_registro:
+        metricas = list(_registro.values())
+    lineas = []
+    for metrica in metricas:
+        lineas.extend(metrica.exponer())
+    return "\n".join(lineas) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        cuerpo = exponer().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass  # Sin una línea por cada scrape
+
+
+def iniciar_servidor(puerto, host="127.0.0.1"):
+    """Sirve /metrics desde un hilo en segundo plano; devuelve el servidor (server.shutdown() para detenerlo)"""
+    servidor = ThreadingHTTPServer((host, puerto), _Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    return servidor
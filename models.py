@@ -1,11 +1,33 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Numeric, ForeignKey, Index
+from sqlalchemy import (
+    cast, create_engine, event, insert, update, delete, select, case, func, literal, text, Column, Integer, String, DateTime, Float, Numeric,
+    ForeignKey, Index,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
-from datetime import datetime
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import relationship, scoped_session, sessionmaker
+from psycopg2.extras import execute_values
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+import csv
+import io
 import os
+import re
+import threading
+
+from metricas import Contador, Histograma
 
 Base = declarative_base()
 
+LATENCIA_ESCRITURA = Histograma(
+    "tracker_escritura_pasadas_segundos", "Duración de la escritura de pasadas (commit incluido)", etiquetas=("metodo",)
+)
+PASADAS_ESCRITAS = Contador("tracker_pasadas_escritas_total", "Pasadas escritas en la base", ("metodo",))
+PASADAS_DUPLICADAS = Contador(
+    "tracker_pasadas_duplicadas_total", "Pasadas que la base no insertó por estar en cooldown", ("metodo",)
+)
+
 
 class BusStop(Base):
     __tablename__ = 'bus_stops'
@@ -27,6 +49,22 @@ class BusStop(Base):
         Index('index_bus_stops_on_latitude_and_longitude', 'latitude', 'longitude'),
     )
 
+    SYNC_COLUMNS = ("street1", "street2", "street1_id", "street2_id", "latitude", "longitude")
+
+    @classmethod
+    def _values_from_api(cls, data):
+        """Convierte una parada de la API en los valores de columna de la tabla"""
+        coordinates = data.get("location", {}).get("coordinates", [])
+        return {
+            "busstop_id": data.get("busstopId"),
+            "street1": data.get("street1") or "SIN NOMBRE",
+            "street2": data.get("street2") or "SIN DENOMINACIÓN",
+            "street1_id": data.get("street1Id"),
+            "street2_id": data.get("street2Id"),
+            "latitude": coordinates[1] if len(coordinates) > 1 else None,
+            "longitude": coordinates[0] if len(coordinates) > 0 else None,
+        }
+
     @classmethod
     def find_or_create_from_api(cls, session, data):
         """Encuentra o crea una parada a partir de datos de la API"""
@@ -34,21 +72,72 @@ class BusStop(Base):
         stop = session.query(cls).filter_by(busstop_id=busstop_id).first()
         
         if not stop:
-            coordinates = data.get("location", {}).get("coordinates", [])
-            stop = cls(
-                busstop_id=busstop_id,
-                street1=data.get("street1") or "SIN NOMBRE",
-                street2=data.get("street2") or "SIN DENOMINACIÓN",
-                street1_id=data.get("street1Id"),
-                street2_id=data.get("street2Id"),
-                latitude=coordinates[1] if len(coordinates) > 1 else None,
-                longitude=coordinates[0] if len(coordinates) > 0 else None
-            )
+            stop = cls(**cls._values_from_api(data))
             session.add(stop)
             session.commit()
         
         return stop
 
+    @classmethod
+    def sync_from_api(cls, session, paradas):
+        """
+        Sincroniza en bloque el catálogo de paradas con la respuesta de la API
+        Compara contra las filas existentes y aplica solo las altas y cambios
+        en una única sentencia (idempotente: una segunda corrida no escribe nada)
+
+        Returns:
+            dict con la cantidad de paradas "added", "changed" y "unchanged"
+        """
+        nuevas = {}
+        for data in paradas:
+            values = cls._values_from_api(data)
+            if values["busstop_id"] is None or values["latitude"] is None or values["longitude"] is None:
+                continue
+            nuevas[values["busstop_id"]] = values
+
+        existentes = {
+            row.busstop_id: row
+            for row in session.query(cls.id, cls.busstop_id, *(getattr(cls, c) for c in cls.SYNC_COLUMNS))
+        }
+
+        added, changed = [], []
+        for busstop_id, values in nuevas.items():
+            row = existentes.get(busstop_id)
+            if row is None:
+                added.append(values)
+            elif any(_normalize(getattr(row, c)) != _normalize(values[c]) for c in cls.SYNC_COLUMNS):
+                changed.append(dict(values, id=row.id))
+
+        if added or changed:
+            now = datetime.utcnow()
+            dialect = session.get_bind().dialect.name
+
+            if dialect in ("postgresql", "sqlite"):
+                dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = dialect_insert(cls)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["busstop_id"],
+                    set_={c: stmt.excluded[c] for c in cls.SYNC_COLUMNS + ("updated_at",)},
+                )
+                rows = [
+                    dict(values, created_at=now, updated_at=now)
+                    for values in added + [{k: v for k, v in c.items() if k != "id"} for c in changed]
+                ]
+                session.execute(stmt, rows)
+            else:
+                if added:
+                    session.execute(insert(cls), [dict(v, created_at=now, updated_at=now) for v in added])
+                if changed:
+                    session.execute(update(cls), [dict(v, updated_at=now) for v in changed])
+
+            session.commit()
+
+        return {
+            "added": len(added),
+            "changed": len(changed),
+            "unchanged": len(nuevas) - len(added) - len(changed),
+        }
+
     def __repr__(self):
         return f"<BusStop(id={self.id}, busstop_id={self.busstop_id}, {self.street1} y {self.street2})>"
 
@@ -74,48 +163,658 @@ class BusPassage(Base):
         Index('index_bus_passages_on_bus_stop_id_and_detected_at', 'bus_stop_id', 'detected_at'),
     )
 
+    COPY_COLUMNS = (
+        "bus_stop_id", "line", "destination", "bus_code", "bus_latitude", "bus_longitude",
+        "detected_at", "eta_minutes", "created_at", "updated_at",
+    )
+
     @classmethod
-    def create_from_bus_data(cls, session, bus_stop, bus_data, detected_at=None):
-        """Crea un registro de pasada de bondi a partir de datos de la API"""
+    def values_from_bus_data(cls, bus_stop_id, bus_data, detected_at=None):
+        """Convierte los datos de un bondi de la API en los valores de columna de una pasada"""
         if detected_at is None:
             detected_at = datetime.utcnow()
         
         coordinates = bus_data.get("location", {}).get("coordinates", [])
         eta = bus_data.get("eta", {})
         
-        passage = cls(
-            bus_stop_id=bus_stop.id,
-            line=bus_data.get("line"),
-            destination=bus_data.get("destination"),
-            bus_code=bus_data.get("busCode"),
-            bus_latitude=coordinates[1] if len(coordinates) > 1 else None,
-            bus_longitude=coordinates[0] if len(coordinates) > 0 else None,
-            detected_at=detected_at,
-            eta_minutes=eta.get("minutes") if isinstance(eta, dict) else None
-        )
-        session.add(passage)
-        session.commit()
+        return {
+            "bus_stop_id": bus_stop_id,
+            "line": bus_data.get("line"),
+            "destination": bus_data.get("destination"),
+            "bus_code": cls.bus_code_from_data(bus_data),
+            "bus_latitude": coordinates[1] if len(coordinates) > 1 else None,
+            "bus_longitude": coordinates[0] if len(coordinates) > 0 else None,
+            "detected_at": detected_at,
+            "eta_minutes": eta.get("minutes") if isinstance(eta, dict) else None,
+        }
+
+    @staticmethod
+    def bus_code_from_data(bus_data):
+        """
+        Código del bondi como texto: busCode si viene, si no busId (lo único que manda /buses)
+        Es el mismo código con el que el tracker y bus_passage_cooldowns llevan los cooldowns
+        """
+        codigo = bus_data.get("busCode") or bus_data.get("busId")
+        return str(codigo) if codigo else None
+
+    @classmethod
+    def create_from_bus_data(cls, session, bus_stop, bus_data, detected_at=None, cooldown_seconds=None):
+        """
+        Crea un registro de pasada de bondi a partir de datos de la API
+        Con cooldown_seconds la pasada solo se inserta si la base no tiene otra del mismo
+        bondi en la misma parada dentro de ese tiempo (BusPassageCooldown); si no, devuelve None
+        """
+        values = cls.values_from_bus_data(bus_stop.id, bus_data, detected_at)
+        with LATENCIA_ESCRITURA.medir("unitaria"):
+            if cooldown_seconds and not BusPassageCooldown.claim(session, [values], cooldown_seconds):
+                session.rollback()
+                PASADAS_DUPLICADAS.inc(1, "unitaria")
+                return None
+            passage = cls(**values)
+            session.add(passage)
+            BusPassageRollup.accumulate(session, [values])
+            session.commit()
+        PASADAS_ESCRITAS.inc(1, "unitaria")
         
         return passage
 
+    @classmethod
+    def bulk_create(cls, session, rows, method="copy"):
+        """
+        Inserta un lote de pasadas (dicts de values_from_bus_data) en una sola operación
+        En PostgreSQL usa COPY (method="copy") o execute_values (method="values");
+        en otros motores un INSERT con executemany. No hace commit.
+        """
+        if not rows:
+            return 0
+
+        now = datetime.utcnow()
+        rows = [dict(row, created_at=row.get("created_at") or now, updated_at=now) for row in rows]
+
+        if session.get_bind().dialect.name == "postgresql":
+            cursor = session.connection().connection.cursor()
+            columns = ", ".join(cls.COPY_COLUMNS)
+            try:
+                if method == "copy":
+                    buffer = io.StringIO()
+                    # QUOTE_NOTNULL: los None quedan sin comillas y COPY los lee como NULL
+                    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+                    writer.writerows([row[c] for c in cls.COPY_COLUMNS] for row in rows)
+                    buffer.seek(0)
+                    cursor.copy_expert(f"COPY {cls.__tablename__} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+                else:
+                    execute_values(
+                        cursor,
+                        f"INSERT INTO {cls.__tablename__} ({columns}) VALUES %s",
+                        [tuple(row[c] for c in cls.COPY_COLUMNS) for row in rows],
+                        page_size=1000,
+                    )
+            finally:
+                cursor.close()
+        else:
+            session.execute(insert(cls), rows)
+
+        return len(rows)
+
+    @classmethod
+    def headways(cls, dialect, desde, hasta, max_seconds, *filtros):
+        """
+        SELECT de las pasadas en [desde, hasta) con la pasada anterior de la misma parada y
+        línea (LAG) y el intervalo en segundos, o NULL si la anterior está a más de max_seconds.
+        Solo se leen pasadas desde `desde - max_seconds`, así el rango usa el índice por fecha.
+        """
+        ventana = select(
+            cls.id,
+            cls.bus_stop_id,
+            cls.line,
+            cls.detected_at,
+            func.lag(cls.detected_at).over(
+                partition_by=(cls.bus_stop_id, cls.line), order_by=cls.detected_at
+            ).label("previa"),
+        ).where(
+            cls.detected_at >= desde - timedelta(seconds=max_seconds),
+            cls.detected_at < hasta,
+            *filtros,
+        ).subquery()
+
+        intervalo = segundos_entre(dialect, ventana.c.detected_at, ventana.c.previa)
+        return select(
+            ventana,
+            case((intervalo.between(0, max_seconds), intervalo)).label("headway_seconds"),
+        ).where(ventana.c.detected_at >= desde)
+
     def __repr__(self):
         return f"<BusPassage(id={self.id}, line={self.line}, detected_at={self.detected_at})>"
 
 
-def get_db_engine(database_url=None):
-    """Crea el engine de SQLAlchemy para conectarse a la base de datos"""
+class BusPassageRollup(Base):
+    """
+    Resumen por parada, línea y hora (UTC) de bus_passages
+    La frecuencia de cada pasada se mide contra la pasada anterior de la misma
+    parada y línea (aunque haya sido en otra hora) y cuenta en la hora de la más nueva
+    """
+    __tablename__ = 'bus_passage_rollups'
+
+    id = Column(Integer, primary_key=True)
+    bus_stop_id = Column(Integer, ForeignKey('bus_stops.id'), nullable=False)
+    line = Column(String, nullable=False)
+    hour = Column(DateTime, nullable=False, index=True)
+    passages = Column(Integer, nullable=False, default=0)
+    first_detected_at = Column(DateTime, nullable=False)
+    last_detected_at = Column(DateTime, nullable=False)
+    headway_sum_seconds = Column(Float, nullable=False, default=0)
+    headway_count = Column(Integer, nullable=False, default=0)
+    max_headway_seconds = Column(Float)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    bus_stop = relationship("BusStop")
+
+    __table_args__ = (
+        Index('index_bus_passage_rollups_on_stop_line_hour', 'bus_stop_id', 'line', 'hour', unique=True),
+    )
+
+    # Intervalos más largos que esto no cuentan como frecuencia (primer bondi del día, cortes de servicio)
+    MAX_HEADWAY_SECONDS = 2 * 3600
+
+    @property
+    def mean_headway_seconds(self):
+        return self.headway_sum_seconds / self.headway_count if self.headway_count else None
+
+    @staticmethod
+    def _utc(value):
+        """datetime naive en UTC, como se guarda detected_at"""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @classmethod
+    def _last_detections(cls, session, keys, desde):
+        """Última pasada ya resumida de cada (bus_stop_id, line) desde `desde`"""
+        stops = {stop for stop, _ in keys}
+        rows = session.query(
+            cls.bus_stop_id, cls.line, func.max(cls.last_detected_at)
+        ).filter(
+            cls.bus_stop_id.in_(stops),
+            cls.hour >= desde.replace(minute=0, second=0, microsecond=0),
+        ).group_by(cls.bus_stop_id, cls.line)
+        return {(stop, line): last for stop, line, last in rows if (stop, line) in keys}
+
+    @classmethod
+    def accumulate(cls, session, rows):
+        """
+        Suma un lote de pasadas nuevas (dicts de values_from_bus_data) al resumen por hora
+        Pensado para pasadas que llegan en orden; el resumen exacto de datos viejos
+        o desordenados se arma con rebuild(). No hace commit.
+        """
+        por_clave = defaultdict(list)
+        for row in rows:
+            por_clave[(row["bus_stop_id"], row["line"])].append(cls._utc(row["detected_at"]))
+        if not por_clave:
+            return 0
+
+        desde = min(min(tiempos) for tiempos in por_clave.values()) - timedelta(seconds=cls.MAX_HEADWAY_SECONDS)
+        previas = cls._last_detections(session, por_clave.keys(), desde)
+
+        horas = {}
+        for (stop, line), tiempos in por_clave.items():
+            previa = previas.get((stop, line))
+            for t in sorted(tiempos):
+                hour = t.replace(minute=0, second=0, microsecond=0)
+                fila = horas.get((stop, line, hour))
+                if fila is None:
+                    fila = horas[(stop, line, hour)] = {
+                        "bus_stop_id": stop, "line": line, "hour": hour, "passages": 0,
+                        "first_detected_at": t, "last_detected_at": t,
+                        "headway_sum_seconds": 0.0, "headway_count": 0, "max_headway_seconds": None,
+                    }
+                fila["passages"] += 1
+                fila["first_detected_at"] = min(fila["first_detected_at"], t)
+                fila["last_detected_at"] = max(fila["last_detected_at"], t)
+                if previa is not None and 0 <= (t - previa).total_seconds() <= cls.MAX_HEADWAY_SECONDS:
+                    headway = (t - previa).total_seconds()
+                    fila["headway_sum_seconds"] += headway
+                    fila["headway_count"] += 1
+                    fila["max_headway_seconds"] = max(fila["max_headway_seconds"] or 0.0, headway)
+                previa = t
+
+        now = datetime.utcnow()
+        filas = [dict(fila, created_at=now, updated_at=now) for fila in horas.values()]
+        dialect = session.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            # min()/max() de SQLite con varios argumentos son los least()/greatest() de PostgreSQL
+            least, greatest = (func.least, func.greatest) if dialect == "postgresql" else (func.min, func.max)
+            stmt = dialect_insert(cls)
+            nueva, actual = stmt.excluded, cls.__table__.c
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["bus_stop_id", "line", "hour"],
+                set_={
+                    "passages": actual.passages + nueva.passages,
+                    "first_detected_at": least(actual.first_detected_at, nueva.first_detected_at),
+                    "last_detected_at": greatest(actual.last_detected_at, nueva.last_detected_at),
+                    "headway_sum_seconds": actual.headway_sum_seconds + nueva.headway_sum_seconds,
+                    "headway_count": actual.headway_count + nueva.headway_count,
+                    "max_headway_seconds": greatest(
+                        func.coalesce(actual.max_headway_seconds, nueva.max_headway_seconds),
+                        func.coalesce(nueva.max_headway_seconds, actual.max_headway_seconds),
+                    ),
+                    "updated_at": nueva.updated_at,
+                },
+            )
+            session.execute(stmt, filas)
+        else:
+            for fila in filas:
+                actual = session.query(cls).filter_by(
+                    bus_stop_id=fila["bus_stop_id"], line=fila["line"], hour=fila["hour"]
+                ).first()
+                if actual is None:
+                    session.add(cls(**fila))
+                    continue
+                actual.passages += fila["passages"]
+                actual.first_detected_at = min(actual.first_detected_at, fila["first_detected_at"])
+                actual.last_detected_at = max(actual.last_detected_at, fila["last_detected_at"])
+                actual.headway_sum_seconds += fila["headway_sum_seconds"]
+                actual.headway_count += fila["headway_count"]
+                if fila["max_headway_seconds"] is not None:
+                    actual.max_headway_seconds = max(actual.max_headway_seconds or 0.0, fila["max_headway_seconds"])
+
+        return len(filas)
+
+    @classmethod
+    def rebuild(cls, session, desde, hasta):
+        """
+        Rearma el resumen de las horas en [desde, hasta) desde bus_passages con un solo
+        INSERT ... SELECT (LAG por parada y línea para las frecuencias). No hace commit.
+        """
+        desde = cls._utc(desde).replace(minute=0, second=0, microsecond=0)
+        hasta = cls._utc(hasta)
+        # Solo horas completas: si `hasta` cae a mitad de hora, esa hora entra entera
+        if hasta != hasta.replace(minute=0, second=0, microsecond=0):
+            hasta = hasta.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        dialect = session.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            raise ValueError(f"rebuild necesita PostgreSQL o SQLite, no {dialect} (usar accumulate)")
+
+        pasadas = BusPassage.headways(dialect, desde, hasta, cls.MAX_HEADWAY_SECONDS).subquery()
+        headway = pasadas.c.headway_seconds
+        hour = truncar_hora(dialect, pasadas.c.detected_at)
+        now = datetime.utcnow()
+        resumen = select(
+            pasadas.c.bus_stop_id,
+            pasadas.c.line,
+            hour,
+            func.count(),
+            func.min(pasadas.c.detected_at),
+            func.max(pasadas.c.detected_at),
+            func.coalesce(func.sum(headway), 0.0),
+            func.count(headway),
+            func.max(headway),
+            literal(now, DateTime),
+            literal(now, DateTime),
+        ).group_by(pasadas.c.bus_stop_id, pasadas.c.line, hour)
+
+        session.execute(delete(cls).where(cls.hour >= desde, cls.hour < hasta))
+        resultado = session.execute(insert(cls).from_select(
+            ["bus_stop_id", "line", "hour", "passages", "first_detected_at", "last_detected_at",
+             "headway_sum_seconds", "headway_count", "max_headway_seconds", "created_at", "updated_at"],
+            resumen,
+        ))
+        return resultado.rowcount
+
+    def __repr__(self):
+        return f"<BusPassageRollup(bus_stop_id={self.bus_stop_id}, line={self.line}, hour={self.hour})>"
+
+
+class BusPassageCooldown(Base):
+    """
+    Última pasada registrada de cada bondi en cada parada, es decir su ventana de cooldown
+    La clave única (bus_stop_id, bus_code) hace que la base decida qué pasadas entran
+    (claim): sobrevive a los reinicios y dos trackers en paralelo no duplican pasadas.
+    """
+    __tablename__ = 'bus_passage_cooldowns'
+
+    id = Column(Integer, primary_key=True)
+    bus_stop_id = Column(Integer, ForeignKey('bus_stops.id'), nullable=False)
+    bus_code = Column(String, nullable=False)
+    detected_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    bus_stop = relationship("BusStop")
+
+    __table_args__ = (
+        Index('index_bus_passage_cooldowns_on_stop_and_bus', 'bus_stop_id', 'bus_code', unique=True),
+    )
+
+    @classmethod
+    def claim(cls, session, rows, seconds):
+        """
+        Filtra un lote de pasadas (dicts de values_from_bus_data) y devuelve las que se pueden
+        insertar: las que no tienen bus_code y las que llegan al menos `seconds` después de la
+        última pasada registrada del mismo bondi en la misma parada (en la base o antes en el
+        lote). Las más viejas que esa se descartan, así repetir un lote no inserta nada.
+        No hace commit.
+        """
+        por_clave = defaultdict(list)
+        for row in rows:
+            if row.get("bus_code") is not None:
+                por_clave[(row["bus_stop_id"], row["bus_code"])].append(row)
+
+        # Cada ronda lleva a lo sumo una pasada por clave: un upsert no puede tocar dos veces la misma fila
+        rondas = []
+        for filas in por_clave.values():
+            previa = None
+            ronda = 0
+            for row in sorted(filas, key=lambda r: BusPassageRollup._utc(r["detected_at"])):
+                t = BusPassageRollup._utc(row["detected_at"])
+                if previa is not None and (t - previa).total_seconds() < seconds:
+                    continue
+                if ronda == len(rondas):
+                    rondas.append([])
+                rondas[ronda].append(row)
+                ronda += 1
+                previa = t
+
+        aceptadas = set()
+        for ronda in rondas:
+            reservadas = cls._reserve(session, ronda, seconds)
+            aceptadas.update(id(row) for row in ronda if (row["bus_stop_id"], row["bus_code"]) in reservadas)
+        return [row for row in rows if row.get("bus_code") is None or id(row) in aceptadas]
+
+    @classmethod
+    def _reserve(cls, session, rows, seconds):
+        """Upsert de la ventana de cada pasada (una por clave); devuelve las claves que la obtuvieron"""
+        now = datetime.utcnow()
+        valores = [{
+            "bus_stop_id": row["bus_stop_id"],
+            "bus_code": row["bus_code"],
+            "detected_at": BusPassageRollup._utc(row["detected_at"]),
+            "created_at": now,
+            "updated_at": now,
+        } for row in rows]
+        dialect = session.get_bind().dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(cls.__table__)
+            nueva, actual = stmt.excluded, cls.__table__.c
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["bus_stop_id", "bus_code"],
+                set_={"detected_at": nueva.detected_at, "updated_at": nueva.updated_at},
+                # Solo si la pasada es posterior a la ventana de la última registrada
+                where=segundos_entre(dialect, nueva.detected_at, actual.detected_at) >= seconds,
+            ).returning(actual.bus_stop_id, actual.bus_code)
+            return {tuple(fila) for fila in session.execute(stmt, valores)}
+
+        reservadas = set()
+        for fila in valores:
+            actual = session.query(cls).filter_by(
+                bus_stop_id=fila["bus_stop_id"], bus_code=fila["bus_code"]
+            ).with_for_update().first()
+            if actual is None:
+                session.add(cls(**fila))
+            elif (fila["detected_at"] - actual.detected_at).total_seconds() >= seconds:
+                actual.detected_at = fila["detected_at"]
+            else:
+                continue
+            reservadas.add((fila["bus_stop_id"], fila["bus_code"]))
+        session.flush()
+        return reservadas
+
+    @classmethod
+    def active(cls, session, desde):
+        """{(bus_stop_id, bus_code): detected_at} de las ventanas que empezaron desde `desde`"""
+        rows = session.query(cls.bus_stop_id, cls.bus_code, cls.detected_at).filter(
+            cls.detected_at >= BusPassageRollup._utc(desde)
+        )
+        return {(stop, code): detected_at for stop, code, detected_at in rows}
+
+    @classmethod
+    def purge(cls, session, antes):
+        """Borra las ventanas que empezaron antes de `antes` (ya vencidas). No hace commit."""
+        return session.execute(delete(cls).where(cls.detected_at < BusPassageRollup._utc(antes))).rowcount
+
+    def __repr__(self):
+        return f"<BusPassageCooldown(bus_stop_id={self.bus_stop_id}, bus_code={self.bus_code}, detected_at={self.detected_at})>"
+
+
+def _normalize(value):
+    """Normaliza un valor de columna para comparar la base contra la API (Numeric vs float)"""
+    if value is None or isinstance(value, (str, int)):
+        return value
+    return round(float(value), 8)
+
+
+def truncar_hora(dialect, col):
+    """Expresión SQL con el inicio de la hora de una columna DateTime"""
+    if dialect == "sqlite":
+        # Mismo formato con el que SQLAlchemy guarda los DateTime en SQLite
+        return func.strftime("%Y-%m-%d %H:00:00.000000", col)
+    return func.date_trunc("hour", col)
+
+
+def segundos_entre(dialect, a, b):
+    """Expresión SQL con los segundos de b a a (columnas DateTime)"""
+    if dialect == "sqlite":
+        # Segundos enteros más microsegundos por separado: con julianday (un float de días)
+        # 300 s exactos dan 299.99999... y no coinciden con la cuenta en Python
+        return (
+            _segundos_sqlite(a) - _segundos_sqlite(b)
+            + (_microsegundos_sqlite(a) - _microsegundos_sqlite(b)) / 1000000.0
+        )
+    return func.extract("epoch", a - b)
+
+
+# SQLAlchemy guarda los DateTime en SQLite como 'AAAA-MM-DD HH:MM:SS.ffffff'; strftime
+# redondearía la fracción a milisegundos, así que se la corta y se suma aparte
+def _segundos_sqlite(col):
+    return cast(func.strftime("%s", func.substr(col, 1, 19)), Integer)
+
+
+def _microsegundos_sqlite(col):
+    return cast(func.substr(col, 21, 6), Integer)
+
+
+# bus_passages está particionada por mes de detected_at (PARTITION BY RANGE, ver la
+# migración Rails partition_bus_passages); cada mes es la tabla bus_passages_AAAA_MM
+# y bus_passages_default recibe lo que no cae en ningún mes creado
+PARTICION_DEFAULT = "bus_passages_default"
+_LIMITES_PARTICION = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def sumar_meses(mes, meses):
+    """Primer día del mes `meses` después (o antes) de `mes`"""
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nombre_particion(mes):
+    """Nombre de la partición de bus_passages de un mes"""
+    return f"{BusPassage.__tablename__}_{mes:%Y_%m}"
+
+
+def listar_particiones(conn):
+    """[(nombre, desde, hasta)] de las particiones mensuales de bus_passages, ordenadas por fecha"""
+    filas = conn.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:tabla AS regclass)
+    """), {"tabla": BusPassage.__tablename__})
+    particiones = []
+    for nombre, limites in filas:
+        encontrado = _LIMITES_PARTICION.search(limites or "")
+        if encontrado:
+            desde, hasta = (datetime.fromisoformat(v).date() for v in encontrado.groups())
+            particiones.append((nombre, desde, hasta))
+    return sorted(particiones, key=lambda p: p[1])
+
+
+def crear_particiones(conn, desde, meses):
+    """
+    Crea (si faltan) las particiones mensuales de `meses` meses a partir del mes de `desde`
+
+    Si bus_passages_default ya tiene filas de un mes, PostgreSQL no deja crear su
+    partición ("updated partition constraint for default partition would be
+    violated"): en ese caso se desengancha la default, se crea el mes, se mueven
+    sus filas y se vuelve a enganchar, todo dentro de la transacción de `conn`.
+    """
+    tabla = BusPassage.__tablename__
+    mes = desde.replace(day=1)
+    creadas = []
+    existentes = {nombre for nombre, _, _ in listar_particiones(conn)}
+    for _ in range(meses):
+        siguiente = sumar_meses(mes, 1)
+        nombre = nombre_particion(mes)
+        if nombre not in existentes:
+            rango = {"desde": mes, "hasta": siguiente}
+            en_default = conn.execute(text(
+                f"SELECT EXISTS (SELECT 1 FROM {PARTICION_DEFAULT} "
+                f"WHERE detected_at >= :desde AND detected_at < :hasta)"
+            ), rango).scalar()
+            if en_default:
+                conn.execute(text(f"ALTER TABLE {tabla} DETACH PARTITION {PARTICION_DEFAULT}"))
+            conn.execute(text(
+                f"CREATE TABLE {nombre} PARTITION OF {tabla} "
+                f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{siguiente.isoformat()}')"
+            ))
+            if en_default:
+                conn.execute(text(
+                    f"WITH movidas AS (DELETE FROM {PARTICION_DEFAULT} "
+                    f"WHERE detected_at >= :desde AND detected_at < :hasta RETURNING *) "
+                    f"INSERT INTO {nombre} SELECT * FROM movidas"
+                ), rango)
+                conn.execute(text(f"ALTER TABLE {tabla} ATTACH PARTITION {PARTICION_DEFAULT} DEFAULT"))
+            creadas.append(nombre)
+        mes = siguiente
+    return creadas
+
+
+# Modo embebido (DATABASE_URL=sqlite:///bondis.db): pragmas que se aplican a cada conexión
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # Las lecturas no bloquean al escritor ni al revés
+    "synchronous": "NORMAL",  # Con WAL un corte de luz pierde a lo sumo los últimos commits, sin corromper
+    "cache_size": -65536,  # Caché de páginas en KiB (64 MB)
+    "temp_store": "MEMORY",
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,  # Esperar al otro escritor (ms) en vez de fallar con "database is locked"
+    "foreign_keys": "ON",
+}
+
+
+def _configurar_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, valor in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {valor}")
+    finally:
+        cursor.close()
+
+
+# Un engine (con su pool de conexiones) y una fábrica de sesiones por URL y por proceso
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Segundos; renovar antes de que el servidor corte la conexión
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "no")
+
+_engines = {}
+_session_factories = {}
+_scoped_sessions = {}
+_registro_lock = threading.Lock()
+
+
+def _database_url(database_url=None):
     if database_url is None:
         # Usar la misma configuración que Rails en development
         database_url = os.getenv("DATABASE_URL", "postgresql://localhost/bus_tracker_development")
-    
-    engine = create_engine(database_url, echo=False)
+    return str(database_url)
+
+
+def _crear_engine(database_url):
+    opciones = {"echo": False, "pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    url = make_url(database_url)
+    # SQLite en memoria usa un pool de una conexión por hilo, que no acepta tamaño ni desborde
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        opciones.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+    engine = create_engine(url, **opciones)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _configurar_sqlite)
+        # Sin PostgreSQL no hay migraciones de Rails: las tablas que falten se crean acá
+        Base.metadata.create_all(engine)
     return engine
 
 
+def get_db_engine(database_url=None):
+    """
+    Engine de SQLAlchemy compartido para la URL (por defecto DATABASE_URL)
+    Se crea la primera vez y después se reutiliza junto con su pool de conexiones.
+    Los procesos hijos no heredan el del padre: cada proceso arma el suyo.
+    """
+    clave = (os.getpid(), _database_url(database_url))
+    engine = _engines.get(clave)
+    if engine is None:
+        with _registro_lock:
+            engine = _engines.get(clave)
+            if engine is None:
+                engine = _engines[clave] = _crear_engine(clave[1])
+    return engine
+
+
+def dispose_engines(database_url=None):
+    """Cierra el pool y olvida el engine de la URL (o todos los del proceso)"""
+    with _registro_lock:
+        for clave in list(_engines):
+            if clave[0] == os.getpid() and (database_url is None or clave[1] == _database_url(database_url)):
+                engine = _engines.pop(clave)
+                _session_factories.pop(engine, None)
+                scoped = _scoped_sessions.pop(engine, None)
+                if scoped is not None:
+                    scoped.remove()
+                engine.dispose()
+
+
+def get_session_factory(engine=None):
+    """sessionmaker compartido para el engine (por defecto el de DATABASE_URL)"""
+    if engine is None:
+        engine = get_db_engine()
+    fabrica = _session_factories.get(engine)
+    if fabrica is None:
+        with _registro_lock:
+            fabrica = _session_factories.setdefault(engine, sessionmaker(bind=engine))
+    return fabrica
+
+
 def get_session(engine=None):
-    """Crea una sesión de SQLAlchemy"""
+    """Crea una sesión de SQLAlchemy (hay que cerrarla; ver también session_scope)"""
+    return get_session_factory(engine)()
+
+
+@contextmanager
+def session_scope(engine=None):
+    """Sesión que hace commit al salir del bloque, rollback si hubo una excepción, y siempre se cierra"""
+    session = get_session(engine)
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_scoped_session(engine=None):
+    """
+    Registro de sesiones por hilo (scoped_session) para workers concurrentes:
+    cada hilo que llama al registro obtiene su propia sesión, y la libera con .remove()
+    """
     if engine is None:
         engine = get_db_engine()
-    
-    Session = sessionmaker(bind=engine)
-    return Session()
+    scoped = _scoped_sessions.get(engine)
+    if scoped is None:
+        fabrica = get_session_factory(engine)
+        with _registro_lock:
+            scoped = _scoped_sessions.setdefault(engine, scoped_session(fabrica))
+    return scoped
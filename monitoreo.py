@@ -0,0 +1,478 @@
+"""
+Monitoreo de bondis por proximidad a paradas: configuración, loop de
+consulta, detección y escritura, y las métricas del tracker
+
+tracker.py es la línea de comandos. Este módulo nunca es el __main__, así
+los procesos worker de supervisor.py lo importan una sola vez (con spawn el
+script principal se vuelve a ejecutar como __mp_main__ en cada worker).
+"""
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from models import Base, BusStop, BusPassage, BusPassageCooldown, dispose_engines, get_db_engine, get_session
+from indice_paradas import IndiceParadas
+from distancias import calcular_distancia, calcular_distancias, coordenadas_bondis, fraccion_aproximacion
+from catalogos import obtener_catalogo
+from escritor_pasadas import EscritorPasadas
+from poller_async import PollerAsync, buses_de_grupos
+from cliente_stm import obtener_cliente
+from planificador import PlanificadorAdaptativo
+from estado_buses import TablaEstadoBuses
+from grabacion import FinGrabacion, RelojVirtual, ReproductorGrabacion
+from metricas import BUCKETS_CANTIDAD, Contador, Gauge, Histograma
+
+# ============ CONFIGURACIÓN DE MONITOREO ============
+MONITORED_LINES = ["147", "148", "149", "151", "157", "174"]  # Líneas de bondis a monitorear
+LINE_VARIANT_IDS = []
+# LINE_VARIANT_IDS = [
+#     "4420",
+#     "4424",
+#     "4426",
+#     "4462",
+#     "4467",
+#     "4470",
+#     "4824",
+#     "8903",
+#     "4543"
+# ]  # IDs de variantes de línea (vacío = todas las variantes)
+MONITORED_LINE_GROUPS = []  # Grupos de líneas a consultar en paralelo, ej: [["147", "148"], ["149", "151"]] (vacío = una consulta con MONITORED_LINES)
+POLLER_MAX_CONCURRENCY = 8  # Máximo de consultas simultáneas a la API
+WORKER_PROCESSES = 1  # Más de 1: supervisor que reparte las líneas entre procesos worker (ver supervisor.py)
+MONITORED_STOP_ID = 2071 # ID de la parada a monitorear
+MULTI_STOP_MODE = False  # True = monitorear varias paradas a la vez en lugar de solo MONITORED_STOP_ID
+MONITORED_STOP_IDS = []  # Paradas a monitorear en modo multiparada (vacío = todas las paradas)
+PROXIMITY_THRESHOLD_METERS = 100  # Distancia máxima para considerar que el bondi está en la parada
+DISTANCE_MODE = "geodesic"  # Precisión de distancias: "geodesic" (WGS-84), o "haversine"/"equirectangular" (más rápidos, hasta ~0,3% de error)
+CHECK_INTERVAL_SECONDS = 15  # Intervalo entre consultas (fijo, o si no hay datos en modo adaptativo)
+ADAPTIVE_POLLING = True  # Ajustar el intervalo según lo cerca que estén los bondis de las paradas
+MIN_INTERVAL_SECONDS = 5  # Intervalo mínimo en modo adaptativo (bondi a punto de llegar)
+MAX_INTERVAL_SECONDS = 120  # Intervalo máximo en modo adaptativo (ningún bondi puede llegar pronto)
+TRAJECTORY_DETECTION = True  # Detectar pasadas por el tramo entre la posición anterior y la actual de cada bondi
+MAX_SEGMENT_SECONDS = 180  # Tramos más largos que esto no se interpolan (el bondi pudo haber hecho cualquier recorrido)
+MAX_SEGMENT_SPEED_KMH = 90  # Tramos que implican más velocidad que esto se toman como saltos de GPS
+COOLDOWN_MINUTES = 5  # Tiempo mínimo entre registros del mismo bondi en la misma parada (también lo controla la base)
+BUS_HISTORY_SIZE = 8  # Posiciones recientes que se guardan por bondi
+BUS_STATE_TTL_MINUTES = 30  # Se olvida el estado de un bondi que no aparece hace más de este tiempo
+ASYNC_WRITER = True  # Escribir las pasadas en lotes desde un hilo en segundo plano
+WRITER_BATCH_SIZE = 500  # Pasadas por lote de escritura
+WRITER_FLUSH_SECONDS = 2  # Tiempo máximo que una pasada espera en la cola antes de escribirse
+WRITER_MAX_QUEUE = 10000  # Tamaño máximo de la cola de escritura (backpressure)
+CATALOG_TTL_HOURS = 24  # Antigüedad máxima de los catálogos estáticos cacheados en disco
+METRICS_PORT = 9108  # Puerto del endpoint /metrics en formato Prometheus (0 = deshabilitado)
+METRICS_HOST = "127.0.0.1"  # Interfaz donde escucha el endpoint de métricas
+# ===================================================
+
+# Cliente de la API compartido (token, pool de conexiones y reintentos)
+cliente = obtener_cliente()
+
+# Métricas del loop de monitoreo
+LATENCIA_CONSULTA = Histograma("tracker_consulta_buses_segundos", "Duración de la consulta de ubicaciones de bondis a la API")
+CONSULTAS_FALLIDAS = Contador("tracker_consultas_fallidas_total", "Consultas de ubicaciones que no devolvieron datos")
+BUSES_POR_CONSULTA = Histograma("tracker_buses_por_consulta", "Bondis recibidos en cada consulta", BUCKETS_CANTIDAD)
+LATENCIA_DETECCION = Histograma("tracker_deteccion_segundos", "Cálculo de tramos y distancias bondi-parada de un ciclo")
+LATENCIA_CICLO = Histograma("tracker_ciclo_segundos", "Duración de un ciclo completo sin contar la espera")
+PASADAS_POR_CICLO = Histograma("tracker_pasadas_por_ciclo", "Pasadas nuevas registradas en cada ciclo", BUCKETS_CANTIDAD)
+PASADAS_REGISTRADAS = Contador("tracker_pasadas_registradas_total", "Pasadas registradas")
+COOLDOWN_OMITIDAS = Contador("tracker_cooldown_omitidas_total", "Detecciones omitidas por estar en cooldown")
+INTERVALO_ACTUAL = Gauge("tracker_intervalo_segundos", "Espera hasta la próxima consulta")
+BONDIS_EN_MEMORIA = Gauge("tracker_bondis_en_memoria", "Bondis con estado en memoria")
+
+
+def obtener_token():
+    """Obtiene un token de acceso OAuth2"""
+    return cliente.obtener_token()
+
+
+def verificar_token():
+    """Verifica si el token es válido y lo renueva si es necesario"""
+    return cliente.verificar_token()
+
+
+def obtener_ubicaciones_bondis(lineas, line_variant_ids=None):
+    """Obtiene las ubicaciones de todos los bondis de las líneas especificadas"""
+    params = {"lines": ",".join(lineas) if isinstance(lineas, list) else lineas}
+    if line_variant_ids:
+        params["lineVariantIds"] = ",".join(line_variant_ids) if isinstance(line_variant_ids, list) else line_variant_ids
+
+    return cliente.get("/buses", params)
+
+
+def consultar_catalogo(ruta):
+    """Descarga un catálogo estático de la API (paradas, variantes, líneas por parada)"""
+    return cliente.get(ruta)
+
+
+def obtener_paradas(forzar=False):
+    """Obtiene todas las paradas (snapshot local o API si está vencido)"""
+    return obtener_catalogo(
+        "paradas",
+        lambda: consultar_catalogo("/buses/busstops"),
+        CATALOG_TTL_HOURS * 3600,
+        forzar,
+    )
+
+
+def obtener_variantes_linea(forzar=False):
+    """Obtiene todas las variantes de línea (snapshot local o API si está vencido)"""
+    return obtener_catalogo(
+        "variantes_linea",
+        lambda: consultar_catalogo("/buses/linevariants"),
+        CATALOG_TTL_HOURS * 3600,
+        forzar,
+    )
+
+
+def obtener_lineas_parada(busstop_id, forzar=False):
+    """Obtiene las líneas que pasan por una parada (snapshot local o API si está vencido)"""
+    return obtener_catalogo(
+        f"lineas_parada_{busstop_id}",
+        lambda: consultar_catalogo(f"/buses/busstops/{busstop_id}/lines"),
+        CATALOG_TTL_HOURS * 3600,
+        forzar,
+    )
+
+
+def instante_bondi(bus_data, por_defecto):
+    """
+    Instante (segundos epoch) de la posición reportada por el GPS del bondi
+    Devuelve por_defecto si no viene o no se entiende
+    """
+    try:
+        instante = datetime.fromisoformat(bus_data["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return por_defecto
+    if instante.tzinfo is None:
+        return por_defecto
+    return instante.timestamp()
+
+
+def tramo_valido(previa, instante, lat, lon):
+    """Indica si la posición previa de un bondi y la actual forman un tramo que se puede interpolar"""
+    instante_previo, lat_previa, lon_previa = previa
+    segundos = instante - instante_previo
+    if segundos <= 0 or segundos > MAX_SEGMENT_SECONDS:
+        return False
+    return calcular_distancia(lat_previa, lon_previa, lat, lon) / segundos * 3.6 <= MAX_SEGMENT_SPEED_KMH
+
+
+def cargar_paradas_monitoreadas(session, paradas=None):
+    """Carga el catálogo de paradas en la base y devuelve las paradas a monitorear"""
+    if paradas is None:
+        paradas = obtener_paradas()
+    if not paradas:
+        print("❌ No se pudo obtener las paradas de la API")
+        return []
+
+    resumen = BusStop.sync_from_api(session, paradas)
+    print(f"✓ Catálogo de paradas sincronizado: {resumen['added']} nuevas, "
+          f"{resumen['changed']} actualizadas, {resumen['unchanged']} sin cambios")
+
+    query = session.query(BusStop)
+    if not MULTI_STOP_MODE:
+        query = query.filter_by(busstop_id=MONITORED_STOP_ID)
+    elif MONITORED_STOP_IDS:
+        query = query.filter(BusStop.busstop_id.in_(MONITORED_STOP_IDS))
+
+    bus_stops = query.all()
+    if not bus_stops:
+        objetivo = MONITORED_STOP_IDS if MULTI_STOP_MODE else MONITORED_STOP_ID
+        print(f"❌ Parada(s) {objetivo} no encontrada(s) en la API")
+    return bus_stops
+
+
+def cargar_cooldowns(session, estado, ahora):
+    """
+    Retoma los cooldowns vigentes guardados en la base (bus_passage_cooldowns), así
+    un reinicio no vuelve a registrar los bondis que siguen cerca de la parada
+    """
+    desde = datetime.fromtimestamp(ahora - COOLDOWN_MINUTES * 60, timezone.utc)
+    BusPassageCooldown.purge(session, desde)
+    session.commit()
+    vigentes = BusPassageCooldown.active(session, desde)
+    for clave, detected_at in vigentes.items():
+        estado.iniciar_cooldown(clave, detected_at.replace(tzinfo=timezone.utc).timestamp(), COOLDOWN_MINUTES * 60)
+    if vigentes:
+        print(f"✓ {len(vigentes)} cooldowns retomados de la base")
+
+
+def registrar_pasadas_por_proximidad(reloj=time, obtener_buses=None, grabador=None, session=None, paradas=None,
+                                     cooldowns=None):
+    """
+    Monitorea bondis por proximidad a una o varias paradas usando el endpoint de ubicaciones
+    Registra cuando un bondi pasa cerca de alguna de las paradas configuradas
+
+    Args:
+        reloj: Objeto con time(), monotonic() y sleep() (el módulo time o un RelojVirtual)
+        obtener_buses: Fuente de las respuestas de /buses (por defecto la API)
+        grabador: Grabador donde guardar cada respuesta cruda de la API (opcional)
+        session: Sesión de la base de datos (por defecto get_session())
+        paradas: Catálogo de paradas a usar en lugar del de la API (opcional)
+        cooldowns: Diccionario de cooldowns compartido con otros procesos (opcional, ver supervisor.py)
+    """
+    if session is None:
+        session = get_session()
+    estado = TablaEstadoBuses(BUS_HISTORY_SIZE, BUS_STATE_TTL_MINUTES * 60, cooldowns)
+    escritor = None
+    poller = None
+    planificador = None
+    
+    try:
+        bus_stops = cargar_paradas_monitoreadas(session, paradas)
+        if not bus_stops:
+            return
+
+        cargar_cooldowns(session, estado, reloj.time())
+
+        # Cada bondi solo se compara contra las paradas de su celda y las vecinas
+        indice = IndiceParadas(bus_stops, PROXIMITY_THRESHOLD_METERS)
+
+        if obtener_buses is None:
+            if MONITORED_LINE_GROUPS:
+                poller = PollerAsync(cliente, max_concurrencia=POLLER_MAX_CONCURRENCY)
+                obtener_buses = lambda: buses_de_grupos(poller, MONITORED_LINE_GROUPS, LINE_VARIANT_IDS)
+            else:
+                obtener_buses = lambda: obtener_ubicaciones_bondis(MONITORED_LINES, LINE_VARIANT_IDS)
+
+        if ADAPTIVE_POLLING:
+            planificador = PlanificadorAdaptativo(
+                PROXIMITY_THRESHOLD_METERS,
+                intervalo_min=MIN_INTERVAL_SECONDS,
+                intervalo_max=MAX_INTERVAL_SECONDS,
+            )
+
+        if ASYNC_WRITER:
+            escritor = EscritorPasadas(
+                session.get_bind(),
+                tamano_lote=WRITER_BATCH_SIZE,
+                intervalo_flush=WRITER_FLUSH_SECONDS,
+                max_encolados=WRITER_MAX_QUEUE,
+                cooldown=COOLDOWN_MINUTES * 60,
+            ).iniciar()
+        
+        print(f"\n{'='*70}")
+        print(f"  MONITOREANDO BONDIS POR PROXIMIDAD")
+        if len(bus_stops) == 1:
+            bus_stop = bus_stops[0]
+            print(f"  Parada: {bus_stop.busstop_id} - {bus_stop.street1} y {bus_stop.street2}")
+            print(f"  Coordenadas: {bus_stop.latitude}, {bus_stop.longitude}")
+        else:
+            print(f"  Paradas: {len(bus_stops)} (índice espacial de {len(indice.celdas)} celdas)")
+        if MONITORED_LINE_GROUPS:
+            print(f"  Líneas: {' | '.join(', '.join(g) for g in MONITORED_LINE_GROUPS)} (en paralelo)")
+        else:
+            print(f"  Líneas: {', '.join(MONITORED_LINES)}")
+        print(f"  Distancia máxima: {PROXIMITY_THRESHOLD_METERS}m")
+        if planificador:
+            print(f"  Intervalo: adaptativo entre {MIN_INTERVAL_SECONDS}s y {MAX_INTERVAL_SECONDS}s")
+        else:
+            print(f"  Intervalo: {CHECK_INTERVAL_SECONDS}s")
+        print(f"  Cooldown: {COOLDOWN_MINUTES} minutos")
+        print(f"{'='*70}\n")
+        
+        while True:
+            intervalo = CHECK_INTERVAL_SECONDS
+            inicio_ciclo = time.perf_counter()
+            with LATENCIA_CONSULTA.medir():
+                buses_data = obtener_buses()
+            ahora = reloj.time()
+            if grabador:
+                grabador.guardar(ahora, buses_data)
+            
+            if buses_data and isinstance(buses_data, list):
+                BUSES_POR_CONSULTA.observar(len(buses_data))
+                registrados = 0
+                cercanos = 0
+                omitidas = 0
+                
+                # Descartar cooldowns vencidos y bondis que ya no circulan
+                estado.purgar(ahora)
+                
+                with LATENCIA_DETECCION.medir():
+                    indices_bondis, lats, lons = coordenadas_bondis(buses_data)
+                    bus_ids = [buses_data[i].get("busId") for i in indices_bondis]
+                    instantes = [instante_bondi(buses_data[i], ahora) for i in indices_bondis]
+
+                    # Tramo de cada bondi desde su posición anterior; sin historial válido el tramo es un punto
+                    lats0, lons0, instantes0 = lats.copy(), lons.copy(), list(instantes)
+                    if TRAJECTORY_DETECTION:
+                        for j, bus_id in enumerate(bus_ids):
+                            previa = estado.ultima_posicion(bus_id)
+                            if previa and tramo_valido(previa, instantes[j], lats[j], lons[j]):
+                                instantes0[j], lats0[j], lons0[j] = previa
+
+                    # Punto de cada tramo más cercano a cada parada candidata, todo el ciclo en una sola llamada
+                    pares_bondi, pares_parada = indice.pares_candidatos_segmentos(lats0, lons0, lats, lons)
+                    stop_lats = indice.latitudes[pares_parada]
+                    stop_lons = indice.longitudes[pares_parada]
+                    fracciones = fraccion_aproximacion(
+                        lats0[pares_bondi], lons0[pares_bondi], lats[pares_bondi], lons[pares_bondi],
+                        stop_lats, stop_lons,
+                    )
+                    lats_cerca = lats0[pares_bondi] + fracciones * (lats[pares_bondi] - lats0[pares_bondi])
+                    lons_cerca = lons0[pares_bondi] + fracciones * (lons[pares_bondi] - lons0[pares_bondi])
+                    distancias = calcular_distancias(lats_cerca, lons_cerca, stop_lats, stop_lons, DISTANCE_MODE)
+                    min_distancia = distancias.min() if len(distancias) else float("inf")
+
+                for k in (distancias <= PROXIMITY_THRESHOLD_METERS).nonzero()[0]:
+                    try:
+                        j = pares_bondi[k]
+                        bus_data = buses_data[indices_bondis[j]]
+                        bus_stop = indice.paradas[pares_parada[k]]
+                        distancia = distancias[k]
+
+                        # El mismo código que queda en bus_passages.bus_code y en bus_passage_cooldowns
+                        bus_code = BusPassage.bus_code_from_data(bus_data)
+                        if not bus_code:
+                            continue
+
+                        cercanos += 1
+                        linea = bus_data.get("line", "N/A")
+                        destino = bus_data.get("destination", "N/A")
+
+                        # La pasada se registra en el punto y el instante de máxima aproximación del tramo
+                        instante_pasada = instantes0[j] + (instantes[j] - instantes0[j]) * float(fracciones[k])
+
+                        # Verificar si ya fue registrado recientemente en esta parada (medido entre pasadas, como en la base)
+                        clave = (bus_stop.id, bus_code)
+                        if estado.en_cooldown(clave, instante_pasada):
+                            omitidas += 1
+                            print(f"  ⏭️  Bondi {bus_code} (Línea {linea}) ya registrado en parada {bus_stop.busstop_id} - en cooldown")
+                            continue
+
+                        pasada_at = datetime.fromtimestamp(instante_pasada, timezone.utc)
+                        pasada_data = {
+                            **bus_data,
+                            "location": {
+                                **bus_data["location"],
+                                "coordinates": [float(lons_cerca[k]), float(lats_cerca[k])],
+                            },
+                        }
+
+                        # Registrar la pasada
+                        if escritor:
+                            escritor.registrar(bus_stop, pasada_data, pasada_at)
+                            registrada = True
+                        else:
+                            registrada = BusPassage.create_from_bus_data(
+                                session, bus_stop, pasada_data, pasada_at, COOLDOWN_MINUTES * 60
+                            ) is not None
+                        estado.iniciar_cooldown(clave, instante_pasada, COOLDOWN_MINUTES * 60)
+                        if not registrada:
+                            # Otro tracker (o esta misma corrida antes de reiniciarse) ya la registró
+                            omitidas += 1
+                            continue
+                        registrados += 1
+                        
+                        print(f"  ✓ REGISTRADO: Bondi {bus_code} | Línea {linea:6s} → {destino:25s} | Parada {bus_stop.busstop_id} | Distancia: {distancia:.1f}m")
+                        
+                    except Exception as e:
+                        print(f"  ❌ Error al procesar bondi: {e}")
+                
+                for j, bus_id in enumerate(bus_ids):
+                    if bus_id:
+                        estado.registrar_posicion(bus_id, instantes[j], lats[j], lons[j], ahora)
+                PASADAS_POR_CICLO.observar(registrados)
+                PASADAS_REGISTRADAS.inc(registrados)
+                COOLDOWN_OMITIDAS.inc(omitidas)
+
+                if cercanos > 0:
+                    print(f"\n  📊 Bondis cercanos: {cercanos} | Nuevos registros: {registrados}")
+                else:
+                    print(f"  ℹ️  No hay bondis cerca de las paradas en este momento")
+                    if min_distancia < float("inf"):
+                        print(f"  Distancia mínima detectada: {min_distancia:.1f}m")
+                
+                if planificador:
+                    # Distancia de cada bondi a la parada monitoreada más cercana
+                    intervalo = planificador.actualizar(
+                        reloj.monotonic(),
+                        bus_ids,
+                        indice.distancias_minimas(lats, lons, planificador.radio_relevante_m),
+                        [buses_data[i].get("speed") for i in indices_bondis],
+                    )
+
+                print(f"  ⏰ Próxima consulta en {intervalo:.0f}s...\n")
+            
+            else:
+                print(f"  ⚠️  No se obtuvieron datos de bondis")
+                CONSULTAS_FALLIDAS.inc()
+            
+            LATENCIA_CICLO.observar(time.perf_counter() - inicio_ciclo)
+            INTERVALO_ACTUAL.set(intervalo)
+            BONDIS_EN_MEMORIA.set(len(estado))
+            reloj.sleep(intervalo)
+    
+    except KeyboardInterrupt:
+        print("\n\n¡Monitoreo detenido! 👋")
+
+    except FinGrabacion:
+        print("\n\n🏁 Fin de la grabación")
+    
+    finally:
+        if escritor:
+            escritor.cerrar()
+        if poller:
+            poller.cerrar()
+        session.close()
+
+
+def exportar_pasadas(session, ruta):
+    """Escribe las pasadas registradas en un CSV ordenado, para comparar dos corridas con diff"""
+    pasadas = (
+        session.query(BusPassage, BusStop.busstop_id)
+        .join(BusStop)
+        .order_by(BusPassage.detected_at, BusStop.busstop_id, BusPassage.line, BusPassage.bus_latitude)
+    )
+    with open(ruta, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["detected_at", "busstop_id", "line", "destination", "bus_code", "bus_latitude", "bus_longitude"])
+        for passage, busstop_id in pasadas:
+            writer.writerow([
+                passage.detected_at.isoformat(), busstop_id, passage.line, passage.destination,
+                passage.bus_code, passage.bus_latitude, passage.bus_longitude,
+            ])
+
+
+def reproducir_grabacion(ruta, velocidad=None, database_url=None, salida=None):
+    """
+    Pasa una grabación por el mismo pipeline de detección con un reloj virtual
+    Sin database_url escribe en una base SQLite temporal
+    """
+    temporal = None
+    if database_url is None:
+        fd, temporal = tempfile.mkstemp(prefix="replay-", suffix=".sqlite3")
+        os.close(fd)
+        database_url = f"sqlite:///{temporal}"
+
+    engine = get_db_engine(database_url)
+    Base.metadata.create_all(engine)
+    reproductor = ReproductorGrabacion(ruta, RelojVirtual(velocidad=velocidad))
+
+    inicio = time.perf_counter()
+    registrar_pasadas_por_proximidad(
+        reloj=reproductor.reloj,
+        obtener_buses=reproductor,
+        session=get_session(engine),
+        paradas=reproductor.paradas,
+    )
+    duracion = time.perf_counter() - inicio
+
+    session = get_session(engine)
+    try:
+        total = session.query(BusPassage).count()
+        print(f"  Respuestas procesadas: {reproductor.entregadas} ({reproductor.salteadas} salteadas por el intervalo)")
+        print(f"  Pasadas registradas: {total}")
+        print(f"  Tiempo: {duracion:.2f}s ({reproductor.entregadas / duracion if duracion else 0:.1f} ciclos/s)")
+        if salida:
+            exportar_pasadas(session, salida)
+            print(f"  Pasadas exportadas a {salida}")
+    finally:
+        session.close()
+        if temporal:
+            dispose_engines(database_url)
+            # En modo WAL SQLite deja además los archivos -wal y -shm
+            for archivo in (temporal, temporal + "-wal", temporal + "-shm"):
+                if os.path.exists(archivo):
+                    os.remove(archivo)
@@ -0,0 +1,243 @@
+"""
+Mantenimiento de las particiones mensuales de bus_passages (PostgreSQL)
+
+- `crear`: crea por adelantado las particiones de los próximos meses, para que
+  las pasadas nuevas nunca caigan en bus_passages_default. Si ya cayeron
+  filas de un mes ahí, se mueven a su partición al crearla.
+- `archivar`: exporta cada mes más viejo que la retención a un Parquet
+  comprimido (zstd) en ARCHIVO_DIR y desengancha la partición de la tabla;
+  con --eliminar además la borra. Las filas viejas que hayan quedado en
+  bus_passages_default (un mes sin partición, o que llegaron tarde a un mes
+  ya archivado) primero se mueven a la partición de su mes y se archivan con
+  ella; si el mes ya tenía un Parquet se agrega otra parte (bus_passages_AAAA_MM.1.parquet).
+
+El directorio se configura solo con PASADAS_ARCHIVO_DIR, el mismo que leen los
+reportes: así lo archivado nunca queda fuera de leer_archivadas().
+
+Las funciones de query_passages leen los meses archivados con leer_archivadas(),
+así que los reportes siguen viendo el historial completo.
+
+Uso (por ejemplo desde un cron mensual):
+    uv run python particiones.py crear --meses 3
+    uv run python particiones.py archivar --retencion 6 --eliminar
+"""
+import argparse
+import os
+import re
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from models import (
+    PARTICION_DEFAULT, BusPassage, crear_particiones, get_db_engine, listar_particiones, nombre_particion, sumar_meses,
+)
+
+ARCHIVO_DIR = os.getenv("PASADAS_ARCHIVO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "archivo"))
+MESES_ADELANTE = 3
+MESES_RETENCION = 6
+FILAS_POR_LOTE = 100_000
+COMPRESION = "zstd"
+
+_ARCHIVO_MES = re.compile(r"^bus_passages_(\d{4})_(\d{2})(?:\.(\d+))?\.parquet$")
+
+
+def ruta_archivo(mes, directorio=None, parte=0):
+    """Parquet de un mes; las partes siguientes (filas que llegaron tarde) llevan un número"""
+    sufijo = f".{parte}" if parte else ""
+    return os.path.join(directorio or ARCHIVO_DIR, f"{nombre_particion(mes)}{sufijo}.parquet")
+
+
+def meses_archivados(directorio=None):
+    """{mes: [rutas]} de los Parquet de bus_passages archivados, cada mes con sus partes en orden"""
+    directorio = directorio or ARCHIVO_DIR
+    if not os.path.isdir(directorio):
+        return {}
+    partes = []
+    for nombre in os.listdir(directorio):
+        encontrado = _ARCHIVO_MES.match(nombre)
+        if encontrado:
+            anio, mes, parte = encontrado.groups()
+            partes.append((date(int(anio), int(mes), 1), int(parte or 0), os.path.join(directorio, nombre)))
+    meses = {}
+    for mes, _, ruta in sorted(partes):
+        meses.setdefault(mes, []).append(ruta)
+    return meses
+
+
+def _ruta_libre(mes, directorio):
+    parte = 0
+    while os.path.exists(ruta_archivo(mes, directorio, parte)):
+        parte += 1
+    return ruta_archivo(mes, directorio, parte)
+
+
+def exportar_particion(conn, nombre, destino):
+    """Copia una partición a un Parquet (en lotes, con cursor del lado del servidor); devuelve las filas"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema()
+    columnas = esquema.names
+    # psycopg2 devuelve los NUMERIC como Decimal, que pyarrow no convierte a float64
+    seleccion = ", ".join(
+        f"{c}::float8 AS {c}" if esquema.field(c).type == pa.float64() else c for c in columnas
+    )
+    temporal = destino + ".tmp"
+    escritor = None
+    filas = 0
+    try:
+        resultado = conn.execution_options(stream_results=True, max_row_buffer=FILAS_POR_LOTE).execute(
+            text(f"SELECT {seleccion} FROM {nombre} ORDER BY detected_at")
+        )
+        for lote in resultado.partitions(FILAS_POR_LOTE):
+            tabla = pa.Table.from_pylist([dict(zip(columnas, fila)) for fila in lote], schema=esquema)
+            if escritor is None:
+                escritor = pq.ParquetWriter(temporal, tabla.schema, compression=COMPRESION)
+            escritor.write_table(tabla)
+            filas += len(lote)
+        if escritor is None:
+            escritor = pq.ParquetWriter(temporal, esquema, compression=COMPRESION)
+    except BaseException:
+        # Que un archivo a medio escribir no quede junto a los archivados
+        if escritor is not None:
+            escritor.close()
+            escritor = None
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    os.replace(temporal, destino)
+    return filas
+
+
+def _esquema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("bus_stop_id", pa.int64()),
+        ("line", pa.string()),
+        ("destination", pa.string()),
+        ("bus_code", pa.string()),
+        ("bus_latitude", pa.float64()),
+        ("bus_longitude", pa.float64()),
+        ("detected_at", pa.timestamp("us")),
+        ("eta_minutes", pa.int32()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ])
+
+
+def archivar(engine, retencion=MESES_RETENCION, directorio=None, eliminar=False):
+    """Archiva y desengancha las particiones que terminan antes de `retencion` meses atrás"""
+    import pyarrow.parquet as pq
+
+    directorio = directorio or ARCHIVO_DIR
+    os.makedirs(directorio, exist_ok=True)
+    limite = sumar_meses(date.today().replace(day=1), -retencion)
+
+    with engine.begin() as conn:
+        _rescatar_de_default(conn, limite)
+    with engine.connect() as conn:
+        viejas = [(nombre, desde) for nombre, desde, hasta in listar_particiones(conn) if hasta <= limite]
+
+    archivadas = []
+    for nombre, mes in viejas:
+        destino = _ruta_libre(mes, directorio)
+        with engine.connect() as conn:
+            esperadas = conn.execute(text(f"SELECT count(*) FROM {nombre}")).scalar()
+            filas = exportar_particion(conn, nombre, destino)
+
+        # No se toca la base si el archivo no tiene todas las filas
+        if filas != esperadas or pq.ParquetFile(destino).metadata.num_rows != esperadas:
+            print(f"  ❌ {nombre}: se exportaron {filas} de {esperadas} filas, no se desengancha")
+            continue
+
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {BusPassage.__tablename__} DETACH PARTITION {nombre}"))
+            if eliminar:
+                conn.execute(text(f"DROP TABLE {nombre}"))
+        print(f"  📦 {nombre}: {filas} pasadas → {destino}{' (partición eliminada)' if eliminar else ''}")
+        archivadas.append(nombre)
+    return archivadas
+
+
+def _rescatar_de_default(conn, limite):
+    """
+    Mueve a la partición de su mes las filas de bus_passages_default anteriores a `limite`,
+    para que se archiven como cualquier otro mes en lugar de quedar para siempre en la base
+    """
+    meses = conn.execute(text(
+        f"SELECT DISTINCT CAST(date_trunc('month', detected_at) AS date) FROM {PARTICION_DEFAULT} "
+        f"WHERE detected_at < :limite ORDER BY 1"
+    ), {"limite": limite}).scalars().all()
+    for mes in meses:
+        nombre = nombre_particion(mes)
+        if conn.execute(text("SELECT to_regclass(:nombre)"), {"nombre": nombre}).scalar() is not None:
+            # Archivado sin --eliminar: la tabla desenganchada sigue existiendo con ese nombre
+            print(f"  ⚠️  {PARTICION_DEFAULT} tiene pasadas de {mes:%Y-%m} pero {nombre} existe "
+                  f"desenganchada: hay que borrarla (ya está archivada) para archivarlas")
+            continue
+        crear_particiones(conn, mes, 1)
+        print(f"  ↪ Pasadas de {mes:%Y-%m} movidas de {PARTICION_DEFAULT} a {nombre}")
+
+
+def _como_datetime(valor):
+    if valor is None or isinstance(valor, datetime):
+        return valor
+    return datetime.combine(valor, datetime.min.time())
+
+
+def leer_archivadas(desde=None, hasta=None, columnas=None, directorio=None, **iguales):
+    """
+    Tabla de pyarrow con las pasadas archivadas con detected_at en [desde, hasta)
+    que además cumplen columna == valor para cada argumento extra (ej. line="121").
+    Solo se abren los meses del rango; devuelve None si no hay ninguno archivado.
+    """
+    desde, hasta = _como_datetime(desde), _como_datetime(hasta)
+    rutas = [
+        ruta for mes, rutas_mes in sorted(meses_archivados(directorio).items())
+        if (hasta is None or _como_datetime(mes) < hasta)
+        and (desde is None or _como_datetime(sumar_meses(mes, 1)) > desde)
+        for ruta in rutas_mes
+    ]
+    if not rutas:
+        return None
+
+    import pyarrow.dataset as ds
+
+    condicion = ds.scalar(True)
+    if desde is not None:
+        condicion &= ds.field("detected_at") >= desde
+    if hasta is not None:
+        condicion &= ds.field("detected_at") < hasta
+    for columna, valor in iguales.items():
+        condicion &= ds.field(columna) == valor
+    return ds.dataset(rutas, format="parquet", schema=_esquema()).to_table(columns=columnas, filter=condicion)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Particiones mensuales de bus_passages")
+    acciones = parser.add_subparsers(dest="accion", required=True)
+    crear = acciones.add_parser("crear", help="Crear las particiones de los próximos meses")
+    crear.add_argument("--meses", type=int, default=MESES_ADELANTE, help="Meses a crear desde el actual")
+    archivo = acciones.add_parser("archivar", help="Exportar a Parquet y desenganchar los meses viejos")
+    archivo.add_argument("--retencion", type=int, default=MESES_RETENCION, help="Meses que quedan en la base")
+    archivo.add_argument("--eliminar", action="store_true", help="Borrar las particiones ya archivadas")
+    args = parser.parse_args()
+
+    engine = get_db_engine()
+    if args.accion == "crear":
+        with engine.begin() as conn:
+            creadas = crear_particiones(conn, date.today(), args.meses + 1)
+        print(f"✓ {len(creadas)} particiones nuevas: {', '.join(creadas) or 'ninguna'}")
+    else:
+        archivadas = archivar(engine, args.retencion, eliminar=args.eliminar)
+        print(f"✓ {len(archivadas)} particiones archivadas")
+
+
+if __name__ == "__main__":
+    main()
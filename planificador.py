@@ -0,0 +1,67 @@
+class PlanificadorAdaptativo:
+    """
+    Elige el intervalo hasta la próxima consulta según lo cerca que estén los bondis.
+
+    Para cada bondi estima su velocidad de aproximación a la parada más cercana
+    comparando la distancia entre dos consultas consecutivas, y calcula cuánto
+    tardaría como mínimo en entrar al radio de detección. La próxima consulta
+    se agenda a una fracción (`margen`) de ese tiempo, acotada entre
+    `intervalo_min` e `intervalo_max`: si nada puede llegar pronto se consulta
+    poco, y el intervalo solo se achica cuando un bondi se acerca de verdad.
+
+    Los bondis sin historial se suponen a `velocidad_max_mps` (o a la velocidad
+    que reporta la API, si viene) para no perder pasadas en el primer ciclo.
+    """
+
+    def __init__(self, umbral_m, intervalo_min=5, intervalo_max=120, velocidad_max_mps=17.0,
+                 velocidad_min_mps=3.0, margen=0.5):
+        self.umbral_m = umbral_m
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.velocidad_max_mps = velocidad_max_mps
+        self.velocidad_min_mps = velocidad_min_mps
+        self.margen = margen
+        self.ultimas = {}  # {bus_id: (instante, distancia a la parada más cercana)}
+        self.intervalo = intervalo_min
+
+    @property
+    def radio_relevante_m(self):
+        """Distancia a partir de la cual un bondi ya no puede acortar el intervalo máximo"""
+        return self.umbral_m + self.intervalo_max * self.velocidad_max_mps / self.margen
+
+    def actualizar(self, ahora, bus_ids, distancias, velocidades_kmh=None):
+        """
+        Registra las distancias del ciclo y devuelve el intervalo hasta la próxima consulta
+
+        Args:
+            ahora: Instante de la consulta en segundos (time.monotonic())
+            bus_ids: IDs de los bondis del ciclo
+            distancias: Distancia en metros de cada bondi a la parada monitoreada más cercana
+            velocidades_kmh: Velocidad informada por la API para cada bondi (opcional)
+        """
+        previas = self.ultimas
+        self.ultimas = {}
+        tiempo_min = float("inf")
+
+        for i, bus_id in enumerate(bus_ids):
+            distancia = float(distancias[i])
+            self.ultimas[bus_id] = (ahora, distancia)
+
+            hueco = distancia - self.umbral_m
+            if hueco <= 0:
+                tiempo_min = 0.0
+                continue
+
+            previa = previas.get(bus_id)
+            if previa and ahora > previa[0]:
+                aproximacion = (previa[1] - distancia) / (ahora - previa[0])
+                velocidad = max(aproximacion, self.velocidad_min_mps)
+            elif velocidades_kmh is not None and velocidades_kmh[i]:
+                velocidad = max(float(velocidades_kmh[i]) / 3.6, self.velocidad_min_mps)
+            else:
+                velocidad = self.velocidad_max_mps
+
+            tiempo_min = min(tiempo_min, hueco / velocidad)
+
+        self.intervalo = min(max(tiempo_min * self.margen, self.intervalo_min), self.intervalo_max)
+        return self.intervalo
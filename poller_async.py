@@ -0,0 +1,172 @@
+"""
+Motor de polling concurrente para la API de STM
+
+Lanza en paralelo las consultas de /buses (una por grupo de líneas) y de
+/upcomingbuses (una por parada) de cada ciclo, con un límite de consultas
+simultáneas, timeout por consulta y ciclos a intervalos fijos sin deriva.
+
+Las consultas pasan por el ClienteSTM compartido (token, pool de conexiones
+y reintentos) desde un pool de hilos propio, así que el tiempo de un ciclo es el de la
+consulta más lenta y no la suma de todas. No hay un cliente HTTP asíncrono: es
+asyncio.gather sobre run_in_executor, y la concurrencia real la acota el pool
+de hilos (max_concurrencia hilos, igual que el semáforo). El timeout de cada consulta es el de
+requests: así ningún hilo del pool queda colgado de una consulta abandonada.
+
+Los loops sincrónicos (buses_de_grupos) usan un único event loop del poller
+durante toda la corrida en lugar de crear uno por ciclo.
+
+Uso de prueba contra un servidor local que imite la API:
+    uv run python poller_async.py --base-url http://127.0.0.1:8000 --token prueba \\
+        --grupos 147,148 21,D10 --paradas 2071 546 --ciclos 3
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cliente_stm import API_BASE_URL, ClienteSTM, obtener_cliente
+
+
+class PollerAsync:
+    """Poller asyncio para varias líneas y paradas a la vez sobre un ClienteSTM"""
+
+    def __init__(self, cliente, intervalo=15, max_concurrencia=8, timeout=10, amount_per_line=3):
+        self.cliente = cliente
+        self.intervalo = intervalo
+        self.max_concurrencia = max_concurrencia
+        self.timeout = timeout
+        self.amount_per_line = amount_per_line
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrencia, thread_name_prefix="poller")
+        self._semaforo = None
+        self._loop_semaforo = None
+        self._runner = None
+
+    def correr(self, corrutina):
+        """Corre una corrutina desde código sincrónico, siempre en el mismo event loop"""
+        if self._runner is None:
+            self._runner = asyncio.Runner()
+        return self._runner.run(corrutina)
+
+    def cerrar(self):
+        if self._runner is not None:
+            self._runner.close()
+            self._runner = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def consultar(self, ruta, params=None):
+        """Consulta un endpoint respetando el límite de concurrencia; devuelve None si falla"""
+        loop = asyncio.get_running_loop()
+        if self._loop_semaforo is not loop:
+            # Un semáforo de asyncio queda atado al loop donde se usa
+            self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+            self._loop_semaforo = loop
+
+        async with self._semaforo:
+            # El timeout de requests corta la conexión y ClienteSTM.get devuelve None
+            return await loop.run_in_executor(self._executor, self.cliente.get, ruta, params, self.timeout)
+
+    async def consultar_buses(self, lineas, line_variant_ids=None):
+        """Ubicaciones de los bondis de un grupo de líneas"""
+        params = {"lines": ",".join(lineas) if isinstance(lineas, list) else lineas}
+        if line_variant_ids:
+            params["lineVariantIds"] = ",".join(line_variant_ids) if isinstance(line_variant_ids, list) else line_variant_ids
+        return await self.consultar("/buses", params)
+
+    async def consultar_proximos(self, parada_id, lineas=None):
+        """Próximos bondis a llegar a una parada"""
+        params = {"amountperline": self.amount_per_line}
+        if lineas:
+            params["lines"] = ",".join(lineas)
+        return await self.consultar(f"/buses/busstops/{parada_id}/upcomingbuses", params)
+
+    async def ciclo(self, grupos_lineas=(), paradas=(), lineas_paradas=None):
+        """
+        Ejecuta un ciclo de consultas concurrentes
+        Devuelve (respuestas por grupo de líneas, respuestas por parada)
+        """
+        grupos_lineas = [tuple(g) for g in grupos_lineas]
+        paradas = list(paradas)
+        respuestas = await asyncio.gather(
+            *(self.consultar_buses(list(g)) for g in grupos_lineas),
+            *(self.consultar_proximos(p, lineas_paradas) for p in paradas),
+        )
+        return (
+            dict(zip(grupos_lineas, respuestas[:len(grupos_lineas)])),
+            dict(zip(paradas, respuestas[len(grupos_lineas):])),
+        )
+
+    async def ejecutar(self, al_recibir, grupos_lineas=(), paradas=(), lineas_paradas=None, ciclos=None):
+        """
+        Loop de polling con ticks fijos: el ciclo k arranca en inicio + k * intervalo,
+        sin acumular la duración de las consultas. Si un ciclo tarda más que el
+        intervalo se saltean los ticks perdidos en lugar de encadenar consultas.
+
+        `al_recibir(buses_por_grupo, proximos_por_parada)` se llama al final de cada ciclo.
+        """
+        loop = asyncio.get_running_loop()
+        inicio = loop.time()
+        tick = 0
+
+        while ciclos is None or tick < ciclos:
+            buses, proximos = await self.ciclo(grupos_lineas, paradas, lineas_paradas)
+            al_recibir(buses, proximos)
+
+            tick += 1
+            siguiente = inicio + tick * self.intervalo
+            ahora = loop.time()
+            if ahora > siguiente:
+                perdidos = int((ahora - siguiente) // self.intervalo) + 1
+                print(f"  ⚠️  El ciclo tardó más que el intervalo, salteando {perdidos} tick(s)")
+                tick += perdidos
+                siguiente = inicio + tick * self.intervalo
+            await asyncio.sleep(siguiente - ahora)
+
+
+def buses_de_grupos(poller, grupos_lineas, line_variant_ids=None):
+    """Consulta concurrentemente varios grupos de líneas y une las respuestas (para loops sincrónicos)"""
+    async def _consultar():
+        return await asyncio.gather(*(poller.consultar_buses(list(g), line_variant_ids) for g in grupos_lineas))
+
+    respuestas = poller.correr(_consultar())
+    if all(r is None for r in respuestas):
+        return None
+    return [bus for r in respuestas if isinstance(r, list) for bus in r]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Polling concurrente de la API de STM")
+    parser.add_argument("--base-url", default=API_BASE_URL)
+    parser.add_argument("--token", help="Access token fijo (por defecto se obtiene con CLIENT_ID/CLIENT_SECRET)")
+    parser.add_argument("--grupos", nargs="*", default=[], help="Grupos de líneas separadas por comas (ej: 147,148 21)")
+    parser.add_argument("--paradas", nargs="*", default=[], help="IDs de paradas para /upcomingbuses")
+    parser.add_argument("--intervalo", type=float, default=15)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--ciclos", type=int)
+    args = parser.parse_args()
+
+    if args.token:
+        cliente = ClienteSTM(base_url=args.base_url, token_fijo=args.token)
+    else:
+        cliente = obtener_cliente()
+
+    poller = PollerAsync(cliente, args.intervalo, args.concurrencia, args.timeout)
+    grupos = [g.split(",") for g in args.grupos]
+
+    def al_recibir(buses, proximos):
+        marca = time.strftime("%H:%M:%S")
+        for grupo, data in buses.items():
+            print(f"[{marca}] Líneas {','.join(grupo):20s} | {len(data) if data is not None else 'error':>5} bondis")
+        for parada, data in proximos.items():
+            print(f"[{marca}] Parada {parada:>20} | {len(data) if data is not None else 'error':>5} próximos")
+
+    try:
+        asyncio.run(poller.ejecutar(al_recibir, grupos, args.paradas, ciclos=args.ciclos))
+    except KeyboardInterrupt:
+        print("\n\n¡Polling detenido! 👋")
+    finally:
+        poller.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Puntualidad: pasadas registradas vs. horarios programados de STM
+
+Empareja cada pasada de bus_passages con la salida programada más cercana
+de la misma parada, línea y tipo de día (merge_asof vectorizado) y acumula
+la distribución de atrasos por línea y hora. Las pasadas se leen de la base
+en lotes por rango de fechas, así que se pueden procesar meses sin cargarlos
+enteros en memoria; solo los histogramas quedan en memoria.
+
+Los horarios STM vienen por variante: cada variante se lleva a su línea con
+el catálogo /buses/linevariants. Las salidas con dia_anterior = 'S' cuentan
+como del día de servicio anterior (minutos + 24h), así una pasada a las 00:30
+del sábado se compara también contra el horario hábil del viernes.
+
+Uso:
+    uv run python puntualidad.py --csv datos_stm.csv --desde 2025-11-01 --hasta 2025-12-01
+"""
+import argparse
+import os
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from analizar_datos import leer_datos_stm, minutos_desde_hora
+from models import BusPassage, BusStop, get_db_engine
+
+ZONA_HORARIA = ZoneInfo("America/Montevideo")
+TOLERANCIA_MINUTOS = 30  # Más lejos que esto de cualquier salida programada, la pasada no se empareja
+UMBRAL_ADELANTO = -1  # Minutos: antes de esto la pasada cuenta como adelantada
+UMBRAL_ATRASO = 5  # Minutos: después de esto la pasada cuenta como atrasada
+RANGO_HISTOGRAMA = 60  # Los atrasos se acumulan en bins de 1 minuto entre -60 y +60
+
+
+def tipo_dia_fechas(fechas):
+    """Tipo de día STM (1=Hábil, 2=Sábado, 3=Domingo) de una serie de fechas, vectorizado"""
+    dia_semana = pd.DatetimeIndex(fechas).weekday
+    return np.select([dia_semana == 6, dia_semana == 5], [3, 2], 1).astype(np.int8)
+
+
+def mapa_variantes_linea(variantes):
+    """{cod_variante: línea} a partir del catálogo /buses/linevariants"""
+    return {str(v["lineVariantId"]): str(v["line"]) for v in variantes or [] if v.get("lineVariantId") is not None}
+
+
+def preparar_horarios(df, variante_linea, paradas=None):
+    """
+    Tabla de salidas programadas para el merge: parada, línea, tipo_dia, minutos y variante
+    Ordenada por minutos (con el ajuste de dia_anterior aplicado)
+    """
+    if paradas is not None:
+        df = df[df['cod_ubic_parada'].isin([str(p) for p in paradas])]
+
+    lineas = df['cod_variante'].astype(str).map(variante_linea)
+    sin_linea = lineas.isna()
+    if sin_linea.any():
+        print(f"  ⚠️  {sin_linea.sum()} horarios de variantes sin línea en el catálogo (se ignoran)")
+
+    df = df[~sin_linea.to_numpy()]
+    minutos = minutos_desde_hora(df['hora'].to_numpy())
+    minutos = minutos + np.where(df['dia_anterior'].to_numpy() == 'S', 24 * 60, 0)
+    horarios = pd.DataFrame({
+        'busstop_id': pd.to_numeric(df['cod_ubic_parada'].astype(str)).to_numpy(np.int64),
+        'line': lineas[~sin_linea].to_numpy(dtype=object),
+        'tipo_dia': df['tipo_dia'].to_numpy(np.int8),
+        'minutos_programados': minutos.astype(np.int64),
+        'cod_variante': df['cod_variante'].astype(str).to_numpy(dtype=object),
+    })
+    return horarios.sort_values('minutos_programados', kind='stable').reset_index(drop=True)
+
+
+def leer_pasadas(conn, desde, hasta):
+    """Pasadas con detected_at (UTC) en [desde, hasta) con el busstop_id de su parada"""
+    consulta = (
+        select(BusPassage.id, BusStop.busstop_id, BusPassage.line, BusPassage.detected_at)
+        .join(BusStop, BusPassage.bus_stop_id == BusStop.id)
+        .where(BusPassage.detected_at >= desde, BusPassage.detected_at < hasta)
+    )
+    return pd.read_sql_query(consulta, conn, parse_dates=['detected_at'])
+
+
+def emparejar(pasadas, horarios, tolerancia=TOLERANCIA_MINUTOS):
+    """
+    Empareja cada pasada con la salida programada más cercana (misma parada, línea y tipo de día)
+    Devuelve las pasadas con minutos_programados, cod_variante y atraso_minutos (NaN si no hay salida cerca)
+    """
+    local = pasadas['detected_at'].dt.tz_localize('UTC').dt.tz_convert(ZONA_HORARIA)
+    fecha = local.dt.tz_localize(None).dt.normalize()
+    minutos = (local.dt.hour * 60 + local.dt.minute + local.dt.second / 60).to_numpy()
+
+    base = pd.DataFrame({
+        'id': pasadas['id'].to_numpy(),
+        'busstop_id': pasadas['busstop_id'].to_numpy(np.int64),
+        'line': pasadas['line'].astype(str).to_numpy(dtype=object),
+    })
+    candidatos = []
+    # Día de servicio actual, y el anterior para las salidas de después de medianoche
+    for dias_atras in (0, 1):
+        consulta = base.assign(
+            tipo_dia=tipo_dia_fechas(fecha - pd.Timedelta(days=dias_atras)),
+            minutos_observados=minutos + dias_atras * 24 * 60,
+        ).sort_values('minutos_observados', kind='stable')
+        unidos = pd.merge_asof(
+            consulta,
+            horarios.assign(minutos_programados_clave=horarios['minutos_programados'].astype(float)),
+            left_on='minutos_observados',
+            right_on='minutos_programados_clave',
+            by=['busstop_id', 'line', 'tipo_dia'],
+            direction='nearest',
+            tolerance=float(tolerancia),
+        )
+        unidos['atraso_minutos'] = unidos['minutos_observados'] - unidos['minutos_programados']
+        candidatos.append(unidos.drop(columns='minutos_programados_clave'))
+
+    todos = pd.concat(candidatos, ignore_index=True)
+    todos['distancia'] = todos['atraso_minutos'].abs()
+    # El candidato más cercano de cada pasada (los que no emparejaron quedan al final)
+    mejores = todos.sort_values(['id', 'distancia'], na_position='last', kind='stable').drop_duplicates('id')
+    resultado = pasadas.merge(
+        mejores[['id', 'tipo_dia', 'minutos_programados', 'cod_variante', 'atraso_minutos']], on='id', how='left',
+    )
+    resultado['hora'] = local.dt.hour.to_numpy()
+    return resultado
+
+
+class DistribucionAtrasos:
+    """Histograma acumulativo de atrasos (bins de 1 minuto) por línea y hora del día"""
+
+    def __init__(self, rango=RANGO_HISTOGRAMA):
+        self.rango = rango
+        self.conteos = None  # Serie indexada por (line, hora, bin)
+        self.sin_emparejar = None  # Serie indexada por (line, hora)
+        self.sumas = None  # Suma exacta de atrasos por (line, hora), para el promedio
+
+    def agregar(self, emparejadas):
+        con_horario = emparejadas['atraso_minutos'].notna()
+        sin = emparejadas[~con_horario].groupby(['line', 'hora']).size()
+        filas = emparejadas[con_horario]
+        bins = np.clip(np.floor(filas['atraso_minutos'].to_numpy()), -self.rango, self.rango).astype(np.int64)
+        conteos = filas.assign(bin=bins).groupby(['line', 'hora', 'bin']).size()
+        sumas = filas.groupby(['line', 'hora'])['atraso_minutos'].sum()
+
+        self.conteos = conteos if self.conteos is None else self.conteos.add(conteos, fill_value=0)
+        self.sin_emparejar = sin if self.sin_emparejar is None else self.sin_emparejar.add(sin, fill_value=0)
+        self.sumas = sumas if self.sumas is None else self.sumas.add(sumas, fill_value=0)
+
+    def histograma(self):
+        """DataFrame line, hora, atraso_minutos (bin), pasadas"""
+        if self.conteos is None or self.conteos.empty:
+            return pd.DataFrame(columns=['line', 'hora', 'atraso_minutos', 'pasadas'])
+        tabla = self.conteos.astype(np.int64).rename('pasadas').reset_index()
+        return tabla.rename(columns={'bin': 'atraso_minutos'}).sort_values(['line', 'hora', 'atraso_minutos'])
+
+    def resumen(self):
+        """Por línea y hora: pasadas emparejadas y sin emparejar, atraso medio y percentiles, % adelantadas/en hora/atrasadas"""
+        filas = []
+        tabla = self.histograma()
+        sin_emparejar = self.sin_emparejar if self.sin_emparejar is not None else pd.Series(dtype=np.int64)
+        for (linea, hora), grupo in tabla.groupby(['line', 'hora'], sort=True):
+            bins = grupo['atraso_minutos'].to_numpy()
+            conteos = grupo['pasadas'].to_numpy()
+            total = conteos.sum()
+            acumulado = np.cumsum(conteos) / total
+            # Los percentiles salen del histograma: cada bin [b, b+1) se representa por su centro
+            filas.append({
+                'line': linea,
+                'hora': hora,
+                'emparejadas': int(total),
+                'sin_emparejar': int(sin_emparejar.get((linea, hora), 0)),
+                'atraso_medio': float(self.sumas[(linea, hora)] / total),
+                'p50': float(bins[np.searchsorted(acumulado, 0.5)] + 0.5),
+                'p90': float(bins[np.searchsorted(acumulado, 0.9)] + 0.5),
+                'adelantadas_pct': float(100 * conteos[bins < UMBRAL_ADELANTO].sum() / total),
+                'en_hora_pct': float(100 * conteos[(bins >= UMBRAL_ADELANTO) & (bins < UMBRAL_ATRASO)].sum() / total),
+                'atrasadas_pct': float(100 * conteos[bins >= UMBRAL_ATRASO].sum() / total),
+            })
+        return pd.DataFrame(filas)
+
+
+def calcular_puntualidad(engine, horarios_df, variante_linea, desde, hasta, dias_por_lote=1,
+                         tolerancia=TOLERANCIA_MINUTOS, detalle=None):
+    """
+    Procesa las pasadas de [desde, hasta) en lotes de dias_por_lote días
+    Devuelve la DistribucionAtrasos acumulada; si `detalle` es una ruta, escribe ahí cada pasada emparejada
+    """
+    with engine.connect() as conn:
+        paradas = conn.execute(select(BusStop.busstop_id).where(BusStop.bus_passages.any())).scalars().all()
+    horarios = preparar_horarios(horarios_df, variante_linea, paradas)
+    print(f"  Horarios de {len(paradas)} paradas con pasadas: {len(horarios)} salidas programadas")
+
+    distribucion = DistribucionAtrasos()
+    primera_escritura = True
+    # Los lotes van por día local, para que un mismo día de servicio no quede partido
+    inicio = datetime.combine(desde, datetime.min.time(), ZONA_HORARIA)
+    fin = datetime.combine(hasta, datetime.min.time(), ZONA_HORARIA)
+    while inicio < fin:
+        siguiente = min(inicio + timedelta(days=dias_por_lote), fin)
+        with engine.connect() as conn:
+            pasadas = leer_pasadas(
+                conn,
+                inicio.astimezone(ZoneInfo("UTC")).replace(tzinfo=None),
+                siguiente.astimezone(ZoneInfo("UTC")).replace(tzinfo=None),
+            )
+
+        if len(pasadas):
+            emparejadas = emparejar(pasadas, horarios, tolerancia)
+            distribucion.agregar(emparejadas)
+            print(f"  {inicio.date()}: {len(pasadas)} pasadas, {emparejadas['atraso_minutos'].notna().sum()} emparejadas")
+            if detalle:
+                emparejadas.to_csv(detalle, mode='w' if primera_escritura else 'a', header=primera_escritura, index=False)
+                primera_escritura = False
+        inicio = siguiente
+
+    return distribucion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Puntualidad de las pasadas registradas contra los horarios STM")
+    parser.add_argument("--csv", default="datos_stm.csv", help="Horarios STM (datos_stm.csv)")
+    parser.add_argument("--desde", type=date.fromisoformat, default=date.today() - timedelta(days=7))
+    parser.add_argument("--hasta", type=date.fromisoformat, default=date.today() + timedelta(days=1))
+    parser.add_argument("--dias-por-lote", type=int, default=1)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_MINUTOS, help="Minutos máximos a la salida programada")
+    parser.add_argument("--salida-dir", default="puntualidad", help="Directorio de los CSV de resultados")
+    parser.add_argument("--detalle", action="store_true", help="Guardar también cada pasada emparejada")
+    args = parser.parse_args()
+
+    # El catálogo de variantes sale de la caché local o de la API
+    from monitoreo import obtener_variantes_linea
+
+    variante_linea = mapa_variantes_linea(obtener_variantes_linea())
+    if not variante_linea:
+        print("❌ No se pudo obtener el catálogo de variantes de línea")
+        return
+
+    os.makedirs(args.salida_dir, exist_ok=True)
+    distribucion = calcular_puntualidad(
+        get_db_engine(),
+        leer_datos_stm(args.csv),
+        variante_linea,
+        args.desde,
+        args.hasta,
+        args.dias_por_lote,
+        args.tolerancia,
+        os.path.join(args.salida_dir, "pasadas.csv") if args.detalle else None,
+    )
+
+    resumen = distribucion.resumen()
+    distribucion.histograma().to_csv(os.path.join(args.salida_dir, "histograma.csv"), index=False)
+    resumen.to_csv(os.path.join(args.salida_dir, "resumen.csv"), index=False)
+    print(f"\n✓ Resultados en {args.salida_dir}/ (resumen.csv, histograma.csv)")
+    if len(resumen):
+        print(resumen.to_string(index=False, max_rows=30))
+
+
+if __name__ == "__main__":
+    main()
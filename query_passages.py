@@ -1,6 +1,11 @@
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_
-from models import BusStop, BusPassage, get_session
+from types import SimpleNamespace
+from sqlalchemy import Date, func, and_
+from models import BusStop, BusPassage, BusPassageRollup, get_session
+from particiones import leer_archivadas
+
+# Filas por tanda al recorrer listados largos (cursor del lado del servidor en PostgreSQL)
+FILAS_POR_LOTE = 1000
 
 
 def listar_paradas_monitoreadas():
@@ -8,11 +13,28 @@ def listar_paradas_monitoreadas():
     session = get_session()
     
     try:
-        paradas = session.query(
-            BusStop,
-            func.count(BusPassage.id).label('total_pasadas'),
-            func.max(BusPassage.detected_at).label('ultima_pasada')
-        ).join(BusPassage).group_by(BusStop.id).all()
+        # Agregar primero sobre bus_passages (índice por bus_stop_id) y después traer solo esas paradas
+        resumen = {
+            bus_stop_id: (total, ultima)
+            for bus_stop_id, total, ultima in session.query(
+                BusPassage.bus_stop_id,
+                func.count(BusPassage.id),
+                func.max(BusPassage.detected_at)
+            ).group_by(BusPassage.bus_stop_id)
+        }
+        
+        # Sumar los meses archivados en Parquet (particiones.py)
+        archivadas = leer_archivadas(columnas=['bus_stop_id', 'detected_at'])
+        if archivadas is not None:
+            por_parada = archivadas.group_by('bus_stop_id').aggregate([('detected_at', 'count'), ('detected_at', 'max')])
+            for fila in por_parada.to_pylist():
+                total, ultima = resumen.get(fila['bus_stop_id'], (0, fila['detected_at_max']))
+                resumen[fila['bus_stop_id']] = (total + fila['detected_at_count'], max(ultima, fila['detected_at_max']))
+        
+        paradas = [
+            (stop, *resumen[stop.id])
+            for stop in session.query(BusStop).filter(BusStop.id.in_(resumen)).order_by(BusStop.id)
+        ]
         
         print("\n" + "="*80)
         print("  PARADAS MONITOREADAS")
@@ -38,19 +60,31 @@ def estadisticas_linea(linea, parada_id=None, dias=7):
     try:
         fecha_desde = datetime.utcnow() - timedelta(days=dias)
         
-        query = session.query(BusPassage).filter(
-            and_(
-                BusPassage.line == linea,
-                BusPassage.detected_at >= fecha_desde
-            )
-        )
+        filtros = [
+            BusPassage.line == linea,
+            BusPassage.detected_at >= fecha_desde
+        ]
+        iguales = {'line': linea}  # Los mismos filtros para los meses archivados
         
         if parada_id:
             bus_stop = session.query(BusStop).filter_by(busstop_id=parada_id).first()
             if bus_stop:
-                query = query.filter(BusPassage.bus_stop_id == bus_stop.id)
+                filtros.append(BusPassage.bus_stop_id == bus_stop.id)
+                iguales['bus_stop_id'] = bus_stop.id
         
-        pasadas = query.order_by(BusPassage.detected_at.desc()).all()
+        # Conteo por día en la base, sin traer las pasadas
+        dia = func.date(BusPassage.detected_at, type_=Date).label('dia')
+        pasadas_por_dia = dict(session.query(dia, func.count(BusPassage.id)).filter(
+            and_(*filtros)
+        ).group_by(dia))
+        
+        # Meses archivados en Parquet, si la ventana llega hasta ellos
+        archivadas = leer_archivadas(
+            fecha_desde, columnas=['detected_at', 'destination', 'eta_minutes'], **iguales
+        )
+        if archivadas is not None:
+            for dia, total in archivadas.column('detected_at').to_pandas().dt.date.value_counts().items():
+                pasadas_por_dia[dia] = pasadas_por_dia.get(dia, 0) + int(total)
         
         print("\n" + "="*80)
         print(f"  ESTADÍSTICAS LÍNEA {linea}")
@@ -59,30 +93,31 @@ def estadisticas_linea(linea, parada_id=None, dias=7):
         print(f"  Últimos {dias} días")
         print("="*80)
         
-        if not pasadas:
+        if not pasadas_por_dia:
             print("\nNo hay registros para esta línea.")
             return
         
-        print(f"\nTotal de pasadas registradas: {len(pasadas)}")
-        
-        # Agrupar por día
-        pasadas_por_dia = {}
-        for pasada in pasadas:
-            dia = pasada.detected_at.date()
-            if dia not in pasadas_por_dia:
-                pasadas_por_dia[dia] = []
-            pasadas_por_dia[dia].append(pasada)
+        print(f"\nTotal de pasadas registradas: {sum(pasadas_por_dia.values())}")
         
         print(f"\nPasadas por día:")
-        for dia, lista in sorted(pasadas_por_dia.items(), reverse=True):
-            print(f"  {dia}: {len(lista)} pasadas")
+        for dia, total in sorted(pasadas_por_dia.items(), reverse=True):
+            print(f"  {dia}: {total} pasadas")
         
         # Mostrar últimas 10 pasadas
         print(f"\n{'='*80}")
         print("  ÚLTIMAS 10 PASADAS")
         print("="*80)
         
-        for pasada in pasadas[:10]:
+        ultimas = session.query(
+            BusPassage.detected_at, BusPassage.destination, BusPassage.eta_minutes
+        ).filter(and_(*filtros)).order_by(BusPassage.detected_at.desc()).limit(10).all()
+        
+        # Lo archivado es siempre más viejo que lo que sigue en la base
+        if archivadas is not None and len(ultimas) < 10:
+            mas_viejas = archivadas.sort_by([('detected_at', 'descending')]).slice(0, 10 - len(ultimas))
+            ultimas += [SimpleNamespace(**fila) for fila in mas_viejas.to_pylist()]
+        
+        for pasada in ultimas:
             destino = pasada.destination or "N/A"
             eta = pasada.eta_minutes if pasada.eta_minutes else "N/A"
             print(f"{pasada.detected_at.strftime('%Y-%m-%d %H:%M:%S')} | "
@@ -105,27 +140,32 @@ def pasadas_hoy(parada_id):
             print(f"\n❌ Parada {parada_id} no encontrada")
             return
         
+        # Solo se archivan meses cerrados: las pasadas de hoy están siempre en la base
         hoy_inicio = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         
-        pasadas = session.query(BusPassage).filter(
-            and_(
-                BusPassage.bus_stop_id == bus_stop.id,
-                BusPassage.detected_at >= hoy_inicio
-            )
-        ).order_by(BusPassage.detected_at.desc()).all()
+        filtro = and_(
+            BusPassage.bus_stop_id == bus_stop.id,
+            BusPassage.detected_at >= hoy_inicio
+        )
+        total = session.query(func.count(BusPassage.id)).filter(filtro).scalar()
         
         print("\n" + "="*80)
         print(f"  PASADAS DE HOY - Parada {parada_id}")
         print(f"  {bus_stop.street1} y {bus_stop.street2}")
         print("="*80)
         
-        if not pasadas:
+        if not total:
             print("\nNo hay pasadas registradas hoy.")
             return
         
-        print(f"\nTotal: {len(pasadas)} pasadas")
+        print(f"\nTotal: {total} pasadas")
         print("\n" + "-"*80)
         
+        # Solo las columnas que se muestran, de a FILAS_POR_LOTE filas
+        pasadas = session.query(
+            BusPassage.detected_at, BusPassage.line, BusPassage.destination, BusPassage.eta_minutes
+        ).filter(filtro).order_by(BusPassage.detected_at.desc()).yield_per(FILAS_POR_LOTE)
+        
         for pasada in pasadas:
             linea = pasada.line or "N/A"
             destino = pasada.destination or "N/A"
@@ -139,6 +179,65 @@ def pasadas_hoy(parada_id):
         session.close()
 
 
+def resumen_por_hora(linea, parada_id=None, dias=7):
+    """Pasadas y frecuencia por hora del día (UTC) de una línea, desde el resumen por hora"""
+    session = get_session()
+    
+    try:
+        desde = (datetime.utcnow() - timedelta(days=dias)).replace(minute=0, second=0, microsecond=0)
+        
+        query = session.query(
+            BusPassageRollup.hour,
+            BusPassageRollup.passages,
+            BusPassageRollup.headway_sum_seconds,
+            BusPassageRollup.headway_count,
+            BusPassageRollup.max_headway_seconds
+        ).filter(
+            and_(
+                BusPassageRollup.line == linea,
+                BusPassageRollup.hour >= desde
+            )
+        )
+        
+        if parada_id:
+            bus_stop = session.query(BusStop).filter_by(busstop_id=parada_id).first()
+            if bus_stop:
+                query = query.filter(BusPassageRollup.bus_stop_id == bus_stop.id)
+        
+        # Como mucho una fila por parada y hora: alcanza con sumar en Python
+        horas = {}
+        for fila in query:
+            pasadas, suma, cantidad, maximo = horas.get(fila.hour.hour, (0, 0.0, 0, 0.0))
+            horas[fila.hour.hour] = (
+                pasadas + fila.passages,
+                suma + fila.headway_sum_seconds,
+                cantidad + fila.headway_count,
+                max(maximo, fila.max_headway_seconds or 0.0)
+            )
+        
+        print("\n" + "="*80)
+        print(f"  RESUMEN POR HORA - LÍNEA {linea}")
+        if parada_id:
+            print(f"  Parada: {parada_id}")
+        print(f"  Últimos {dias} días (horas UTC)")
+        print("="*80)
+        
+        if not horas:
+            print("\nNo hay registros para esta línea.")
+            return
+        
+        print(f"\n{'Hora':>5s} | {'Pasadas':>8s} | {'Frecuencia media':>17s} | {'Máxima':>8s}")
+        for hora, (pasadas, suma, cantidad, maximo) in sorted(horas.items()):
+            media = f"{suma / cantidad / 60:.1f} min" if cantidad else "N/A"
+            maxima = f"{maximo / 60:.0f} min" if cantidad else "N/A"
+            print(f"{hora:02d}:00 | {pasadas:8d} | {media:>17s} | {maxima:>8s}")
+        
+        print("\n" + "="*80 + "\n")
+    
+    finally:
+        session.close()
+
+
 def menu_principal():
     """Menú interactivo para consultar datos"""
     while True:
@@ -148,7 +247,8 @@ def menu_principal():
         print("\n1. Listar paradas monitoreadas")
         print("2. Ver estadísticas de una línea")
         print("3. Ver pasadas de hoy en una parada")
-        print("4. Salir")
+        print("4. Ver resumen por hora de una línea")
+        print("5. Salir")
         
         opcion = input("\nSelecciona una opción: ").strip()
         
@@ -173,6 +273,13 @@ def menu_principal():
                 print("❌ ID de parada inválido")
         
         elif opcion == "4":
+            linea = input("\nIngresa el número/código de línea: ").strip()
+            parada = input("Ingresa ID de parada (Enter para todas): ").strip()
+            dias = input("Días a consultar (default 7): ").strip()
+            
+            resumen_por_hora(linea, int(parada) if parada else None, int(dias) if dias else 7)
+        
+        elif opcion == "5":
             print("\n¡Hasta luego! 👋\n")
             break
         
@@ -0,0 +1,63 @@
+"""
+Resumen por hora de las pasadas (tabla bus_passage_rollups)
+
+El tracker mantiene el resumen al día a medida que escribe pasadas; este
+script lo arma desde cero para datos que ya estaban en bus_passages, o lo
+rehace para un rango de fechas (por ejemplo después de borrar o importar pasadas).
+
+Uso:
+    uv run python rollup_pasadas.py                               # Todo el historial
+    uv run python rollup_pasadas.py --desde 2025-11-01 --hasta 2025-12-01
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+from models import BusPassage, BusPassageRollup, get_session
+
+
+def backfill(session, desde, hasta, dias_por_lote=1):
+    """Rearma el resumen de [desde, hasta) de a dias_por_lote días, con un commit por lote"""
+    total = 0
+    inicio = desde
+    while inicio < hasta:
+        fin = min(inicio + timedelta(days=dias_por_lote), hasta)
+        t0 = time.perf_counter()
+        filas = BusPassageRollup.rebuild(session, inicio, fin)
+        session.commit()
+        total += filas
+        print(f"  {inicio:%Y-%m-%d %H:%M} → {fin:%Y-%m-%d %H:%M}: {filas} filas ({time.perf_counter() - t0:.1f}s)")
+        inicio = fin
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arma el resumen por hora de bus_passages")
+    parser.add_argument("--desde", type=date.fromisoformat, help="Primer día (UTC); por defecto, la pasada más vieja")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Día siguiente al último (UTC); por defecto, mañana")
+    parser.add_argument("--dias-por-lote", type=int, default=1)
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        if args.desde:
+            desde = datetime.combine(args.desde, datetime.min.time())
+        else:
+            primera = session.query(func.min(BusPassage.detected_at)).scalar()
+            if primera is None:
+                print("No hay pasadas registradas.")
+                return
+            desde = primera.replace(hour=0, minute=0, second=0, microsecond=0)
+        hasta = datetime.combine(args.hasta or date.today() + timedelta(days=1), datetime.min.time())
+
+        print(f"\n📊 Resumen por hora de {desde:%Y-%m-%d} a {hasta:%Y-%m-%d}")
+        total = backfill(session, desde, hasta, args.dias_por_lote)
+        print(f"\n✓ {total} filas de resumen")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Tracker en varios procesos
+
+El supervisor reparte MONITORED_LINES (o los grupos de MONITORED_LINE_GROUPS)
+entre N procesos worker. Cada worker corre registrar_pasadas_por_proximidad
+completo (consulta a la API, detección y escritura) solo con sus líneas,
+contra todas las paradas monitoreadas, así el cálculo de un ciclo se reparte
+entre varios núcleos.
+
+Los cooldowns (parada, bondi) viven en un diccionario compartido
+(multiprocessing.Manager): un worker que se reinicia, o que hereda líneas de
+otro, no vuelve a registrar los bondis que siguen en la parada.
+
+Si un worker muere se lo reinicia con sus mismas líneas, esperando cada vez
+más; si muere más de MAX_REINICIOS veces en VENTANA_REINICIOS_SEGUNDOS se lo
+da de baja y solo sus líneas se reparten entre los que quedan, empezando por
+los de menos líneas. Únicamente se reinician los workers que reciben líneas;
+el resto sigue corriendo sin cortes.
+
+El supervisor no expone métricas: el worker n las sirve en METRICS_PORT + n
+(9108, 9109, ...), y cada puerto hay que scrapearlo como un target aparte. El
+número de un worker no cambia cuando otro se da de baja, así que su puerto
+tampoco; el del worker dado de baja deja de responder.
+
+Los workers importan monitoreo.py, no tracker.py: con spawn el script
+principal se vuelve a ejecutar como __mp_main__ en cada worker, y si además
+tuviera el loop y las métricas quedarían definidos dos veces.
+
+Uso:
+    uv run python tracker.py --procesos 4
+"""
+import multiprocessing
+import signal
+import time
+from collections import deque
+
+import monitoreo
+from metricas import iniciar_servidor
+from models import get_session
+
+MAX_REINICIOS = 5  # Caídas toleradas por worker dentro de la ventana antes de darlo de baja
+VENTANA_REINICIOS_SEGUNDOS = 300
+ESPERA_REINICIO_SEGUNDOS = 5  # Espera antes de reiniciar un worker (se duplica con cada caída en la ventana)
+INTERVALO_CONTROL_SEGUNDOS = 2  # Cada cuánto se revisa si los workers siguen vivos
+INTERVALO_PURGA_SEGUNDOS = 60  # Cada cuánto se borran los cooldowns vencidos del diccionario compartido
+ESPERA_CIERRE_SEGUNDOS = 30  # Tiempo para que un worker escriba sus pasadas pendientes al detenerlo
+
+
+def repartir(unidades, procesos):
+    """Reparte las unidades (líneas o grupos de líneas) en hasta `procesos` shards, por turnos"""
+    shards = [[] for _ in range(max(1, min(procesos, len(unidades))))]
+    for i, unidad in enumerate(unidades):
+        shards[i % len(shards)].append(unidad)
+    return shards
+
+
+def describir(shard):
+    return ", ".join("+".join(unidad) if isinstance(unidad, list) else unidad for unidad in shard)
+
+
+def _detener(signum, frame):
+    """SIGTERM termina el loop como Ctrl+C; una segunda señal no corta la escritura de lo pendiente"""
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
+def trabajar(numero, shard, cooldowns):
+    """Punto de entrada de cada proceso worker: el tracker de siempre, limitado a sus líneas"""
+    # El Ctrl+C de la terminal le llega a todo el grupo: los workers esperan el SIGTERM del supervisor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _detener)
+
+    if monitoreo.MONITORED_LINE_GROUPS:
+        monitoreo.MONITORED_LINE_GROUPS = shard
+        monitoreo.MONITORED_LINES = [linea for grupo in shard for linea in grupo]
+    else:
+        monitoreo.MONITORED_LINES = shard
+
+    if monitoreo.METRICS_PORT:
+        # Cada worker expone sus métricas en su propio puerto: METRICS_PORT, METRICS_PORT + 1, ...
+        puerto = monitoreo.METRICS_PORT + numero
+        iniciar_servidor(puerto, monitoreo.METRICS_HOST)
+        print(f"📈 Worker {numero}: métricas en http://{monitoreo.METRICS_HOST}:{puerto}/metrics")
+
+    monitoreo.registrar_pasadas_por_proximidad(cooldowns=cooldowns)
+
+
+class Supervisor:
+    """Lanza los workers y los vigila: los reinicia si mueren y reparte sus líneas si no se recuperan"""
+
+    def __init__(self, procesos, unidades, max_reinicios=MAX_REINICIOS, ventana_reinicios=VENTANA_REINICIOS_SEGUNDOS):
+        # spawn: cada worker arranca limpio, sin heredar hilos, sockets ni conexiones a la base
+        self.contexto = multiprocessing.get_context("spawn")
+        self.unidades = list(unidades)
+        self.procesos = max(1, min(procesos, len(self.unidades)))
+        self.max_reinicios = max_reinicios
+        self.ventana_reinicios = ventana_reinicios
+        self.workers = []  # [{"numero", "shard", "proceso", "caidas", "reinicio"}]
+        self.cooldowns = None
+
+    def ejecutar(self):
+        """Corre hasta Ctrl+C o hasta que no quede ningún worker"""
+        signal.signal(signal.SIGTERM, _detener)
+        manager = self.contexto.Manager()
+        self.cooldowns = manager.dict()
+        proxima_purga = time.monotonic() + INTERVALO_PURGA_SEGUNDOS
+        try:
+            self.repartir()
+            while self.workers:
+                time.sleep(INTERVALO_CONTROL_SEGUNDOS)
+                self.vigilar(time.monotonic())
+                if time.monotonic() >= proxima_purga:
+                    self.purgar_cooldowns(time.time())
+                    proxima_purga = time.monotonic() + INTERVALO_PURGA_SEGUNDOS
+            print("❌ No quedan workers: se detiene el supervisor")
+        except KeyboardInterrupt:
+            print("\n🛑 Deteniendo workers...")
+        finally:
+            self.detener_todos()
+            manager.shutdown()
+
+    def repartir(self):
+        """Arranca todos los workers con las unidades repartidas entre self.procesos"""
+        self.detener_todos()
+        self.workers = [
+            {"numero": numero, "shard": shard, "proceso": None, "caidas": deque(), "reinicio": 0.0}
+            for numero, shard in enumerate(repartir(self.unidades, self.procesos))
+        ]
+        for worker in self.workers:
+            self.lanzar(worker)
+
+    def lanzar(self, worker):
+        proceso = self.contexto.Process(
+            target=trabajar,
+            args=(worker["numero"], worker["shard"], self.cooldowns),
+            name=f"tracker-{worker['numero']}",
+        )
+        proceso.start()
+        worker["proceso"] = proceso
+        print(f"  🚀 Worker {worker['numero']} (pid {proceso.pid}): líneas {describir(worker['shard'])}")
+
+    def vigilar(self, ahora):
+        """Reinicia los workers caídos (con espera creciente) o los da de baja si no se recuperan"""
+        for worker in self.workers:
+            proceso = worker["proceso"]
+            if proceso is None:
+                if ahora >= worker["reinicio"]:
+                    self.lanzar(worker)
+                continue
+            if proceso.is_alive():
+                continue
+
+            caidas = worker["caidas"]
+            caidas.append(ahora)
+            while caidas[0] < ahora - self.ventana_reinicios:
+                caidas.popleft()
+            print(f"  💥 Worker {worker['numero']} terminó (código {proceso.exitcode}), "
+                  f"{len(caidas)} caída(s) en {self.ventana_reinicios}s")
+
+            if len(caidas) > self.max_reinicios:
+                self.dar_de_baja(worker)
+                return
+
+            worker["proceso"] = None
+            worker["reinicio"] = ahora + ESPERA_REINICIO_SEGUNDOS * 2 ** (len(caidas) - 1)
+
+    def dar_de_baja(self, caido):
+        """Saca un worker y pasa sus líneas a los que quedan; solo se reinician los que reciben alguna"""
+        self.workers.remove(caido)
+        self.procesos = len(self.workers)
+        if not self.workers:
+            return
+
+        afectados = []
+        for unidad in caido["shard"]:
+            destino = min(self.workers, key=lambda w: len(w["shard"]))
+            destino["shard"] = destino["shard"] + [unidad]
+            if destino not in afectados:
+                afectados.append(destino)
+        destinos = ", ".join(str(w["numero"]) for w in afectados)
+        print(f"  ⚖️  Worker {caido['numero']} dado de baja: sus líneas pasan a los workers {destinos}")
+
+        # Las líneas de un worker quedan fijas al lanzarlo: los que están corriendo se reinician
+        # con su shard nuevo; los que esperan un reinicio ya arrancan con él
+        corriendo = [w for w in afectados if w["proceso"] is not None]
+        self.detener(corriendo)
+        for worker in corriendo:
+            self.lanzar(worker)
+
+    def purgar_cooldowns(self, ahora):
+        """Borra los cooldowns vencidos, incluidos los que dejaron workers que ya no existen"""
+        for clave, vencimiento in list(self.cooldowns.items()):
+            if vencimiento <= ahora:
+                self.cooldowns.pop(clave, None)
+
+    def detener_todos(self):
+        self.detener(self.workers)
+
+    def detener(self, workers):
+        """Pide a los workers que terminen (SIGTERM) y les da tiempo para escribir lo pendiente"""
+        procesos = [w["proceso"] for w in workers if w["proceso"] is not None and w["proceso"].is_alive()]
+        for proceso in procesos:
+            proceso.terminate()
+        limite = time.monotonic() + ESPERA_CIERRE_SEGUNDOS
+        for proceso in procesos:
+            proceso.join(max(0.0, limite - time.monotonic()))
+            if proceso.is_alive():
+                print(f"  ⚠️  {proceso.name} no terminó a tiempo, se lo mata")
+                proceso.kill()
+                proceso.join()
+
+
+def ejecutar(procesos):
+    """Sincroniza el catálogo de paradas una sola vez y arranca el supervisor"""
+    session = get_session()
+    try:
+        # Así los workers encuentran el catálogo al día y no compiten insertando las mismas paradas
+        if not monitoreo.cargar_paradas_monitoreadas(session):
+            return
+    finally:
+        session.close()
+
+    unidades = monitoreo.MONITORED_LINE_GROUPS or monitoreo.MONITORED_LINES
+    supervisor = Supervisor(procesos, unidades)
+    print(f"\n👷 Supervisor: {supervisor.procesos} workers para {len(supervisor.unidades)} "
+          f"{'grupos de líneas' if monitoreo.MONITORED_LINE_GROUPS else 'líneas'}\n")
+    supervisor.ejecutar()
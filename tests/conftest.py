@@ -0,0 +1,145 @@
+"""
+Fixtures compartidas de los tests
+
+Los tests de base corren contra SQLite (un archivo temporal por test) y, si
+TEST_DATABASE_URL apunta a un servidor PostgreSQL, también contra una base
+nueva creada con el esquema de Rails (bus-tracker/db/structure.sql) y borrada
+al terminar. Sin TEST_DATABASE_URL los casos de PostgreSQL se saltean.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost/postgres uv run pytest
+
+`servidor_stm` levanta un servidor HTTP local que imita la API de STM.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from models import dispose_engines, get_db_engine
+
+ESTRUCTURA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bus-tracker", "db", "structure.sql")
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'bondis.db'}"
+    yield url
+    dispose_engines(url)
+
+
+@pytest.fixture
+def postgres_url():
+    """Base PostgreSQL descartable con bus_passages particionada como en producción"""
+    base = os.getenv("TEST_DATABASE_URL")
+    if not base:
+        pytest.skip("TEST_DATABASE_URL no está definida")
+
+    nombre = f"monitor_bondis_test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(base, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"CREATE DATABASE {nombre}"))
+    url = make_url(base).set(database=nombre).render_as_string(hide_password=False)
+    try:
+        with get_db_engine(url).begin() as conn:
+            conn.exec_driver_sql(open(ESTRUCTURA, encoding="utf-8").read())
+        yield url
+    finally:
+        dispose_engines(url)
+        with admin.connect() as conn:
+            conn.execute(text(f"DROP DATABASE IF EXISTS {nombre} WITH (FORCE)"))
+        admin.dispose()
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def db_url(request):
+    """La misma prueba contra SQLite y contra PostgreSQL (si está disponible)"""
+    return request.getfixturevalue(f"{request.param}_url")
+
+
+@pytest.fixture
+def engine(db_url):
+    return get_db_engine(db_url)
+
+
+class ServidorSTM(ThreadingHTTPServer):
+    """
+    Imitación local de la API de STM: /token entrega tokens numerados, /buses dos
+    bondis por línea pedida y /upcomingbuses una lista vacía. `demora` retrasa cada
+    GET y se lleva la cuenta de consultas simultáneas; los tokens de `revocados`
+    reciben 401.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _ManejadorSTM)
+        self.demora = 0.0
+        self.revocados = set()
+        self.tokens_emitidos = 0
+        self.consultas = []  # (inicio, ruta, token)
+        self.en_curso = 0
+        self.max_en_curso = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _ManejadorSTM(BaseHTTPRequestHandler):
+    def _responder(self, estado, cuerpo):
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.tokens_emitidos += 1
+            token = f"token-{self.server.tokens_emitidos}"
+        self._responder(200, {"access_token": token, "expires_in": 300})
+
+    def do_GET(self):
+        servidor = self.server
+        url = urlparse(self.path)
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        with servidor.lock:
+            servidor.consultas.append((time.monotonic(), url.path, token))
+            servidor.en_curso += 1
+            servidor.max_en_curso = max(servidor.max_en_curso, servidor.en_curso)
+        try:
+            time.sleep(servidor.demora)
+            if token in servidor.revocados:
+                return self._responder(401, {"error": "invalid_token"})
+            if url.path.endswith("/upcomingbuses"):
+                return self._responder(200, [])
+            lineas = parse_qs(url.query).get("lines", [""])[0].split(",")
+            self._responder(200, [
+                {"busId": 100 * i + k, "line": linea, "location": {"coordinates": [-56.13, -34.89]}}
+                for i, linea in enumerate(lineas) for k in range(2)
+            ])
+        finally:
+            with servidor.lock:
+                servidor.en_curso -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor_stm():
+    servidor = ServidorSTM()
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
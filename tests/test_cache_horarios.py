@@ -0,0 +1,36 @@
+import os
+
+import cache_horarios
+from analizar_datos import leer_datos_stm
+
+ENCABEZADO = "tipo_dia;cod_variante;frecuencia;cod_ubic_parada;ordinal;hora;dia_anterior\n"
+FILAS = ["1;7801;1200;2071;1;830;N\n", "1;7801;1200;2071;2;2405;S\n"]
+
+
+def _csv(tmp_path, filas):
+    ruta = tmp_path / "datos_stm.csv"
+    ruta.write_text(ENCABEZADO + "".join(filas))
+    return str(ruta)
+
+
+def test_la_cache_se_invalida_si_cambia_el_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_horarios, "CACHE_DIR", str(tmp_path / "cache"))
+    ruta = _csv(tmp_path, FILAS)
+
+    assert cache_horarios.leer_cache(ruta) is None
+    leer_datos_stm(ruta)
+    cacheado = cache_horarios.leer_cache(ruta)
+    assert cacheado["hora"].tolist() == [830, 2405]
+    assert cacheado["dia_anterior"].tolist() == ["N", "S"]
+
+    # Otro tamaño
+    _csv(tmp_path, FILAS + ["2;7801;1200;2071;1;915;N\n"])
+    assert cache_horarios.leer_cache(ruta) is None
+    assert len(leer_datos_stm(ruta)) == 3
+
+    # Mismo tamaño, otra fecha de modificación
+    _csv(tmp_path, FILAS + ["2;7801;1200;2071;1;916;N\n"])
+    estado = os.stat(ruta)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+    assert cache_horarios.leer_cache(ruta) is None
+    assert leer_datos_stm(ruta)["hora"].tolist() == [830, 2405, 916]
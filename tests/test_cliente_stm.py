@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cliente_stm import ClienteSTM
+
+
+@pytest.fixture
+def cliente(servidor_stm):
+    cliente = ClienteSTM("id", "secreto", base_url=servidor_stm.url, auth_url=f"{servidor_stm.url}/token",
+                         reintentos=0, renovar_en_segundo_plano=False)
+    yield cliente
+    cliente.cerrar()
+
+
+def test_renueva_el_token_revocado_y_reintenta(servidor_stm, cliente):
+    assert cliente.token_vigente() == "token-1"
+    servidor_stm.revocados.add("token-1")
+
+    assert len(cliente.get("/buses", {"lines": "121"})) == 2
+    assert cliente.access_token == "token-2"
+    assert [token for _, _, token in servidor_stm.consultas] == ["token-1", "token-2"]
+
+
+def test_varios_401_del_mismo_token_renuevan_una_sola_vez(servidor_stm, cliente):
+    assert cliente.token_vigente() == "token-1"
+    servidor_stm.revocados.add("token-1")
+    servidor_stm.demora = 0.1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        respuestas = list(pool.map(lambda _: cliente.get("/buses", {"lines": "121"}), range(8)))
+
+    assert all(len(r) == 2 for r in respuestas)
+    # Los 401 que llegan después de la renovación no invalidan el token nuevo
+    assert servidor_stm.tokens_emitidos == 2
+    assert cliente.access_token == "token-2"
@@ -0,0 +1,90 @@
+import time
+from datetime import datetime, timedelta
+
+import escritor_pasadas
+from escritor_pasadas import EscritorPasadas
+from models import BusPassage, BusPassageRollup, BusStop, session_scope
+
+INICIO = datetime(2025, 11, 20, 8, 0)
+
+
+def _parada(engine):
+    with session_scope(engine) as session:
+        parada = BusStop(busstop_id=2071, street1="Av. Italia", street2="Propios", latitude=-34.89, longitude=-56.13)
+        session.add(parada)
+        session.flush()
+        session.expunge(parada)
+    return parada
+
+
+def _bus(bus_id=1234, linea="121"):
+    return {"line": linea, "busId": bus_id, "location": {"coordinates": [-56.13, -34.89]}}
+
+
+def _contar(engine):
+    with session_scope(engine) as session:
+        return session.query(BusPassage).count()
+
+
+def test_escribe_por_tiempo_sin_esperar_al_cierre(engine):
+    parada = _parada(engine)
+    escritor = EscritorPasadas(engine, tamano_lote=100, intervalo_flush=0.1).iniciar()
+    try:
+        escritor.registrar(parada, _bus(), INICIO)
+        limite = time.monotonic() + 5
+        while escritor.escritas == 0 and time.monotonic() < limite:
+            time.sleep(0.02)
+        assert escritor.escritas == 1
+        assert _contar(engine) == 1
+    finally:
+        escritor.cerrar()
+
+
+def test_cerrar_escribe_lo_pendiente_y_descarta_repetidas(engine):
+    parada = _parada(engine)
+    with EscritorPasadas(engine, tamano_lote=100, intervalo_flush=60, cooldown=300) as escritor:
+        for minutos in (0, 2, 6):
+            escritor.registrar(parada, _bus(), INICIO + timedelta(minutes=minutos))
+        escritor.registrar(parada, _bus(77, "D10"), INICIO)
+
+    assert (escritor.escritas, escritor.duplicadas) == (3, 1)
+    assert _contar(engine) == 3
+    with session_scope(engine) as session:
+        assert sum(r.passages for r in session.query(BusPassageRollup)) == 3
+
+
+def test_reintenta_el_lote_que_falla(engine, monkeypatch):
+    parada = _parada(engine)
+    crear = BusPassage.bulk_create.__func__
+    fallas = []
+
+    def fallar_una_vez(cls, session, rows, method="copy"):
+        if not fallas:
+            fallas.append(len(rows))
+            raise RuntimeError("conexión perdida")
+        return crear(cls, session, rows, method)
+
+    monkeypatch.setattr(BusPassage, "bulk_create", classmethod(fallar_una_vez))
+    monkeypatch.setattr(escritor_pasadas.time, "sleep", lambda segundos: None)
+    with EscritorPasadas(engine, intervalo_flush=60) as escritor:
+        escritor.registrar(parada, _bus(), INICIO)
+        escritor.registrar(parada, _bus(77, "D10"), INICIO)
+
+    assert fallas == [2]
+    assert (escritor.escritas, escritor.descartadas) == (2, 0)
+    assert _contar(engine) == 2
+
+
+def test_descarta_el_lote_al_agotar_los_reintentos(engine, monkeypatch):
+    parada = _parada(engine)
+
+    def fallar(cls, session, rows, method="copy"):
+        raise RuntimeError("base caída")
+
+    monkeypatch.setattr(BusPassage, "bulk_create", classmethod(fallar))
+    monkeypatch.setattr(escritor_pasadas.time, "sleep", lambda segundos: None)
+    with EscritorPasadas(engine, intervalo_flush=60, reintentos=2) as escritor:
+        escritor.registrar(parada, _bus(), INICIO)
+
+    assert (escritor.escritas, escritor.descartadas) == (0, 1)
+    assert _contar(engine) == 0
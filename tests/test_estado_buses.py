@@ -0,0 +1,44 @@
+from estado_buses import HistorialPosiciones, TablaEstadoBuses
+
+
+def test_historial_guarda_solo_las_ultimas_posiciones():
+    historial = HistorialPosiciones(capacidad=3)
+    for instante in range(5):
+        historial.agregar(float(instante), -34.9 + instante / 1000, -56.1)
+
+    assert len(historial) == 3
+    assert [muestra[0] for muestra in historial] == [2.0, 3.0, 4.0]
+    assert historial.muestra(3) is None
+
+
+def test_purgar_vence_cooldowns_salvo_los_renovados():
+    tabla = TablaEstadoBuses()
+    tabla.iniciar_cooldown((2071, 1), ahora=0, duracion=300)
+    tabla.iniciar_cooldown((2071, 2), ahora=0, duracion=300)
+    tabla.iniciar_cooldown((2071, 2), ahora=200, duracion=300)
+
+    assert tabla.en_cooldown((2071, 1), 299)
+    tabla.purgar(300)
+    assert not tabla.en_cooldown((2071, 1), 300)
+    assert list(tabla.cooldowns) == [(2071, 2)]
+    assert len(tabla._vencimientos_cooldowns) == 1
+
+    tabla.purgar(500)
+    assert tabla.cooldowns == {}
+    assert tabla._vencimientos_cooldowns == []
+
+
+def test_purgar_olvida_los_bondis_inactivos():
+    tabla = TablaEstadoBuses(inactividad_max=1800)
+    tabla.registrar_posicion(1, 0, -34.9, -56.1)
+    tabla.registrar_posicion(2, 0, -34.9, -56.1)
+    # El GPS del 2 no se movió, pero el bondi se sigue viendo en la API
+    tabla.registrar_posicion(2, 0, -34.9, -56.1, ahora=1500)
+
+    tabla.purgar(1800)
+    assert set(tabla.buses) == {2}
+    assert tabla.ultima_posicion(1) is None
+    assert len(tabla.buses[2].historial) == 1
+
+    tabla.purgar(3300)
+    assert len(tabla) == 0
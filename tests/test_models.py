@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import BusPassage, BusPassageCooldown, BusPassageRollup, BusStop, session_scope
+
+INICIO = datetime(2025, 11, 20, 8, 0)
+COOLDOWN = 300
+
+
+def _parada(session, busstop_id=2071):
+    parada = BusStop(busstop_id=busstop_id, street1="Av. Italia", street2="Propios", latitude=-34.89, longitude=-56.13)
+    session.add(parada)
+    session.flush()
+    return parada
+
+
+def _pasada(bus_stop_id, minutos, bus_id=1234, linea="121", segundos=0):
+    return BusPassage.values_from_bus_data(
+        bus_stop_id,
+        {"line": linea, "busId": bus_id, "location": {"coordinates": [-56.13, -34.89]}},
+        INICIO + timedelta(minutes=minutos, seconds=segundos),
+    )
+
+
+def _minutos(rows):
+    return [int((row["detected_at"] - INICIO).total_seconds() // 60) for row in rows]
+
+
+def test_claim_acepta_la_pasada_justo_al_vencer_el_cooldown(engine):
+    aceptadas = []
+    with session_scope(engine) as session:
+        parada_id = _parada(session).id
+    # Una pasada por minuto, cada una en su propio claim: la base decide con lo ya registrado
+    for minuto in range(16):
+        with session_scope(engine) as session:
+            aceptadas += BusPassageCooldown.claim(session, [_pasada(parada_id, minuto)], COOLDOWN)
+
+    assert _minutos(aceptadas) == [0, 5, 10, 15]
+
+
+def test_claim_rechaza_un_microsegundo_antes_del_vencimiento(engine):
+    with session_scope(engine) as session:
+        parada_id = _parada(session).id
+        assert BusPassageCooldown.claim(session, [_pasada(parada_id, 0)], COOLDOWN)
+
+    temprana = _pasada(parada_id, 5)
+    temprana["detected_at"] -= timedelta(microseconds=1)
+    with session_scope(engine) as session:
+        assert BusPassageCooldown.claim(session, [temprana], COOLDOWN) == []
+    with session_scope(engine) as session:
+        assert len(BusPassageCooldown.claim(session, [_pasada(parada_id, 5)], COOLDOWN)) == 1
+
+
+def _resumen(session):
+    filas = session.query(BusPassageRollup).order_by(BusPassageRollup.line, BusPassageRollup.hour)
+    return [
+        (f.line, f.hour, f.passages, f.first_detected_at, f.last_detected_at,
+         f.headway_sum_seconds, f.headway_count, f.max_headway_seconds)
+        for f in filas
+    ]
+
+
+def test_rebuild_da_lo_mismo_que_accumulate(engine):
+    with session_scope(engine) as session:
+        parada_id = _parada(session).id
+    # Frecuencias de 15 min exactos y una con microsegundos, cruzando el cambio de hora
+    rows = [_pasada(parada_id, minutos) for minutos in (0, 15, 30, 45, 60, 75)]
+    rows += [_pasada(parada_id, 10, bus_id=77, linea="D10"), _pasada(parada_id, 22, bus_id=78, linea="D10", segundos=30.25)]
+
+    with session_scope(engine) as session:
+        BusPassage.bulk_create(session, rows)
+        BusPassageRollup.accumulate(session, rows)
+    with session_scope(engine) as session:
+        acumulado = _resumen(session)
+        assert [fila[5] for fila in acumulado] == [2700.0, 1800.0, 750.25]
+
+    with session_scope(engine) as session:
+        BusPassageRollup.rebuild(session, INICIO, INICIO + timedelta(hours=2))
+    with session_scope(engine) as session:
+        assert _resumen(session) == acumulado
+
+
+def _parada_api(busstop_id, calle="Av. Italia", lat=-34.89, lon=-56.13):
+    return {"busstopId": busstop_id, "street1": calle, "street2": "Propios", "location": {"coordinates": [lon, lat]}}
+
+
+def test_sync_from_api_aplica_solo_altas_y_cambios(engine):
+    paradas = [_parada_api(2071), _parada_api(546, calle="18 de Julio"), {"busstopId": 9, "location": {}}]
+    with session_scope(engine) as session:
+        assert BusStop.sync_from_api(session, paradas) == {"added": 2, "changed": 0, "unchanged": 0}
+    with session_scope(engine) as session:
+        assert BusStop.sync_from_api(session, paradas) == {"added": 0, "changed": 0, "unchanged": 2}
+
+    paradas[1] = _parada_api(546, calle="18 de Julio", lat=-34.9051)
+    with session_scope(engine) as session:
+        assert BusStop.sync_from_api(session, paradas) == {"added": 0, "changed": 1, "unchanged": 1}
+    with session_scope(engine) as session:
+        parada = session.query(BusStop).filter_by(busstop_id=546).one()
+        assert float(parada.latitude) == pytest.approx(-34.9051)
+        assert session.query(BusStop).count() == 2
+
+
+@pytest.mark.parametrize("metodo", ["copy", "values"])
+def test_bulk_create_guarda_nulos_y_coordenadas(engine, metodo):
+    with session_scope(engine) as session:
+        parada_id = _parada(session).id
+        rows = [_pasada(parada_id, 0), _pasada(parada_id, 15, linea="D10")]
+        rows[1]["destination"] = 'Pocitos "Nuevo", Plaza'
+        assert BusPassage.bulk_create(session, rows, metodo) == 2
+
+    with session_scope(engine) as session:
+        pasadas = session.query(BusPassage).order_by(BusPassage.detected_at).all()
+        assert [(p.line, p.destination, p.eta_minutes) for p in pasadas] == [
+            ("121", None, None), ("D10", 'Pocitos "Nuevo", Plaza', None),
+        ]
+        assert [float(p.bus_latitude) for p in pasadas] == pytest.approx([-34.89, -34.89])
+        assert pasadas[0].detected_at == INICIO
+
+
+def test_headways_corta_los_intervalos_largos(engine):
+    with session_scope(engine) as session:
+        parada_id = _parada(session).id
+        rows = [_pasada(parada_id, minutos) for minutos in (0, 12, 20)]
+        rows += [_pasada(parada_id, 90, segundos=0.5), _pasada(parada_id, 5, bus_id=77, linea="D10")]
+        BusPassage.bulk_create(session, rows)
+
+    dialect = engine.dialect.name
+    consulta = BusPassage.headways(dialect, INICIO + timedelta(minutes=10), INICIO + timedelta(hours=2), 1800)
+    with engine.connect() as conn:
+        filas = conn.execute(consulta.order_by("detected_at")).all()
+
+    # La primera pasada queda fuera del rango pero sirve de anterior; a los 90 min el hueco supera max_seconds
+    assert [(f.line, f.headway_seconds) for f in filas] == [("121", 720.0), ("121", 480.0), ("121", None)]
@@ -0,0 +1,104 @@
+from datetime import date, datetime
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import text
+
+import particiones
+from models import BusPassage, BusStop, get_db_engine, listar_particiones, session_scope
+
+
+def _parada(session, busstop_id=2071):
+    parada = BusStop(busstop_id=busstop_id, street1="Av. Italia", street2="Propios", latitude=-34.89, longitude=-56.13)
+    session.add(parada)
+    session.flush()
+    return parada
+
+
+def _pasada(parada, detected_at, linea="121"):
+    return BusPassage.values_from_bus_data(
+        parada.id,
+        {"line": linea, "busId": 1234, "location": {"coordinates": [-56.12345678, -34.87654321]}},
+        detected_at,
+    )
+
+
+def test_archivar_particion_con_filas(postgres_url, tmp_path):
+    engine = get_db_engine(postgres_url)
+    with session_scope(engine) as session:
+        parada = _parada(session)
+        BusPassage.bulk_create(session, [_pasada(parada, datetime(2025, 12, 3, 8, 15)), _pasada(parada, datetime(2025, 12, 3, 8, 40))])
+
+    archivadas = particiones.archivar(engine, retencion=6, directorio=str(tmp_path), eliminar=True)
+
+    assert "bus_passages_2025_12" in archivadas
+    tabla = pq.read_table(particiones.ruta_archivo(date(2025, 12, 1), str(tmp_path)))
+    assert tabla.num_rows == 2
+    assert tabla.column("bus_latitude").to_pylist() == pytest.approx([-34.87654321] * 2)
+    assert tabla.column("bus_longitude").to_pylist() == pytest.approx([-56.12345678] * 2)
+    assert not list(tmp_path.glob("*.tmp"))
+    with engine.connect() as conn:
+        assert "bus_passages_2025_12" not in [nombre for nombre, _, _ in listar_particiones(conn)]
+        assert conn.execute(text("SELECT count(*) FROM bus_passages")).scalar() == 0
+
+
+def test_exportacion_fallida_no_deja_temporal(postgres_url, tmp_path, monkeypatch):
+    engine = get_db_engine(postgres_url)
+    with session_scope(engine) as session:
+        parada = _parada(session)
+        BusPassage.bulk_create(session, [_pasada(parada, datetime(2025, 12, 3, 8, minuto)) for minuto in (15, 40)])
+
+    escribir = pq.ParquetWriter.write_table
+    lotes = []
+
+    def escribir_y_fallar(self, tabla, *args, **kwargs):
+        lotes.append(tabla.num_rows)
+        if len(lotes) > 1:
+            raise OSError("disco lleno")
+        return escribir(self, tabla, *args, **kwargs)
+
+    monkeypatch.setattr(particiones, "FILAS_POR_LOTE", 1)
+    monkeypatch.setattr(pq.ParquetWriter, "write_table", escribir_y_fallar)
+    destino = particiones.ruta_archivo(date(2025, 12, 1), str(tmp_path))
+    with engine.connect() as conn, pytest.raises(OSError):
+        particiones.exportar_particion(conn, "bus_passages_2025_12", destino)
+
+    assert lotes == [1, 1]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_archivar_filas_viejas_de_default(postgres_url, tmp_path):
+    engine = get_db_engine(postgres_url)
+    with session_scope(engine) as session:
+        parada = _parada(session)
+        # Junio de 2025 no tiene partición: la pasada cae en bus_passages_default
+        BusPassage.bulk_create(session, [_pasada(parada, datetime(2025, 6, 20, 7, 0)), _pasada(parada, datetime(2025, 12, 3, 8, 15))])
+
+    archivadas = particiones.archivar(engine, retencion=6, directorio=str(tmp_path), eliminar=True)
+
+    assert {"bus_passages_2025_06", "bus_passages_2025_12"} <= set(archivadas)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM bus_passages_default")).scalar() == 0
+    tabla = particiones.leer_archivadas(directorio=str(tmp_path))
+    assert sorted(tabla.column("detected_at").to_pylist()) == [datetime(2025, 6, 20, 7, 0), datetime(2025, 12, 3, 8, 15)]
+
+
+def test_archivar_filas_que_llegan_tarde_a_un_mes_archivado(postgres_url, tmp_path):
+    engine = get_db_engine(postgres_url)
+    with session_scope(engine) as session:
+        parada = _parada(session)
+        BusPassage.bulk_create(session, [_pasada(parada, datetime(2025, 12, 3, 8, 15))])
+        tarde = _pasada(parada, datetime(2025, 12, 28, 23, 50))
+    particiones.archivar(engine, retencion=6, directorio=str(tmp_path), eliminar=True)
+
+    # Sin la partición de diciembre, la pasada que llega tarde cae en bus_passages_default
+    with session_scope(engine) as session:
+        BusPassage.bulk_create(session, [tarde])
+    particiones.archivar(engine, retencion=6, directorio=str(tmp_path), eliminar=True)
+
+    assert particiones.meses_archivados(str(tmp_path))[date(2025, 12, 1)] == [
+        particiones.ruta_archivo(date(2025, 12, 1), str(tmp_path)),
+        particiones.ruta_archivo(date(2025, 12, 1), str(tmp_path), parte=1),
+    ]
+    desde, hasta = datetime(2025, 12, 1), datetime(2026, 1, 1)
+    assert particiones.leer_archivadas(desde, hasta, directorio=str(tmp_path)).num_rows == 2
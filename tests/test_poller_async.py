@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from cliente_stm import ClienteSTM
+from poller_async import PollerAsync, buses_de_grupos
+
+
+@pytest.fixture
+def cliente(servidor_stm):
+    cliente = ClienteSTM(base_url=servidor_stm.url, token_fijo="prueba", reintentos=0)
+    yield cliente
+    cliente.cerrar()
+
+
+@pytest.fixture
+def poller(cliente):
+    poller = PollerAsync(cliente, intervalo=0.2, max_concurrencia=3, timeout=5)
+    yield poller
+    poller.cerrar()
+
+
+def test_no_supera_el_limite_de_concurrencia(servidor_stm, poller):
+    servidor_stm.demora = 0.2
+    grupos = [[str(linea)] for linea in range(100, 109)]
+
+    inicio = time.monotonic()
+    buses = buses_de_grupos(poller, grupos)
+    duracion = time.monotonic() - inicio
+
+    assert len(buses) == 2 * len(grupos)
+    assert servidor_stm.max_en_curso == 3
+    # 9 consultas de a 3: tres tandas, ni una sola (sin límite) ni nueve (en serie)
+    assert 0.6 <= duracion < 1.2
+
+
+def test_saltea_los_ticks_perdidos(servidor_stm, poller, capsys):
+    servidor_stm.demora = 0.5
+    recibidos = []
+
+    asyncio.run(poller.ejecutar(lambda buses, proximos: recibidos.append(buses), [["121"]], ciclos=4))
+
+    # El primer ciclo tarda 0.5 s con intervalo 0.2: se pierden los ticks 1 y 2 y el
+    # siguiente arranca en el tick 3 (0.6 s), sin encadenar consultas atrasadas
+    assert len(recibidos) == 2
+    inicios = [inicio for inicio, _, _ in servidor_stm.consultas]
+    assert inicios[1] - inicios[0] == pytest.approx(0.6, abs=0.1)
+    assert "salteando 2 tick(s)" in capsys.readouterr().out
+
+
+def test_reusa_el_mismo_event_loop(servidor_stm, poller):
+    buses_de_grupos(poller, [["121"], ["D10"]])
+    loop = poller._runner.get_loop()
+    semaforo = poller._semaforo
+
+    for _ in range(3):
+        assert buses_de_grupos(poller, [["121"], ["D10"]])
+    assert poller._runner.get_loop() is loop
+    assert poller._semaforo is semaforo
+    assert not loop.is_closed()
+
+    poller.cerrar()
+    assert loop.is_closed()
+    assert poller._runner is None
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from puntualidad import emparejar, preparar_horarios
+
+
+def _horarios(filas):
+    df = pd.DataFrame(filas, columns=["tipo_dia", "cod_variante", "cod_ubic_parada", "hora", "dia_anterior"])
+    return preparar_horarios(df, {"7801": "121"})
+
+
+def _pasadas(*detectadas_utc):
+    return pd.DataFrame({
+        "id": range(1, len(detectadas_utc) + 1),
+        "busstop_id": 2071,
+        "line": "121",
+        "detected_at": pd.to_datetime(list(detectadas_utc)),
+    })
+
+
+def test_empareja_salidas_de_despues_de_medianoche_con_el_dia_anterior():
+    # Salidas del horario hábil: 23:50 y 00:05 (esta última del mismo día de servicio, dia_anterior = 'S')
+    horarios = _horarios([(1, 7801, 2071, 2350, "N"), (1, 7801, 2071, 5, "S"), (2, 7801, 2071, 900, "N")])
+    # Viernes 21/11/2025 23:52 y sábado 22/11 00:10, hora de Montevideo (UTC-3)
+    pasadas = _pasadas(datetime(2025, 11, 22, 2, 52), datetime(2025, 11, 22, 3, 10))
+
+    resultado = emparejar(pasadas, horarios)
+
+    assert resultado["tipo_dia"].tolist() == [1, 1]
+    assert resultado["minutos_programados"].tolist() == [23 * 60 + 50, 24 * 60 + 5]
+    assert resultado["atraso_minutos"].tolist() == pytest.approx([2, 5])
+    assert resultado["hora"].tolist() == [23, 0]
+
+
+def test_no_empareja_fuera_de_la_tolerancia():
+    horarios = _horarios([(2, 7801, 2071, 900, "N")])
+    # Sábado 22/11/2025 10:00 en Montevideo: la salida de las 9:00 está a 60 minutos
+    resultado = emparejar(_pasadas(datetime(2025, 11, 22, 13, 0)), horarios, tolerancia=30)
+
+    assert resultado["atraso_minutos"].isna().all()
@@ -0,0 +1,103 @@
+import pytest
+
+import supervisor
+from supervisor import Supervisor
+
+
+class _ProcesoFalso:
+    def __init__(self, name):
+        self.name = name
+        self.pid = 0
+        self.exitcode = None
+        self.terminado = False
+
+    def is_alive(self):
+        return self.exitcode is None
+
+    def terminate(self):
+        self.terminado = True
+        self.exitcode = -15
+
+    def join(self, timeout=None):
+        pass
+
+
+@pytest.fixture
+def supervisor_falso(monkeypatch):
+    lanzados = []
+
+    def lanzar(self, worker):
+        worker["proceso"] = _ProcesoFalso(f"tracker-{worker['numero']}")
+        lanzados.append(worker["numero"])
+
+    monkeypatch.setattr(Supervisor, "lanzar", lanzar)
+    sup = Supervisor(3, ["121", "D10", "147", "148", "21", "60", "76"], max_reinicios=0)
+    sup.repartir()
+    lanzados.clear()
+    return sup, lanzados
+
+
+def _shards(sup):
+    return {w["numero"]: w["shard"] for w in sup.workers}
+
+
+def test_dar_de_baja_reparte_solo_sus_lineas(supervisor_falso):
+    sup, lanzados = supervisor_falso
+    assert _shards(sup) == {0: ["121", "148", "76"], 1: ["D10", "21"], 2: ["147", "60"]}
+    procesos = {w["numero"]: w["proceso"] for w in sup.workers}
+
+    procesos[0].exitcode = 1
+    sup.vigilar(100.0)
+
+    # Cada línea va al worker con menos líneas en ese momento
+    assert _shards(sup) == {1: ["D10", "21", "121", "76"], 2: ["147", "60", "148"]}
+    assert sup.procesos == 2
+    assert sorted(lanzados) == [1, 2]
+    assert procesos[1].terminado and procesos[2].terminado
+
+
+def test_solo_se_reinician_los_que_reciben_lineas(supervisor_falso):
+    sup, lanzados = supervisor_falso
+    sup.workers[0]["shard"] = ["121"]
+    procesos = {w["numero"]: w["proceso"] for w in sup.workers}
+
+    procesos[0].exitcode = 1
+    sup.vigilar(100.0)
+
+    assert _shards(sup) == {1: ["D10", "21", "121"], 2: ["147", "60"]}
+    assert lanzados == [1]
+    assert not procesos[2].terminado
+    assert sup.workers[1]["proceso"] is not procesos[1]
+
+
+def test_un_worker_esperando_reinicio_arranca_con_su_shard_nuevo(supervisor_falso, monkeypatch):
+    sup, lanzados = supervisor_falso
+    sup.max_reinicios = 1
+    monkeypatch.setattr(supervisor, "ESPERA_REINICIO_SEGUNDOS", 10)
+    procesos = {w["numero"]: w["proceso"] for w in sup.workers}
+
+    # El 2 cae una vez y espera su reinicio; el 0 cae dos veces y se da de baja
+    procesos[0].exitcode = 1
+    sup.vigilar(100.0)
+    procesos[2].exitcode = 1
+    sup.vigilar(105.0)
+    sup.vigilar(110.0)
+    assert lanzados == [0]
+    sup.workers[0]["proceso"].exitcode = 1
+    sup.vigilar(111.0)
+
+    assert _shards(sup) == {1: ["D10", "21", "121", "76"], 2: ["147", "60", "148"]}
+    assert lanzados == [0, 1]
+    assert {w["numero"]: w["proceso"] for w in sup.workers}[2] is None
+    sup.vigilar(115.0)
+    assert lanzados == [0, 1, 2]
+
+
+def test_sin_workers_no_queda_nada(supervisor_falso):
+    sup, _ = supervisor_falso
+    for worker in list(sup.workers):
+        worker["proceso"].exitcode = 1
+        sup.vigilar(100.0)
+
+    assert sup.workers == []
+    assert sup.procesos == 0